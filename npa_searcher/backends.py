@@ -0,0 +1,163 @@
+"""
+Провайдеры (бэкенды) для извлечения документов
+Отделяют GPTHelper от конкретного клиента OpenAI, чтобы можно было
+подключить любой OpenAI-совместимый сервер или локальную заглушку
+"""
+
+import logging
+from typing import Dict, Any, Optional
+from npa_searcher.config import Config
+from npa_searcher.exceptions import GPTError, ConfigError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+class ExtractionBackend:
+    """
+    Базовый интерфейс провайдера извлечения
+    Наследники реализуют complete() и, при поддержке, пакетные операции
+    """
+
+    name = 'base'
+
+    def complete(self, request: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        """
+        Выполнение одного запроса chat.completions
+
+        Args:
+            request: тело запроса (model, messages, temperature, max_tokens)
+            timeout: таймаут этого запроса, с (по бюджету времени вызова)
+
+        Returns:
+            str: текст ответа модели
+        """
+        raise NotImplementedError
+
+    def supports_batch(self) -> bool:
+        """Поддерживает ли провайдер пакетные задания (Batch API)"""
+        return False
+
+    def upload_batch_file(self, path: str) -> str:
+        """Загрузка входного JSONL файла, возвращает ID файла"""
+        raise GPTError(f"Провайдер {self.name} не поддерживает пакетные задания")
+
+    def create_batch(self, input_file_id: str, completion_window: str) -> Any:
+        """Создание пакетного задания"""
+        raise GPTError(f"Провайдер {self.name} не поддерживает пакетные задания")
+
+    def retrieve_batch(self, batch_id: str) -> Any:
+        """Получение состояния пакетного задания"""
+        raise GPTError(f"Провайдер {self.name} не поддерживает пакетные задания")
+
+    def download_file(self, file_id: str) -> str:
+        """Загрузка содержимого файла результатов"""
+        raise GPTError(f"Провайдер {self.name} не поддерживает пакетные задания")
+
+class OpenAIBackend(ExtractionBackend):
+    """
+    Провайдер на основе клиента openai
+    Работает с официальным API и с любым OpenAI-совместимым base_url
+    """
+
+    name = 'openai'
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None,
+                 timeout: Optional[float] = None, max_retries: Optional[int] = None):
+        """
+        Инициализация провайдера
+
+        Args:
+            api_key: ключ API
+            base_url: адрес OpenAI-совместимого сервера (по умолчанию официальный API)
+            timeout: таймаут запроса в секундах
+            max_retries: число повторов внутри клиента openai
+                (по умолчанию 0 - повторы выполняет планировщик GPTHelper)
+        """
+        import openai
+
+        if max_retries is None:
+            max_retries = Config.GPT_CONFIG['client_max_retries']
+
+        client_kwargs = {'api_key': api_key, 'base_url': base_url, 'max_retries': max_retries}
+        if timeout is not None:
+            client_kwargs['timeout'] = timeout
+
+        self.client = openai.OpenAI(**client_kwargs)
+        self.base_url = base_url
+
+    def complete(self, request: Dict[str, Any], timeout: Optional[float] = None) -> str:
+        import openai
+
+        options = {'timeout': timeout} if timeout is not None else {}
+        try:
+            response = self.client.chat.completions.create(**request, **options)
+        except openai.RateLimitError as e:
+            raise RateLimitError(f"Лимит OpenAI API: {e}", _retry_after(e.response))
+        return response.choices[0].message.content
+
+    def supports_batch(self) -> bool:
+        return True
+
+    def upload_batch_file(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            return self.client.files.create(file=f, purpose='batch').id
+
+    def create_batch(self, input_file_id: str, completion_window: str) -> Any:
+        return self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint='/v1/chat/completions',
+            completion_window=completion_window
+        )
+
+    def retrieve_batch(self, batch_id: str) -> Any:
+        return self.client.batches.retrieve(batch_id)
+
+    def download_file(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+def _retry_after(response: Any) -> Optional[float]:
+    """Пауза из заголовков Retry-After / retry-after-ms ответа"""
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000.0
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+# Реестр провайдеров по имени
+BACKENDS = {
+    'openai': OpenAIBackend,
+}
+
+def register_backend(name: str, backend_class: type) -> None:
+    """
+    Регистрация собственного провайдера извлечения
+
+    Args:
+        name: имя провайдера
+        backend_class: класс-наследник ExtractionBackend
+    """
+    if not issubclass(backend_class, ExtractionBackend):
+        raise ConfigError(f"{backend_class.__name__} должен наследоваться от ExtractionBackend")
+    BACKENDS[name] = backend_class
+
+def create_backend(name: Optional[str] = None, **kwargs) -> ExtractionBackend:
+    """
+    Создание провайдера по имени из реестра
+
+    Args:
+        name: имя провайдера (по умолчанию из Config.GPT_CONFIG['backend'])
+        **kwargs: параметры конструктора провайдера
+
+    Returns:
+        ExtractionBackend: экземпляр провайдера
+    """
+    name = name or Config.GPT_CONFIG['backend']
+    if name not in BACKENDS:
+        raise ConfigError(f"Неизвестный провайдер извлечения: {name}",
+                          {'available': sorted(BACKENDS)})
+
+    logger.debug(f"Создан провайдер извлечения: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,338 @@
+"""
+Микробенчмарки поиска и скоринга: npa-bench
+Фильтрация, скоринг и дедупликация на синтетических наборах кандидатов
+(10..100k), задержка search_document через заглушку API и пиковая память.
+Результаты сохраняются в JSON для сравнения версий (--compare)
+"""
+
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Sequence
+from npa_searcher.config import Config
+from npa_searcher.utils import clean_number
+from npa_searcher.npa_searcher import NPASearcher
+from npa_searcher.candidates import CandidateDecoder, available_decoders, parse_candidates
+from npa_searcher.scoring import CandidateBatch
+from npa_searcher.standins.base import FaultProfile
+from npa_searcher.standins.pravo_server import (PravoAPI, PravoStandInServer, ReplaySession,
+                                                load_recording, synthetic_documents)
+
+BENCH_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+# Документ, относительно которого оцениваются кандидаты
+BENCH_DOCUMENT = {
+    'type': 'Федеральный закон',
+    'number': '273-ФЗ',
+    'title': 'Об образовании в Российской Федерации'
+}
+
+def synthetic_candidates(document: Dict[str, Any], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Набор кандидатов, покрывающий все ветви фильтра и скоринга
+
+    Номера: точное совпадение, очищенный номер, номер внутри и номер-префикс
+    (около трети), остальные - случайные; часть названий содержит слова
+    названия документа, часть - изменения.
+
+    Args:
+        document: искомый документ
+        count: размер набора
+        seed: зерно для воспроизводимости
+
+    Returns:
+        List кандидатов в формате ответа /Documents
+    """
+    rng = random.Random(seed)
+    number = document['number']
+    clean = clean_number(number)
+    title_words = [word for word in document.get('title', '').split() if len(word) > 3]
+
+    candidates = synthetic_documents(count, seed)
+    for item in candidates:
+        roll = rng.random()
+        if roll < 0.05:
+            item['number'] = number
+        elif roll < 0.10:
+            item['number'] = clean.lower()
+        elif roll < 0.25:
+            item['number'] = rng.choice([f"{clean}-{rng.randint(1, 9)}", f"{rng.randint(1, 9)}{clean}"])
+        elif roll < 0.30:
+            item['number'] = clean[:max(1, len(clean) - rng.randint(1, 3))]
+        if title_words and rng.random() < 0.4:
+            words = rng.sample(title_words, rng.randint(1, len(title_words)))
+            item['name'] = ' '.join(words)
+        item['complexName'] = f"{item['complexName'].split(' № ')[0]} № {item['number']} \"{item['name']}\""
+    return candidates
+
+def _seconds_stats(timings: Sequence[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        'max': ordered[-1],
+    }
+
+def measure(func: Callable, prepare: Callable[[], tuple], repeat: int, memory: bool = True) -> Dict[str, Any]:
+    """
+    Замер функции: подготовка аргументов вне замера, repeat повторов и
+    отдельный прогон под tracemalloc для пиковой памяти
+
+    Args:
+        func: измеряемая функция
+        prepare: возвращает свежие аргументы для одного вызова
+        repeat: число повторов
+        memory: мерить ли пиковую память
+
+    Returns:
+        Dict: seconds (min/median/mean/p95/max), peak_memory_bytes
+    """
+    timings = []
+    for _ in range(repeat):
+        args = prepare()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+
+    result = {'seconds': _seconds_stats(timings)}
+    if memory:
+        args = prepare()
+        tracemalloc.start()
+        try:
+            func(*args)
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def bench_functions(sizes: Sequence[int], repeat: int, seed: int = 0,
+                    memory: bool = True) -> List[Dict[str, Any]]:
+    """Пропускная способность фильтра, скоринга, дедупликации и их связки"""
+    searcher = NPASearcher()
+    document = BENCH_DOCUMENT
+    tfidf_config = dict(Config.SCORING_CONFIG, title_mode='tfidf')
+    results = []
+
+    def pipeline(items):
+        filtered = searcher._filter_relevant_items(items, document)
+        scored = searcher._score_results(filtered, document)
+        unique = searcher._remove_duplicates(scored)
+        return sorted(unique, key=lambda x: x.score, reverse=True)
+
+    for size in sizes:
+        # Кандидаты разбираются из JSON, как из ответа /Documents
+        content = json.dumps({'items': synthetic_candidates(document, size, seed)}, ensure_ascii=False).encode('utf-8')
+        base = parse_candidates(content)
+        scored = searcher._score_results(base, document)
+        benchmarks = [
+            ('filter_relevant_items', lambda items: searcher._filter_relevant_items(items, document),
+             lambda: (base,)),
+            # Скоринг перезаписывает score и is_amendment - повторы на тех же кандидатах
+            ('score_results', lambda items: searcher._score_results(items, document), lambda: (base,)),
+            # Режим tfidf: n-граммы новой партии + сходство с названием документа
+            ('score_batch_tfidf', lambda items: CandidateBatch.from_candidates(items).scores(document, tfidf_config),
+             lambda: (base,)),
+            ('remove_duplicates', searcher._remove_duplicates, lambda: (scored,)),
+            ('filter_score_dedup', pipeline, lambda: (base,)),
+        ]
+        # Разбор ответа каждым установленным декодером
+        benchmarks[:0] = [(f'parse_candidates_{decoder.backend}', decoder.parse, lambda: (content,))
+                          for decoder in map(CandidateDecoder, available_decoders())]
+        # Большие наборы повторяем реже, чтобы прогон оставался минутным
+        size_repeat = max(3, min(repeat, repeat * 1000 // max(size, 1)))
+        for name, func, prepare in benchmarks:
+            measured = measure(func, prepare, size_repeat, memory)
+            measured.update(benchmark=name, size=size, repeat=size_repeat,
+                            items_per_second=size / measured['seconds']['median']
+                            if measured['seconds']['median'] else None)
+            results.append(measured)
+    return results
+
+def bench_search(searches: int, mode: str = 'session', recording: Optional[str] = None,
+                 latency: float = 0.0, catalog_size: int = 5000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Задержка search_document на заглушке API
+
+    Args:
+        searches: число поисков
+        mode: 'session' - ответы прямо в сессию, 'http' - через локальный HTTP-сервер
+        recording: запись RecordingSession (иначе - только синтетический каталог)
+        latency: задержка ответа заглушки, с
+        catalog_size: документов в синтетическом каталоге
+        seed: зерно
+
+    Returns:
+        Dict: seconds (min/median/mean/p95/max), api_calls_per_search
+    """
+    catalog = synthetic_documents(catalog_size, seed)
+    api = PravoAPI(load_recording(recording) if recording else None, catalog)
+    faults = FaultProfile(latency=latency, seed=seed)
+
+    # Без кэша и пауз между запросами - измеряется сам поиск
+    searcher = NPASearcher()
+    searcher.request_delay = 0.0
+    rng = random.Random(seed)
+    documents = []
+    for doc in rng.sample(catalog, min(searches, len(catalog))):
+        documents.append({'type': doc['complexName'].split(' от ')[0], 'number': doc['number'],
+                          'title': doc['name']})
+
+    server = None
+    if mode == 'http':
+        server = PravoStandInServer(faults=faults, api=api).start()
+        searcher.api_url = server.api_url
+    else:
+        searcher.session = ReplaySession(api, faults)
+
+    timings = []
+    try:
+        for document in documents:
+            started = time.perf_counter()
+            searcher.search_document(document)
+            timings.append(time.perf_counter() - started)
+    finally:
+        if server is not None:
+            server.stop()
+
+    stats = searcher.get_search_statistics()
+    return {
+        'benchmark': f'search_document_{mode}',
+        'size': len(documents),
+        'repeat': len(documents),
+        'seconds': _seconds_stats(timings),
+        'searches_per_second': len(timings) / sum(timings) if timings else None,
+        'api_calls_per_search': stats['api_calls'] / len(documents) if documents else 0,
+        'latency': latency,
+    }
+
+def environment_info() -> Dict[str, Any]:
+    """Версия пакета, коммит и окружение для шапки отчета"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    from npa_searcher import __version__
+    return {
+        'package_version': __version__,
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 5, searches: int = 50,
+                   mode: str = 'session', recording: Optional[str] = None, latency: float = 0.0,
+                   seed: int = 0, memory: bool = True) -> Dict[str, Any]:
+    """
+    Полный набор бенчмарков
+
+    Returns:
+        Dict: version, created_at, environment, parameters, results
+    """
+    results = bench_functions(sizes, repeat, seed, memory)
+    if searches:
+        results.append(bench_search(searches, mode, recording, latency, seed=seed))
+    return {
+        'version': BENCH_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'parameters': {'sizes': list(sizes), 'repeat': repeat, 'searches': searches, 'mode': mode,
+                       'recording': recording, 'latency': latency, 'seed': seed},
+        'results': results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Сравнение медиан с базовым прогоном
+
+    Args:
+        current, baseline: результаты run_benchmarks
+        threshold: допустимое замедление (0.15 - на 15%)
+
+    Returns:
+        List: benchmark, size, baseline/current медианы, ratio, regression
+    """
+    base = {(row['benchmark'], row['size']): row for row in baseline.get('results', [])}
+    rows = []
+    for row in current.get('results', []):
+        before = base.get((row['benchmark'], row['size']))
+        if before is None:
+            continue
+        old, new = before['seconds']['median'], row['seconds']['median']
+        ratio = new / old if old else None
+        rows.append({
+            'benchmark': row['benchmark'],
+            'size': row['size'],
+            'baseline_median': old,
+            'current_median': new,
+            'ratio': ratio,
+            'regression': ratio is not None and ratio > 1 + threshold,
+        })
+    return rows
+
+def _format_table(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]]) -> str:
+    ratios = {(row['benchmark'], row['size']): row for row in comparison or []}
+    lines = [f"{'бенчмарк':<26}{'размер':>8}{'медиана, мс':>14}{'p95, мс':>11}{'память, КБ':>12}  сравнение"]
+    for row in report['results']:
+        seconds = row['seconds']
+        memory = row.get('peak_memory_bytes')
+        line = (f"{row['benchmark']:<26}{row['size']:>8}{seconds['median'] * 1000:>14.3f}"
+                f"{seconds['p95'] * 1000:>11.3f}{(memory / 1024 if memory else 0):>12.1f}")
+        diff = ratios.get((row['benchmark'], row['size']))
+        if diff and diff['ratio'] is not None:
+            line += f"  x{diff['ratio']:.2f}{' РЕГРЕССИЯ' if diff['regression'] else ''}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='npa-bench',
+                                     description='Микробенчмарки поиска и скоринга NPASearcher')
+    parser.add_argument('-o', '--output', default='npa_bench.json', help='файл результатов JSON')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='размеры наборов кандидатов')
+    parser.add_argument('--repeat', type=int, default=5, help='повторов на замер')
+    parser.add_argument('--searches', type=int, default=50, help='поисков для замера задержки (0 - не мерить)')
+    parser.add_argument('--mode', choices=('session', 'http'), default='session',
+                        help='заглушка API: в сессии requests или локальным HTTP-сервером')
+    parser.add_argument('--recording', help='записанные ответы API (RecordingSession)')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответов заглушки, с')
+    parser.add_argument('--no-memory', action='store_true', help='не мерить пиковую память')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', help='базовый прогон для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='допустимое замедление относительно базового прогона')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа npa-bench; код 1 - есть регрессии относительно --compare"""
+    args = create_parser().parse_args(argv)
+    report = run_benchmarks(args.sizes, args.repeat, args.searches, args.mode, args.recording,
+                            args.latency, args.seed, memory=not args.no_memory)
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare(report, json.load(f), args.threshold)
+        report['comparison'] = {'baseline': args.compare, 'threshold': args.threshold, 'rows': comparison}
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    sys.stderr.write(_format_table(report, comparison) + '\n')
+    sys.stderr.write(f"Результаты: {args.output}\n")
+
+    return 1 if comparison and any(row['regression'] for row in comparison) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
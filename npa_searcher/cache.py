@@ -0,0 +1,80 @@
+"""
+Потокобезопасный LRU-кэш с временем жизни записей
+Используется для результатов поиска и PDF в долгоживущих процессах
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Маркер отсутствия значения (None - допустимое значение кэша)
+_MISSING = object()
+
+class LRUCache:
+    """
+    LRU-кэш ограниченного размера с TTL
+
+    При переполнении вытесняется давно не использованная запись,
+    записи старше ttl считаются отсутствующими.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: максимальное число записей
+            ttl: время жизни записи в секундах (None - без ограничения)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу или default; обновляет порядок использования"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+                del self._data[key]
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранение значения с вытеснением старых записей"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Снимок действующих записей (от давно использованных к недавним)"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (value, expires_at) in self._data.items()
+                    if expires_at is None or expires_at > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Счетчики кэша и доля попаданий"""
+        with self._lock:
+            stats = dict(self.stats, size=len(self._data), maxsize=self.maxsize)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
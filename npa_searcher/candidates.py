@@ -0,0 +1,229 @@
+"""
+Компактные записи кандидатов поиска
+Из ответа /Documents сохраняются только поля, нужные фильтру, скорингу и
+дедупликации, с нижним регистром, посчитанным один раз при разборе.
+Полный JSON элемента доступен лениво: страница ответа хранится байтами
+и разбирается заново, только когда элемент понадобился целиком.
+
+Ответы разбираются декодером из SEARCH_CONFIG['json_decoder']: msgspec
+декодирует items сразу в типизированные записи, пропуская ненужные поля;
+без него используются orjson или стандартный json
+"""
+
+import json
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Callable
+from npa_searcher.config import Config
+from npa_searcher.exceptions import ConfigError
+
+DECODERS = ('msgspec', 'orjson', 'json')
+
+class RawPage:
+    """Исходный ответ API, из которого разобраны кандидаты"""
+
+    __slots__ = ('content', 'key', '_loads', '_items')
+
+    def __init__(self, content: bytes, key: Optional[str] = 'items',
+                 loads: Callable[[bytes], Any] = json.loads):
+        """
+        Args:
+            content: тело ответа
+            key: поле со списком элементов (None - ответ и есть один элемент)
+            loads: функция разбора JSON
+        """
+        self.content = content
+        self.key = key
+        self._loads = loads
+        self._items = None
+
+    def item(self, index: int) -> Dict[str, Any]:
+        """Элемент ответа целиком (копия - вызывающий может его дополнять)"""
+        if self._items is None:
+            self._items = _page_items(self._loads(self.content), self.key)
+        return dict(self._items[index])
+
+def _page_items(data: Any, key: Optional[str]) -> List[Dict[str, Any]]:
+    if key is None:
+        return [data] if data else []
+    if not isinstance(data, dict):
+        return []
+    return data.get(key) or []
+
+class Candidate:
+    """
+    Кандидат поиска: поля фильтра, скоринга и дедупликации
+
+    Example:
+        >>> candidates = parse_candidates(response.content)
+        >>> candidates[0].number_lower, candidates[0].raw['pagesCount']
+    """
+
+    __slots__ = ('eo_number', 'doc_id', 'number', 'name_prefix', 'view_date',
+                 'number_lower', 'name_lower', 'complex_lower',
+                 'score', 'is_amendment', '_page', '_index', '_raw')
+
+    def __init__(self, eo_number: Any, doc_id: Any, number: str, name: str, complex_name: str,
+                 view_date: str, page: Optional[RawPage] = None, index: int = 0,
+                 raw: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            eo_number, doc_id, number, name, complex_name, view_date: поля элемента API
+            page: страница ответа для ленивого доступа к элементу
+            index: номер элемента на странице
+            raw: сам элемент, если страницы нет
+        """
+        self.eo_number = eo_number or ''
+        self.doc_id = doc_id or ''
+        self.number = number or ''
+        name = name or ''
+        self.name_prefix = name[:30]  # ключ дедупликации
+        self.view_date = view_date or ''
+        self.number_lower = self.number.lower()
+        self.name_lower = name.lower()
+        self.complex_lower = (complex_name or '').lower()
+        self.score = 0
+        self.is_amendment = False
+        self._page = page
+        self._index = index
+        self._raw = raw
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any], page: Optional[RawPage] = None, index: int = 0) -> 'Candidate':
+        """Кандидат из элемента ответа (без страницы элемент хранится как есть)"""
+        return cls(item.get('eoNumber'), item.get('id'), item.get('number'), item.get('name'),
+                   item.get('complexName'), item.get('viewDate'), page, index,
+                   item if page is None else None)
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """Полный элемент ответа API"""
+        if self._page is not None:
+            return self._page.item(self._index)
+        return dict(self._raw or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Результат поиска в прежнем формате: элемент API со score и is_amendment"""
+        result = self.raw
+        result['score'] = self.score
+        result['is_amendment'] = self.is_amendment
+        return result
+
+    def __repr__(self) -> str:
+        return f"Candidate({self.eo_number!r}, {self.number!r}, score={self.score})"
+
+def _msgspec_page_decoder():
+    """Типизированный декодер /Documents: только поля Candidate"""
+    import msgspec
+
+    class Item(msgspec.Struct):
+        eoNumber: Optional[str] = None
+        id: Optional[str] = None
+        number: Optional[str] = None
+        name: Optional[str] = None
+        complexName: Optional[str] = None
+        viewDate: Optional[str] = None
+
+    class Page(msgspec.Struct):
+        items: Optional[List[Item]] = None
+
+    return msgspec.json.Decoder(Page), msgspec.ValidationError
+
+class CandidateDecoder:
+    """
+    Разбор ответов API в кандидатов
+
+    msgspec не создает словари для элементов и пропускает неиспользуемые
+    поля; если ответ не соответствует схеме (например, номер - число),
+    страница разбирается обычным способом, и результат не меняется.
+    """
+
+    def __init__(self, backend: str = 'auto'):
+        """
+        Args:
+            backend: 'auto' (msgspec -> orjson -> json), 'msgspec', 'orjson' или 'json'
+        """
+        if backend not in DECODERS + ('auto',):
+            raise ConfigError(f"Неизвестный декодер JSON: {backend}", {'available': list(DECODERS)})
+        if backend == 'auto':
+            backend = available_decoders()[0]
+
+        self.backend = backend
+        self._typed = None
+        self.loads = json.loads
+        if backend == 'msgspec':
+            try:
+                import msgspec
+                self._typed, self._validation_error = _msgspec_page_decoder()
+                self.loads = msgspec.json.decode
+            except ImportError:
+                raise ImportError("Для декодера msgspec установите msgspec")
+        elif backend == 'orjson':
+            try:
+                import orjson
+            except ImportError:
+                raise ImportError("Для декодера orjson установите orjson")
+            self.loads = orjson.loads
+
+    def parse(self, content: bytes, key: Optional[str] = 'items') -> List[Candidate]:
+        """
+        Кандидаты из тела ответа
+
+        Args:
+            content: тело ответа (JSON)
+            key: поле со списком элементов ('items' у /Documents, None у /Document)
+        """
+        page = RawPage(content, key, self.loads)
+        if self._typed is not None and key == 'items':
+            try:
+                data = self._typed.decode(content)
+            except self._validation_error:
+                pass  # не по схеме - разбираем как есть
+            else:
+                return [Candidate(item.eoNumber, item.id, item.number, item.name, item.complexName,
+                                  item.viewDate, page, index)
+                        for index, item in enumerate(data.items or [])]
+
+        items = _page_items(self.loads(content), key)
+        return [Candidate.from_item(item, page, index) for index, item in enumerate(items) if isinstance(item, dict)]
+
+def available_decoders() -> List[str]:
+    """Установленные декодеры в порядке предпочтения"""
+    available = []
+    for name in DECODERS[:-1]:
+        try:
+            __import__(name)
+            available.append(name)
+        except ImportError:
+            continue
+    return available + ['json']
+
+_decoders: Dict[str, CandidateDecoder] = {}
+_decoders_lock = threading.Lock()
+
+def get_decoder(backend: Optional[str] = None) -> CandidateDecoder:
+    """Общий декодер (по умолчанию SEARCH_CONFIG['json_decoder'])"""
+    backend = backend or Config.SEARCH_CONFIG['json_decoder']
+    with _decoders_lock:
+        decoder = _decoders.get(backend)
+        if decoder is None:
+            decoder = _decoders[backend] = CandidateDecoder(backend)
+        return decoder
+
+def parse_candidates(content: bytes, key: Optional[str] = 'items',
+                     decoder: Optional[CandidateDecoder] = None) -> List[Candidate]:
+    """
+    Кандидаты из тела ответа API
+
+    Args:
+        content: тело ответа (JSON)
+        key: поле со списком элементов ('items' у /Documents, None у /Document)
+        decoder: декодер (по умолчанию get_decoder())
+
+    Returns:
+        List кандидатов; разобранные словари не сохраняются
+    """
+    return (decoder or get_decoder()).parse(content, key)
+
+def candidates_from_items(items: Iterable[Dict[str, Any]]) -> List[Candidate]:
+    """Кандидаты из уже разобранных элементов (элементы хранятся как есть)"""
+    return [Candidate.from_item(item) for item in items]
@@ -0,0 +1,172 @@
+"""
+Оконная разбивка текста на чанки
+Чанки выдаются лениво из строки или из файла (mmap + инкрементальное
+декодирование), поэтому потребление памяти не зависит от размера входа
+"""
+
+import os
+import mmap
+import codecs
+import logging
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Перекрытие соседних чанков и зона поиска места разрыва у конца чанка
+CHUNK_OVERLAP = 500
+BREAK_ZONE = 300
+
+# Размер блока чтения файла в байтах
+READ_BLOCK_SIZE = 64 * 1024
+
+def iter_window_chunks(pieces: Iterable[str], max_size: int,
+                       overlap: int = CHUNK_OVERLAP) -> Iterator[str]:
+    """
+    Разбивка потока фрагментов текста на чанки с перекрытием
+
+    В памяти держится только окно чуть больше max_size. Результат совпадает
+    с разбивкой всего текста целиком: разрыв ищется по приоритету
+    двойной перенос > перенос > точка > пробел в последних BREAK_ZONE символах.
+
+    Args:
+        pieces: фрагменты текста в порядке следования
+        max_size: максимальный размер чанка
+        overlap: перекрытие между чанками
+
+    Yields:
+        str: очередной чанк
+    """
+    pieces = iter(pieces)
+    # Окно - buffer[start:]; буфер пересобирается только при дочитывании,
+    # поэтому строка, переданная одним фрагментом, не копируется на каждом чанке
+    buffer = ''
+    start = 0
+    eof = False
+    first = True
+
+    while True:
+        # Дочитываем, пока не станет ясно, последний ли это чанк
+        while not eof and len(buffer) - start <= max_size:
+            try:
+                piece = next(pieces)
+            except StopIteration:
+                eof = True
+                break
+            buffer = buffer[start:] + piece
+            start = 0
+
+        if len(buffer) - start <= max_size:
+            # Последний чанк (или весь текст помещается в один)
+            if len(buffer) > start or first:
+                yield buffer[start:]
+            return
+        first = False
+
+        end = start + max_size
+        # Приоритет разрыва: двойной перенос > одинарный > точка > пробел
+        break_points = [
+            buffer.rfind('\n\n', start, end),
+            buffer.rfind('\n', start, end),
+            buffer.rfind('. ', start, end),
+            buffer.rfind(' ', start, end)
+        ]
+
+        best_break = -1
+        for bp in break_points:
+            if bp - start > max_size - BREAK_ZONE:  # не слишком близко к концу
+                best_break = bp
+                break
+
+        if best_break > start:
+            actual_end = best_break + 1
+            yield buffer[start:actual_end]
+            start = actual_end - overlap  # с перекрытием
+        else:
+            # Если не нашли хорошее место, разрываем по размеру
+            yield buffer[start:end]
+            start = end - overlap
+
+def iter_text_chunks(text: str, max_size: int, overlap: int = CHUNK_OVERLAP) -> Iterator[str]:
+    """
+    Ленивая разбивка строки на чанки
+
+    Args:
+        text: исходный текст
+        max_size: максимальный размер чанка
+        overlap: перекрытие между чанками
+
+    Yields:
+        str: очередной чанк
+    """
+    return iter_window_chunks([text], max_size, overlap)
+
+def iter_decoded_blocks(path: str, encoding: str = 'utf-8',
+                        block_size: int = READ_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Инкрементальное декодирование файла блоками
+
+    Файл отображается в память (mmap); для пустых файлов и систем без
+    mmap используется обычное буферизованное чтение.
+
+    Args:
+        path: путь к файлу
+        encoding: кодировка файла
+        block_size: размер блока в байтах
+
+    Yields:
+        str: декодированные фрагменты текста
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    # BOM в начале UTF-8 файла не является частью текста
+    skip_bom = encoding.replace('-', '').lower() == 'utf8'
+
+    with open(path, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            source = None
+
+        try:
+            position = 0
+            while True:
+                if source is not None:
+                    block = source[position:position + block_size]
+                    position += len(block)
+                else:
+                    block = f.read(block_size)
+
+                if skip_bom:
+                    if block.startswith(codecs.BOM_UTF8):
+                        block = block[len(codecs.BOM_UTF8):]
+                    skip_bom = False
+
+                if not block:
+                    tail = decoder.decode(b'', final=True)
+                    if tail:
+                        yield tail
+                    return
+
+                text = decoder.decode(block)
+                if text:
+                    yield text
+        finally:
+            if source is not None:
+                source.close()
+
+def iter_file_chunks(path: str, max_size: int, encoding: str = 'utf-8',
+                     overlap: int = CHUNK_OVERLAP) -> Iterator[str]:
+    """
+    Ленивая разбивка текстового файла на чанки без загрузки целиком
+
+    Args:
+        path: путь к текстовому файлу
+        max_size: максимальный размер чанка
+        encoding: кодировка файла
+        overlap: перекрытие между чанками
+
+    Yields:
+        str: очередной чанк
+    """
+    logger.debug(f"Оконная разбивка {path} ({os.path.getsize(path)} байт, {encoding})")
+    return iter_window_chunks(iter_decoded_blocks(path, encoding), max_size, overlap)
@@ -0,0 +1,254 @@
+"""
+Командная строка npa-search: пакетная обработка файлов или stdin
+Ход работы выводится одной строкой в stderr, итоговая сводка - JSON в stdout
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from npa_searcher.config import Config
+from npa_searcher.backends import create_backend
+from npa_searcher.export import CATEGORIES, WRITERS, create_writer
+from npa_searcher.processor import NPAProcessor
+from npa_searcher.scheduler import use_priority
+from npa_searcher.instrumentation import stage_metrics
+
+logger = logging.getLogger(__name__)
+
+# Имя журнала в папке кэша
+JOURNAL_NAME = 'npa-search.journal.jsonl'
+
+class Progress:
+    """
+    Строка прогресса в stderr
+
+    В терминале строка перерисовывается на месте не чаще interval секунд,
+    при выводе в файл печатается отдельными строками не чаще раза в report_interval.
+    """
+
+    def __init__(self, total: Optional[int] = None, enabled: bool = True,
+                 stream=None, interval: float = 0.2, report_interval: float = 10.0):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self.interactive = self.stream.isatty()
+        self.interval = interval if self.interactive else report_interval
+        self.started = time.monotonic()
+        self._last = 0.0
+        self.inputs = 0
+        self.counts = {category: 0 for category in CATEGORIES}
+
+    def update(self, results: Dict[str, Any]) -> None:
+        self.inputs += 1
+        for category in CATEGORIES:
+            self.counts[category] += len(results.get(category, []))
+        self._render()
+
+    def _render(self, force: bool = False) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+
+        elapsed = max(now - self.started, 1e-9)
+        documents = sum(self.counts.values())
+        total = f"/{self.total}" if self.total is not None else ''
+        line = (f"файлов {self.inputs}{total} | документов {documents} "
+                f"(найдено {self.counts['successful'] + self.counts['amendments']}, "
+                f"не найдено {self.counts['failed']}, ошибок {self.counts['errors']}) | "
+                f"{documents / elapsed:.1f} док/с")
+        if self.interactive:
+            self.stream.write('\r' + line + '\033[K')
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.inputs:
+            self._render(force=True)
+        if self.enabled and self.interactive and self.inputs:
+            self.stream.write('\n')
+            self.stream.flush()
+
+def _ratio(part: float, total: float) -> float:
+    return round(part / total, 4) if total else 0.0
+
+def build_summary(processor: NPAProcessor, progress: Progress, elapsed: float,
+                  output: str, failed_inputs: int) -> Dict[str, Any]:
+    """
+    Итоговая сводка запуска
+
+    Args:
+        processor: процессор после обработки
+        progress: счетчики результатов
+        elapsed: общее время, с
+        output: файл результатов
+        failed_inputs: входов с ошибками
+
+    Returns:
+        Dict: пропускная способность, вызовы API, попадания в кэш и время по этапам
+    """
+    stats = processor.get_processing_statistics()
+    search_stats = processor.searcher.get_search_statistics()
+    extraction_stats = dict(processor.gpt_helper.extraction_stats)
+    documents = sum(progress.counts.values())
+
+    searches = stats['searches']
+    search_hits = stats['search_cache_hits']
+    chunks = extraction_stats['chunks_processed']
+    chunk_hits = stats['chunk_cache_hits']
+
+    return {
+        'output': output,
+        'inputs': progress.inputs,
+        'failed_inputs': failed_inputs,
+        'documents': dict(progress.counts, total=documents),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput': {
+            'inputs_per_second': round(progress.inputs / elapsed, 3) if elapsed else 0.0,
+            'documents_per_second': round(documents / elapsed, 3) if elapsed else 0.0,
+        },
+        'api_calls': {
+            'pravo': search_stats['api_calls'],
+            'llm': extraction_stats['requests'],
+            'llm_retries': extraction_stats['retries'],
+            'llm_rate_limited': extraction_stats['rate_limited'],
+        },
+        'cache': {
+            'search_hits': search_hits,
+            'search_misses': searches,
+            'search_hit_rate': _ratio(search_hits, search_hits + searches),
+            'chunk_hits': chunk_hits,
+            'chunk_misses': chunks,
+            'chunk_hit_rate': _ratio(chunk_hits, chunk_hits + chunks),
+        },
+        'stages': {
+            'extraction_seconds': round(stats['extraction_seconds'], 3),
+            # Суммарное время поисковых потоков, может превышать общее время
+            'search_seconds': round(stats['search_seconds'], 3),
+        },
+        'scheduler': {
+            'search': processor.searcher.scheduler.get_statistics()['classes'],
+            'extraction': processor.gpt_helper.scheduler.get_statistics()['classes'],
+        },
+    }
+
+def write_stage_metrics(path: str) -> None:
+    """Сохранение гистограмм этапов: .prom - текст Prometheus, иначе JSON-снимок"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith('.prom'):
+            f.write(stage_metrics.prometheus())
+        else:
+            json.dump(stage_metrics.snapshot(), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='npa-search',
+        description='Извлечение упоминаний НПА из текстов и поиск на publication.pravo.gov.ru'
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="файлы txt/docx/pdf, папки или манифесты; без аргументов или '-' - stdin")
+    parser.add_argument('-o', '--output', help='файл результатов (по умолчанию npa_results_<время>.<формат>)')
+    parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                        help='формат результатов (по умолчанию по расширению --output, иначе xlsx)')
+    parser.add_argument('-w', '--workers', type=int, default=Config.PIPELINE_CONFIG['extraction_workers'],
+                        help='сколько файлов обрабатывать параллельно')
+    parser.add_argument('--search-workers', type=int, default=Config.PIPELINE_CONFIG['search_workers'],
+                        help='поисковых потоков на файл')
+    parser.add_argument('--cache-dir',
+                        help='папка журнала: готовые чанки и поиски переиспользуются, '
+                             'запуск возобновляется после сбоя')
+    parser.add_argument('--rate', type=float, default=Config.RATE_LIMIT_CONFIG['requests_per_minute'],
+                        help='лимит запросов к модели в минуту (0 - без лимита)')
+    parser.add_argument('--tpm', type=float, default=Config.RATE_LIMIT_CONFIG['tokens_per_minute'],
+                        help='лимит токенов модели в минуту (0 - без лимита)')
+    parser.add_argument('--backend', default=Config.GPT_CONFIG['backend'], help='провайдер извлечения')
+    parser.add_argument('--base-url', help='адрес OpenAI-совместимого сервера')
+    parser.add_argument('--api-key', help='ключ API (по умолчанию OPENAI_API_KEY)')
+    parser.add_argument('--model', help='модель извлечения')
+    parser.add_argument('--no-letters', action='store_true', help='не искать письма')
+    parser.add_argument('--store', help='папка хранилища результатов для аналитики')
+    parser.add_argument('--priority', default='batch', choices=sorted(Config.SCHEDULER_CONFIG['classes']),
+                        help='класс нагрузки для обращений к API (по умолчанию batch)')
+    parser.add_argument('--summary', help='также сохранить JSON-сводку в файл')
+    parser.add_argument('--metrics', help='замерять этапы и сохранить гистограммы в файл '
+                                          '(.prom - формат Prometheus, иначе JSON)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='без строки прогресса')
+    parser.add_argument('-v', '--verbose', action='store_true', help='подробный лог и вывод по чанкам')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа npa-search"""
+    args = create_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s', stream=sys.stderr)
+
+    Config.PIPELINE_CONFIG['search_workers'] = max(1, args.search_workers)
+    Config.RATE_LIMIT_CONFIG['requests_per_minute'] = args.rate
+    Config.RATE_LIMIT_CONFIG['tokens_per_minute'] = args.tpm
+    if args.model:
+        Config.GPT_CONFIG['model'] = args.model
+    if args.metrics:
+        stage_metrics.enable()
+
+    fmt = args.format or (os.path.splitext(args.output)[1].lstrip('.') if args.output else 'xlsx')
+    output = args.output or f"npa_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+    backend_kwargs = {'api_key': args.api_key}
+    if args.base_url:
+        backend_kwargs['base_url'] = args.base_url
+    processor = NPAProcessor(extraction_backend=create_backend(args.backend, **backend_kwargs),
+                             results_store=args.store)
+    processor.gpt_helper.verbose = args.verbose
+
+    inputs = [path for path in args.inputs if path != '-']
+    use_stdin = not inputs
+    progress = Progress(total=1 if use_stdin else None, enabled=not args.quiet)
+    include_letters = not args.no_letters
+    failed_inputs = 0
+
+    started = time.monotonic()
+    with use_priority(args.priority), create_writer(output, fmt) as writer:
+        if use_stdin:
+            text = sys.stdin.read()
+            results = processor.process_text(text, include_letters, writer=writer)
+            failed_inputs += bool(results['errors'])
+            progress.update(results)
+        else:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Без --cache-dir журнал временный: повторы документов между
+                # файлами все равно ищутся один раз
+                cache_dir = args.cache_dir or temp_dir
+                os.makedirs(cache_dir, exist_ok=True)
+                journal_path = os.path.join(cache_dir, JOURNAL_NAME)
+                for results in processor.process_corpus(inputs, journal_path, include_letters,
+                                                        writer=writer,
+                                                        parallel_inputs=max(1, args.workers)):
+                    failed_inputs += bool(results['errors']
+                                          or results['extraction_info'].get('failed_chunks'))
+                    progress.update(results)
+    progress.close()
+
+    summary = build_summary(processor, progress, time.monotonic() - started, output, failed_inputs)
+    if args.metrics:
+        write_stage_metrics(args.metrics)
+    summary_json = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(summary_json + '\n')
+    sys.stdout.write(summary_json + '\n')
+
+    return 1 if failed_inputs else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
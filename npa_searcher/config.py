@@ -12,6 +12,9 @@ class Config:
     # URL официального API для поиска НПА
     API_BASE_URL = "http://publication.pravo.gov.ru/api"
     
+    # Шаблон адреса PDF документа по номеру электронного опубликования
+    PDF_URL_TEMPLATE = "http://publication.pravo.gov.ru/file/pdf?eoNumber={eo_number}"
+    
     # HTTP заголовки для имитации браузера
     DEFAULT_HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -22,33 +25,13 @@ class Config:
         'Upgrade-Insecure-Requests': '1',
     }
     
-    # База знаний известных документов
-    KNOWN_DOCUMENTS = {
-        '1490': {
-            'keywords': ['лицензировани', 'образовательн'],
-            'eo_hints': ['0001202009250006'],
-            'description': 'О лицензировании образовательной деятельности'
-        },
-        '825': {
-            'keywords': ['федеральной информационной системе', 'фрдо'],
-            'eo_hints': [],
-            'description': 'О федеральной информационной системе ФРДО'
-        },
-        '580': {
-            'keywords': ['профессиональн', 'стандарт'],
-            'eo_hints': ['0001202304110042'],
-            'description': 'О разработке и утверждении профессиональных стандартов'
-        },
-        '719': {
-            'keywords': ['государственной информационной системе'],
-            'eo_hints': [],
-            'description': 'О государственной информационной системе'
-        },
-        '273-фз': {
-            'keywords': ['образовани', 'российской федерации'],
-            'eo_hints': ['0001201212300007'],
-            'description': 'Об образовании в Российской Федерации'
-        }
+    # База известных документов (npa_searcher.knowledge_base)
+    KNOWLEDGE_BASE_CONFIG = {
+        'path': None,              # JSON-файл базы; None - встроенный known_documents.json (только чтение)
+        'reload_interval': 5.0,    # проверка изменения файла не чаще, с
+        'resolve_directly': True,  # запись с элементом API (document) - результат без обращений к API
+        'learn': False,            # запоминать документы, найденные с баллом не ниже min_learn_score
+        'min_learn_score': 11000   # точный номер + 3 слова названия
     }
     
     # Ключевые слова для определения изменений в НПА
@@ -69,22 +52,154 @@ class Config:
     
     # Настройки для GPT
     GPT_CONFIG = {
-        'model': 'gpt-3.5-turbo',
+        'backend': 'openai',
+        'model': 'gpt-4o-mini',
         'temperature': 0.1,
         'max_tokens': 4000,
-        'chunk_size': 6000
+        'chunk_size': 6000,
+        # Параллельные запросы к модели; повторы делает планировщик, а не клиент
+        'max_concurrency': 4,
+        'client_max_retries': 0,
+        # Пакетный режим (Batch API) для ночных прогонов
+        'batch_dir': 'batch_jobs',
+        'batch_poll_interval': 30,
+        'batch_completion_window': '24h'
+    }
+    
+    # Лимиты OpenAI API для планировщика запросов
+    RATE_LIMIT_CONFIG = {
+        'requests_per_minute': 500,
+        'tokens_per_minute': 200000,
+        'chars_per_token': 3.0,   # оценка без tiktoken (кириллица)
+        'max_attempts': 5         # попыток на чанк до фиксации ошибки
+    }
+    
+    # Запросы NPASearcher к API pravo.gov.ru
+    SEARCH_CONFIG = {
+        'request_delay': 0.5,     # пауза после каждого запроса стратегии, с
+        'json_decoder': 'auto',   # разбор ответов: auto (msgspec -> orjson -> json), msgspec, orjson, json
+        'title_query_stems': True # поиск по названию основами слов (MORPHOLOGY_CONFIG), без повторов
+    }
+    
+    # Нормализация словоформ к основам (npa_searcher.morphology)
+    MORPHOLOGY_CONFIG = {
+        'backend': 'auto',        # auto (pymorphy -> snowball -> builtin), pymorphy, snowball, builtin
+        'cache_size': 200000,     # словоформ в таблице основ
+        'memo_path': None,        # JSON-файл таблицы основ (WordNormalizer.save); None - только в памяти
+        'min_stem_length': 4      # более короткая основа ищется только с начала слова
+    }
+    
+    # Локальный индекс названий (npa_searcher.name_index, npa-index build)
+    NAME_INDEX_CONFIG = {
+        'path': None,                 # файл индекса .npz; None или нет файла - без индекса
+        'limit': 20,                  # кандидатов из индекса на поиск
+        'replace_title_queries': False  # с индексом не отправлять запросы по названию в API
+    }
+    
+    # Конвейер NPAProcessor: извлечение -> очередь -> пул поисковых потоков
+    PIPELINE_CONFIG = {
+        'search_workers': 4,
+        'queue_size': 50,
+        'extraction_workers': 2   # параллельно извлекаемых текстов в process_texts
+    }
+    
+    # Бюджет времени запроса (deadline / timeout_budget)
+    DEADLINE_CONFIG = {
+        # Доля бюджета на извлечение; поиск идет параллельно и использует весь бюджет
+        'extraction_share': 0.6,
+        'service_timeout_budget': None   # бюджет запросов сервиса по умолчанию, с
+    }
+    
+    # Приоритеты нагрузки: взвешенная очередь к API с резервом для интерактивных запросов
+    SCHEDULER_CONFIG = {
+        'capacity': {
+            'search': 4,          # одновременных запросов к API pravo.gov.ru
+            'extraction': 4       # одновременных запросов к модели
+        },
+        'classes': {
+            'interactive': {'weight': 4.0, 'reserved_share': 0.25},
+            'batch': {'weight': 1.0}
+        },
+        'default_class': 'interactive'
+    }
+    
+    # Кэши долгоживущего процесса (сервис)
+    CACHE_CONFIG = {
+        'search_maxsize': 10000,
+        'search_ttl': 3600,       # секунд; результаты поиска на сайте меняются редко
+        'pdf_maxsize': 32         # PDF в памяти, штук
+    }
+    
+    # HTTP-сервис npa-service
+    SERVICE_CONFIG = {
+        'host': '127.0.0.1',
+        'port': 8080,
+        'workers': 8,                  # пул потоков для обработки запросов
+        'max_concurrent': {            # одновременных запросов по видам
+            'process_text': 2,
+            'search_document': 8,
+            'pdf': 4
+        },
+        'queue_timeout': 5.0,          # ожидание свободного места, затем 503
+        'max_body_bytes': 5 * 1024 * 1024
+    }
+    
+    # Инструментирование этапов: гистограммы длительности, выгрузка Prometheus/JSON
+    INSTRUMENTATION_CONFIG = {
+        'enabled': False,
+        'env_var': 'NPA_INSTRUMENTATION',   # NPA_INSTRUMENTATION=1 включает без изменения кода
+        'buckets': (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    }
+    
+    # Профилирование точек входа по запросу (см. npa_searcher.profiling)
+    PROFILING_CONFIG = {
+        'sample_rate': 0.0,          # доля профилируемых вызовов; 0 - выключено
+        'mode': 'stack',             # 'stack' - выборка стеков всех потоков, 'cprofile' - детерминированный
+        'output_dir': 'profiles',
+        'sample_interval': 0.01,     # период выборки стеков, с
+        'tracemalloc': True,         # память по этапам и строкам кода
+        'tracemalloc_frames': 1,
+        'top': 30,                   # строк в отчетах
+        'env_vars': {
+            'sample_rate': 'NPA_PROFILE',
+            'mode': 'NPA_PROFILE_MODE',
+            'output_dir': 'NPA_PROFILE_DIR'
+        }
+    }
+    
+    # Хранилище результатов для аналитики по прошлым запускам
+    RESULTS_STORE_CONFIG = {
+        'path': None,             # папка хранилища; None - не сохранять
+        'row_group_size': 100000
     }
     
     # Настройки скоринга релевантности
     SCORING_CONFIG = {
         'exact_number_match': 8000,
         'clean_number_match': 7000,
-        'partial_number_match': 6000,
+        'partial_number_match': 6000,        # очищенный номер внутри номера кандидата
+        'weak_partial_number_match': 3000,   # то же, но номер занимает не больше partial_number_ratio
+        'partial_number_ratio': 0.5,
+        'contained_number_match': 4000,      # номер кандидата внутри очищенного номера
         'title_match_3_words': 3000,
         'title_match_2_words': 1500,
         'title_match_1_word': 500,
+        'title_mode': 'words',               # 'words' - число слов названия, 'stems' - то же по основам слов,
+                                             # 'tfidf' - TITLE_SIMILARITY_CONFIG
         'type_match_bonus': 400,
         'amendment_penalty': 1000,
+        'amendment_score_cap': 1000,         # максимальный балл изменений
         'general_number_penalty': 2000,
-        'min_score_threshold': 500
+        'min_score_threshold': 500,
+        # Бонус за актуальность: засчитывается первый найденный в дате год
+        'year_bonuses': {'2024': 250, '2023': 200, '2022': 150, '2021': 100, '2020': 50}
+    }
+    
+    # Сходство названий по символьным n-граммам (SCORING_CONFIG['title_mode'] = 'tfidf')
+    TITLE_SIMILARITY_CONFIG = {
+        'ngram_range': (3, 4),
+        'weight': 3000,              # балл за полное совпадение (как title_match_3_words)
+        'min_similarity': 0.2,       # ниже - 0 баллов
+        'max_documents': 1000000,    # названий в частотах словаря
+        'vocabulary_path': None      # файл словаря (TitleVectorizer.save); None - только в памяти
     }
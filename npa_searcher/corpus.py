@@ -0,0 +1,131 @@
+"""
+Источники корпуса для потоковой обработки
+Обход папки или манифеста и чтение txt/docx/pdf по одному файлу
+"""
+
+import os
+import json
+import codecs
+import logging
+from typing import Iterator, Tuple
+from npa_searcher.exceptions import InvalidDocumentError
+
+logger = logging.getLogger(__name__)
+
+# Поддерживаемые форматы входных файлов
+SUPPORTED_EXTENSIONS = ('.txt', '.docx', '.pdf')
+
+# Расширения файлов-манифестов
+MANIFEST_EXTENSIONS = ('.lst', '.manifest', '.jsonl')
+
+def iter_corpus_files(source: str) -> Iterator[Tuple[str, str]]:
+    """
+    Перечисление входных файлов корпуса
+
+    Источник может быть:
+        - папкой: все файлы txt/docx/pdf рекурсивно, в отсортированном порядке
+        - манифестом .lst/.manifest: один путь на строку
+        - манифестом .jsonl: объекты {"path": ..., "id": ...}
+        - отдельным файлом
+
+    Пути в манифесте считаются относительно папки манифеста.
+
+    Args:
+        source: путь к папке, манифесту или файлу
+
+    Yields:
+        Tuple: (стабильный идентификатор входа, путь к файлу)
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+        return
+
+    if not os.path.exists(source):
+        raise InvalidDocumentError(f"Источник корпуса не найден: {source}")
+
+    lower = source.lower()
+    if not lower.endswith(MANIFEST_EXTENSIONS):
+        yield os.path.basename(source), source
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            if lower.endswith('.jsonl'):
+                item = json.loads(line)
+                path = item['path']
+                input_id = str(item.get('id') or path)
+            else:
+                path = input_id = line
+
+            yield input_id, os.path.join(base_dir, path)
+
+def is_plain_text(path: str) -> bool:
+    """Является ли файл простым текстом (читается окнами, без парсинга)"""
+    return not path.lower().endswith(('.docx', '.pdf'))
+
+def detect_encoding(path: str, sample_size: int = 64 * 1024) -> str:
+    """
+    Определение кодировки текстового файла по его началу
+
+    Args:
+        path: путь к файлу
+        sample_size: сколько байт проверять
+
+    Returns:
+        str: 'utf-8' или 'cp1251' для старых выгрузок
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    try:
+        # final=False: обрезанный на границе блока символ не считается ошибкой
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1251'
+
+def read_document(path: str) -> str:
+    """
+    Чтение текста входного файла
+
+    Args:
+        path: путь к файлу txt, docx или pdf
+
+    Returns:
+        str: текст документа
+    """
+    lower = path.lower()
+
+    if lower.endswith('.docx'):
+        try:
+            import docx
+        except ImportError:
+            raise ImportError("Для чтения .docx установите python-docx")
+        document = docx.Document(path)
+        return '\n'.join(paragraph.text for paragraph in document.paragraphs)
+
+    if lower.endswith('.pdf'):
+        try:
+            import fitz
+        except ImportError:
+            raise ImportError("Для чтения .pdf установите PyMuPDF")
+        with fitz.open(path) as pdf:
+            return '\n'.join(page.get_text() for page in pdf)
+
+    # Текстовые файлы: UTF-8, для старых выгрузок - cp1251
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        logger.debug(f"{path}: не UTF-8, читаем как cp1251")
+        return raw.decode('cp1251')
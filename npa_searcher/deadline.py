@@ -0,0 +1,103 @@
+"""
+Бюджет времени запроса
+Крайний срок передается по этапам обработки: этапы уменьшают таймауты
+обращений к API и прекращают новую работу, когда время вышло
+"""
+
+import time
+from typing import Optional, Union
+from npa_searcher.exceptions import DeadlineExceededError
+
+class Deadline:
+    """
+    Крайний срок по монотонным часам
+
+    Example:
+        >>> deadline = Deadline.from_budget(2.0)
+        >>> response = session.get(url, timeout=deadline.timeout(10))
+    """
+
+    def __init__(self, expires_at: float, budget: Optional[float] = None):
+        """
+        Args:
+            expires_at: момент истечения по time.monotonic()
+            budget: исходный бюджет в секундах (для отчета)
+        """
+        self.expires_at = expires_at
+        self.budget = budget
+
+    @classmethod
+    def from_budget(cls, seconds: float) -> 'Deadline':
+        """Крайний срок через seconds секунд от текущего момента"""
+        seconds = float(seconds)
+        if seconds <= 0:
+            raise ValueError(f"Бюджет времени должен быть положительным: {seconds}")
+        return cls(time.monotonic() + seconds, seconds)
+
+    @classmethod
+    def resolve(cls, deadline: Union['Deadline', float, None] = None,
+                timeout_budget: Optional[float] = None) -> Optional['Deadline']:
+        """
+        Крайний срок из параметров публичных методов
+
+        Args:
+            deadline: Deadline или момент времени по time.time()
+            timeout_budget: бюджет в секундах от текущего момента
+
+        Returns:
+            Более ранний из двух сроков или None, если не задан ни один
+        """
+        if deadline is not None and not isinstance(deadline, Deadline):
+            remaining = float(deadline) - time.time()
+            deadline = cls(time.monotonic() + remaining, max(remaining, 0.0))
+        if timeout_budget is not None:
+            budget = cls.from_budget(timeout_budget)
+            if deadline is None or budget.expires_at < deadline.expires_at:
+                deadline = budget
+        return deadline
+
+    def remaining(self) -> float:
+        """Оставшееся время в секундах (не меньше 0)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def elapsed(self) -> Optional[float]:
+        """Сколько времени бюджета израсходовано"""
+        if self.budget is None:
+            return None
+        return self.budget - (self.expires_at - time.monotonic())
+
+    def share(self, fraction: float) -> 'Deadline':
+        """Срок для этапа: доля fraction от оставшегося времени"""
+        return Deadline(time.monotonic() + self.remaining() * fraction)
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """
+        Таймаут обращения: не больше default и оставшегося времени
+
+        Raises:
+            DeadlineExceededError: время уже вышло
+        """
+        remaining = self.check()
+        return remaining if default is None else min(default, remaining)
+
+    def check(self, stage: str = '') -> float:
+        """
+        Проверка срока перед началом работы
+
+        Returns:
+            float: оставшееся время
+
+        Raises:
+            DeadlineExceededError: время вышло
+        """
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            where = f" ({stage})" if stage else ''
+            raise DeadlineExceededError(f"Истек бюджет времени запроса{where}")
+        return remaining
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
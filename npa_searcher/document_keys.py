@@ -0,0 +1,90 @@
+"""
+Канонические ключи документов
+Один способ нормализации типа, номера и даты для всех модулей: ключи кэша
+поиска, дедупликации извлеченных документов, журнала и поиска в базе
+известных документов. "№ 273-ФЗ", "273-фз" и "N273 ФЗ" дают один ключ.
+
+Нормализация кэшируется по исходной строке, результаты интернируются:
+повторяющиеся номера не проходят регулярные выражения заново, а равные
+ключи - один и тот же объект
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, Any, Mapping, NamedTuple
+
+_CACHE_SIZE = 65536
+
+# Знак номера в начале: №, #, N°, No., N перед цифрой или пробелом
+_NUMBER_SIGN = re.compile(r'^(?:№|#|n°|no\.|n(?=[\s\d]))\s*')
+# Разделители внутри номера: пробелы, дефисы и тире, подчеркивания, знаки номера
+_SEPARATORS = re.compile(r'[\s\-‐‑‒–—―−_№#°]+')
+_CYRILLIC = re.compile('[а-я]')
+# Латинские буквы, похожие на кириллические: в номерах с кириллицей ("ПP-12" с латинской P) заменяются
+_LOOKALIKES = str.maketrans('aeopcxykmthb', 'аеорсхукмтнв')
+_DATE_DOTTED = re.compile(r'^(\d{1,2})[./](\d{1,2})[./](\d{4})')
+_DATE_ISO = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+class DocumentKey(NamedTuple):
+    """Канонический ключ документа; text - строка для дедупликации и журнала"""
+    type: str
+    number: str
+    date: str
+    text: str
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonical_number(number: str) -> str:
+    """
+    Канонический номер: нижний регистр, без знака номера и разделителей
+
+    Example:
+        >>> canonical_number('№ 273-ФЗ'), canonical_number('N273 фз'), canonical_number('ПP-12')
+        ('273фз', '273фз', 'пр12')
+    """
+    number = str(number or '').strip().lower().replace('ё', 'е')
+    number = _NUMBER_SIGN.sub('', number)
+    number = _SEPARATORS.sub('', number)
+    if _CYRILLIC.search(number):
+        number = number.translate(_LOOKALIKES)
+    return sys.intern(number)
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonical_type(doc_type: str) -> str:
+    """Тип документа: нижний регистр, ё -> е, одиночные пробелы"""
+    return sys.intern(' '.join(str(doc_type or '').lower().replace('ё', 'е').split()))
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonical_date(date: str) -> str:
+    """Дата в виде ГГГГ-ММ-ДД ('25.09.2020', '2020-09-25T00:00:00'); нераспознанная - как есть"""
+    date = str(date or '').strip()
+    match = _DATE_DOTTED.match(date)
+    if match:
+        day, month, year = match.groups()
+        return sys.intern(f"{year}-{int(month):02d}-{int(day):02d}")
+    match = _DATE_ISO.match(date)
+    if match:
+        return sys.intern('-'.join(match.groups()))
+    return sys.intern(date.lower())
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _document_key(doc_type: str, number: str, date: str) -> DocumentKey:
+    key_type, key_number = canonical_type(doc_type), canonical_number(number)
+    return DocumentKey(key_type, key_number, canonical_date(date), sys.intern(f"{key_type}_{key_number}"))
+
+def document_key(doc: Mapping[str, Any]) -> DocumentKey:
+    """
+    Ключ документа (type, number, date)
+
+    text = "тип_номер" без даты: одно упоминание документа часто приходит
+    с датой, другое - без нее.
+
+    Example:
+        >>> document_key({'type': 'Федеральный закон', 'number': '№ 273-ФЗ'}).text
+        'федеральный закон_273фз'
+    """
+    return _document_key(str(doc.get('type') or ''), str(doc.get('number') or ''), str(doc.get('date') or ''))
+
+def canonical_index(mapping: Mapping[str, Any]) -> Dict[str, Any]:
+    """Словарь по номерам -> словарь по каноническим номерам ('273-фз' и '273-ФЗ' -> '273фз')"""
+    return {canonical_number(number): value for number, value in mapping.items()}
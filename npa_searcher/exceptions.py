@@ -56,6 +56,26 @@ class GPTError(NPASearchError):
     """
     pass
 
+class RateLimitError(GPTError):
+    """
+    Превышен лимит запросов API (HTTP 429)
+    """
+    
+    def __init__(self, message: str, retry_after: float = None):
+        """
+        Инициализация ошибки лимита
+        
+        Args:
+            message: описание ошибки
+            retry_after: рекомендованная пауза в секундах (заголовок Retry-After)
+        """
+        details = {}
+        if retry_after is not None:
+            details['retry_after'] = retry_after
+            
+        super().__init__(message, details)
+        self.retry_after = retry_after
+
 class ConfigError(NPASearchError):
     """
     Ошибки конфигурации модуля
@@ -74,6 +94,26 @@ class InvalidDocumentError(NPASearchError):
     """
     pass
 
+class ServiceBusyError(NPASearchError):
+    """
+    Сервис перегружен: нет свободного места для запроса
+    """
+    
+    def __init__(self, message: str, retry_after: float = None):
+        """
+        Args:
+            message: описание ошибки
+            retry_after: рекомендованная пауза в секундах
+        """
+        super().__init__(message, {'retry_after': retry_after} if retry_after is not None else {})
+        self.retry_after = retry_after
+
+class DeadlineExceededError(NPASearchError):
+    """
+    Истек бюджет времени запроса (deadline / timeout_budget)
+    """
+    pass
+
 
 # Добавлено для интеграции с профстандартами
 class NPAError(Exception):
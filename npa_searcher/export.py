@@ -0,0 +1,291 @@
+"""
+Потоковый экспорт результатов обработки
+Строки дописываются по мере готовности результатов: Excel (write-only режим
+openpyxl), CSV и Parquet. Память не зависит от числа строк.
+"""
+
+import os
+import csv
+import json
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from npa_searcher.config import Config
+from npa_searcher.exceptions import ConfigError
+from npa_searcher.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# Категории результатов в порядке листов/файлов
+CATEGORIES = ('successful', 'amendments', 'failed', 'errors')
+
+# Названия листов Excel
+SHEET_TITLES = {
+    'successful': 'Найденные',
+    'amendments': 'Изменения',
+    'failed': 'Не найденные',
+    'errors': 'Ошибки'
+}
+
+# Колонки экспорта и их типы (для Parquet)
+COLUMNS = [
+    ('source', 'string'),
+    ('doc_type', 'string'),
+    ('doc_number', 'string'),
+    ('doc_title', 'string'),
+    ('found_name', 'string'),
+    ('found_number', 'string'),
+    ('eo_number', 'string'),
+    ('publish_date', 'string'),
+    ('score', 'int64'),
+    ('is_amendment', 'bool_'),
+    ('pdf_url', 'string'),
+    ('alternatives', 'int64'),
+    ('mentioned_in', 'string'),
+    ('reason', 'string'),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+def result_to_row(category: str, entry: Dict[str, Any], source: Any = None) -> Dict[str, Any]:
+    """
+    Преобразование записи результата в плоскую строку экспорта
+
+    Args:
+        category: категория (successful, amendments, failed, errors)
+        entry: запись результата из NPAProcessor
+        source: источник (файл/текст), если известен
+
+    Returns:
+        Dict: строка с колонками COLUMN_NAMES
+    """
+    document = entry.get('document') or {}
+    best_match = entry.get('best_match') or {}
+    eo_number = best_match.get('eoNumber', '')
+    mentioned_in = entry.get('mentioned_in')
+
+    return {
+        'source': '' if source is None else str(source),
+        'doc_type': str(document.get('type', '')),
+        'doc_number': str(document.get('number', '')),
+        'doc_title': str(document.get('title', '')),
+        'found_name': best_match.get('name', ''),
+        'found_number': best_match.get('number', ''),
+        'eo_number': eo_number,
+        'publish_date': best_match.get('viewDate', ''),
+        'score': int(entry.get('score') or 0),
+        'is_amendment': bool(best_match.get('is_amendment', category == 'amendments')),
+        'pdf_url': Config.PDF_URL_TEMPLATE.format(eo_number=eo_number) if eo_number else '',
+        'alternatives': len(entry.get('alternatives') or []),
+        'mentioned_in': json.dumps(mentioned_in, ensure_ascii=False, default=str) if mentioned_in else '',
+        'reason': entry.get('reason') or entry.get('error') or '',
+    }
+
+def iter_result_rows(results: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Перебор строк экспорта из словаря результатов
+
+    Args:
+        results: результаты process_text / process_file
+
+    Yields:
+        Tuple: (категория, строка)
+    """
+    source = results.get('source')
+    for category in CATEGORIES:
+        for entry in results.get(category, []):
+            yield category, result_to_row(category, entry, source)
+
+class ResultWriter:
+    """
+    Базовый потоковый писатель результатов
+    Потокобезопасен: write() вызывается из поисковых потоков конвейера
+    """
+
+    format = None
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: путь к файлу (для CSV/Parquet - основа имен файлов по категориям)
+        """
+        self.path = path
+        self.rows_written = {category: 0 for category in CATEGORIES}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, category: str, entry: Dict[str, Any], source: Any = None) -> None:
+        """Дописать запись результата в свою категорию"""
+        self.write_row(category, result_to_row(category, entry, source))
+
+    @timed('export.write_row')
+    def write_row(self, category: str, row: Dict[str, Any]) -> None:
+        """Дописать готовую строку экспорта"""
+        if category not in self.rows_written:
+            raise ConfigError(f"Неизвестная категория результатов: {category}")
+        with self._lock:
+            self._write_row(category, row)
+            self.rows_written[category] += 1
+
+    def write_results(self, results: Dict[str, Any]) -> None:
+        """Дописать все записи словаря результатов"""
+        for category, row in iter_result_rows(results):
+            self.write_row(category, row)
+
+    def _write_row(self, category: str, row: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        pass
+
+    @timed('export.close')
+    def close(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._close()
+                self._closed = True
+        logger.info(f"Экспорт {self.format} завершен: {self.path} ({sum(self.rows_written.values())} строк)")
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _category_path(self, category: str, extension: str) -> str:
+        """Файл категории: results.csv -> results_successful.csv"""
+        stem = os.path.splitext(self.path)[0]
+        return f"{stem}_{category}{extension}"
+
+class ExcelResultWriter(ResultWriter):
+    """
+    Excel в write-only режиме openpyxl
+    Строки сразу уходят во временные файлы листов, в памяти не копятся
+    """
+
+    format = 'xlsx'
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheets = {}
+
+    def _sheet(self, category: str):
+        sheet = self._sheets.get(category)
+        if sheet is None:
+            sheet = self._workbook.create_sheet(SHEET_TITLES[category])
+            sheet.append(COLUMN_NAMES)
+            self._sheets[category] = sheet
+        return sheet
+
+    def _write_row(self, category: str, row: Dict[str, Any]) -> None:
+        self._sheet(category).append([row[name] for name in COLUMN_NAMES])
+
+    def _close(self) -> None:
+        # Пустой файл без листов openpyxl не сохраняет
+        if not self._sheets:
+            self._sheet('successful')
+        self._workbook.save(self.path)
+
+class CSVResultWriter(ResultWriter):
+    """CSV: отдельный файл на каждую категорию (<имя>_<категория>.csv)"""
+
+    format = 'csv'
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._files = {}
+        self._writers = {}
+
+    def _writer(self, category: str):
+        writer = self._writers.get(category)
+        if writer is None:
+            # utf-8-sig - чтобы Excel корректно открывал кириллицу
+            f = open(self._category_path(category, '.csv'), 'w', encoding='utf-8-sig', newline='')
+            writer = csv.DictWriter(f, fieldnames=COLUMN_NAMES)
+            writer.writeheader()
+            self._files[category] = f
+            self._writers[category] = writer
+        return writer
+
+    def _write_row(self, category: str, row: Dict[str, Any]) -> None:
+        self._writer(category).writerow(row)
+
+    def _close(self) -> None:
+        for f in self._files.values():
+            f.close()
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Parquet (pyarrow): отдельный файл на категорию, строки пишутся
+    группами по row_group_size
+    """
+
+    format = 'parquet'
+
+    def __init__(self, path: str, row_group_size: int = 50000):
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для экспорта в Parquet установите pyarrow")
+
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([(name, getattr(pa, dtype)()) for name, dtype in COLUMNS])
+        self.row_group_size = row_group_size
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._writers = {}
+
+    def _flush(self, category: str) -> None:
+        rows = self._buffers.get(category)
+        if not rows:
+            return
+        writer = self._writers.get(category)
+        if writer is None:
+            writer = self._pq.ParquetWriter(self._category_path(category, '.parquet'), self.schema)
+            self._writers[category] = writer
+        writer.write_table(self._pa.Table.from_pylist(rows, schema=self.schema))
+        self._buffers[category] = []
+
+    def _write_row(self, category: str, row: Dict[str, Any]) -> None:
+        buffer = self._buffers.setdefault(category, [])
+        buffer.append(row)
+        if len(buffer) >= self.row_group_size:
+            self._flush(category)
+
+    def _close(self) -> None:
+        for category in list(self._buffers):
+            self._flush(category)
+        for writer in self._writers.values():
+            writer.close()
+
+# Писатели по формату
+WRITERS = {
+    'xlsx': ExcelResultWriter,
+    'csv': CSVResultWriter,
+    'parquet': ParquetResultWriter,
+}
+
+def create_writer(path: str, fmt: Optional[str] = None) -> ResultWriter:
+    """
+    Создание писателя по формату или расширению файла
+
+    Args:
+        path: путь к файлу результатов
+        fmt: формат (xlsx, csv, parquet); по умолчанию - по расширению
+
+    Returns:
+        ResultWriter: потоковый писатель
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or 'xlsx').lower()
+    if fmt == 'xls':
+        fmt = 'xlsx'
+    if fmt not in WRITERS:
+        raise ConfigError(f"Неподдерживаемый формат экспорта: {fmt}", {'available': sorted(WRITERS)})
+    return WRITERS[fmt](path)
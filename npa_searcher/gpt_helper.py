@@ -3,54 +3,353 @@ GPT помощник для извлечения документов из не
 Использует OpenAI API для анализа текста и извлечения списка НПА
 """
 
+import os
+import glob
 import json
 import time
-from typing import List, Dict, Any
-import openai
+import hashlib
+import heapq
+import itertools
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from npa_searcher.config import Config
+from npa_searcher.exceptions import GPTError, DeadlineExceededError
+from npa_searcher.backends import ExtractionBackend, create_backend
+from npa_searcher.rate_limiter import TokenRateLimiter, estimate_request_tokens
+from npa_searcher.chunking import iter_text_chunks, iter_file_chunks
+from npa_searcher.scheduler import PriorityScheduler, get_scheduler, submit_with_context
+from npa_searcher.deadline import Deadline
+from npa_searcher.instrumentation import stage_metrics, timed
+from npa_searcher.profiling import profiled
+from npa_searcher import document_keys
+
+logger = logging.getLogger(__name__)
+
+# Статусы пакетного задания, после которых опрос прекращается
+BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
 
 class GPTHelper:
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None,
+                 base_url: Optional[str] = None, backend: Optional[ExtractionBackend] = None,
+                 rate_limiter: Optional[TokenRateLimiter] = None, verbose: bool = True,
+                 scheduler: Optional[PriorityScheduler] = None):
         """
         Инициализация GPTHelper с улучшениями
         
         Args:
             api_key: OpenAI API ключ
-            model: Модель GPT (по умолчанию gpt-4o-mini для лучшего качества)
+            model: Модель GPT (по умолчанию из Config.GPT_CONFIG['model'])
+            base_url: адрес OpenAI-совместимого сервера (по умолчанию официальный API)
+            backend: готовый провайдер извлечения (вместо api_key/base_url)
+            rate_limiter: ограничитель RPM/TPM (по умолчанию из Config.RATE_LIMIT_CONFIG)
+            verbose: печатать ход обработки по чанкам
+            scheduler: планировщик приоритетов (по умолчанию общий для процесса)
         """
-        self.client = openai.OpenAI(api_key=api_key)
-        self.model = model
+        if backend is None:
+            backend = create_backend(api_key=api_key, base_url=base_url)
+        self.backend = backend
+        self.model = model or Config.GPT_CONFIG['model']
+        self.rate_limiter = rate_limiter or TokenRateLimiter()
+        self.verbose = verbose
+        self.scheduler = scheduler or get_scheduler('extraction')
+
+        # Статистика извлечения
+        self.extraction_stats = {
+            'chunks_processed': 0,
+            'requests': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'failed_chunks': 0,
+            'timed_out_chunks': 0
+        }
 
-    def extract_documents(self, text: str) -> Dict[str, List[Dict[str, Any]]]:
+    @profiled('gpt.extract_documents')
+    def extract_documents(self, text: str,
+                          on_document: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          on_chunk: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+                          done_chunks: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+                          deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Извлечение документов из текста с улучшениями
         
         Args:
             text: Текст для анализа
+            on_document: Вызывается для каждого нового уникального документа
+                сразу по завершении его чанка (для конвейерной обработки)
+            on_chunk: Вызывается с (индекс, документы) после успешной обработки чанка
+            done_chunks: Результаты уже обработанных чанков (например, из журнала) -
+                для них запросы к модели не выполняются
+            deadline: Крайний срок: после него новые чанки не отправляются,
+                незавершенные попадают в failed_chunks с признаком timed_out
             
         Returns:
             Словарь с извлеченными документами по категориям
         """
         # Увеличиваем размер чанка для лучшей обработки
         max_chunk_size = 5000
-        text_chunks = self._split_text(text, max_chunk_size)
+        self._report(f"📄 Обрабатываем текст ({len(text)} символов), все чанки")
+        
+        return self._extract_chunks(iter_text_chunks(text, max_chunk_size),
+                                    on_document, on_chunk, done_chunks, deadline)
+
+    @profiled('gpt.extract_documents_from_file')
+    def extract_documents_from_file(self, path: str, encoding: str = 'utf-8',
+                                    on_document: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                    on_chunk: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+                                    done_chunks: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+                                    deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Извлечение документов из текстового файла без загрузки его целиком
+        
+        Файл читается окнами (mmap + инкрементальное декодирование), чанки
+        создаются лениво по мере освобождения места в планировщике, поэтому
+        потребление памяти не зависит от размера файла.
+        
+        Args:
+            path: Путь к текстовому файлу
+            encoding: Кодировка файла
+            on_document, on_chunk, done_chunks, deadline: как в extract_documents
+            
+        Returns:
+            Словарь с извлеченными документами по категориям
+        """
+        max_chunk_size = 5000
+        self._report(f"📄 Обрабатываем файл {path}, все чанки")
+        
+        return self._extract_chunks(iter_file_chunks(path, max_chunk_size, encoding),
+                                    on_document, on_chunk, done_chunks, deadline)
+
+    def _extract_chunks(self, text_chunks: Iterable[str],
+                        on_document: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        on_chunk: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+                        done_chunks: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+                        deadline: Optional[Deadline] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Извлечение документов из потока чанков
+        
+        Args:
+            text_chunks: Чанки текста (читаются лениво)
+            on_document, on_chunk, done_chunks, deadline: как в extract_documents
+            
+        Returns:
+            Словарь с извлеченными документами по категориям
+        """
+        chunk_documents = {}
+        failed_chunks = []
+        streamed_keys = set()
+        done_chunks = done_chunks or {}
+
+        chunk_results = itertools.chain(
+            ((index, docs, None) for index, docs in sorted(done_chunks.items())),
+            self._iter_chunk_results(text_chunks, skip=done_chunks, deadline=deadline)
+        )
+        for index, chunk_docs, error in chunk_results:
+            if error is not None:
+                self._report(f"❌ Чанк {index + 1}: {str(error)[:60]}")
+                failed = {'chunk': index, 'error': str(error)}
+                if isinstance(error, DeadlineExceededError):
+                    failed['timed_out'] = True
+                failed_chunks.append(failed)
+                continue
+            chunk_documents[index] = chunk_docs
+            if index in done_chunks:
+                self._report(f"♻️ Чанк {index + 1} ({len(chunk_docs)})")
+            else:
+                self._report(f"✅ Чанк {index + 1} ({len(chunk_docs)})")
+                if on_chunk is not None:
+                    on_chunk(index, chunk_docs)
+
+            if on_document is not None:
+                for doc in chunk_docs:
+                    key = self.document_key(doc)
+                    if key not in streamed_keys:
+                        streamed_keys.add(key)
+                        on_document(doc)
+
+        # Сохраняем исходный порядок чанков для детерминированной дедупликации
         all_documents = []
+        for index in sorted(chunk_documents):
+            all_documents.extend(chunk_documents[index])
+
+        results = self._categorize_documents(all_documents)
+        results['failed_chunks'] = failed_chunks
+        return results
+
+    def _report(self, message: str) -> None:
+        """Вывод хода обработки (отключается verbose=False)"""
+        if self.verbose:
+            print(message)
+
+    def _iter_chunk_results(self, chunks: Iterable[str], skip: Iterable[int] = (),
+                            deadline: Optional[Deadline] = None) -> Iterator[Tuple[int, List[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Планировщик запросов по чанкам
+        
+        Чанки выполняются параллельно (GPT_CONFIG['max_concurrency']) в пределах
+        бюджетов RPM/TPM. Неудачные чанки возвращаются в очередь с паузой
+        (Retry-After или экспоненциальный backoff) и отдаются с ошибкой только
+        после исчерпания попыток - ни один чанк не теряется молча.
+        
+        После deadline новые запросы не отправляются: чанки в работе и в
+        очереди повторов, а также первый непрочитанный чанк отдаются с
+        DeadlineExceededError, остальные чанки не читаются. Запросы в полете
+        не дожидаются - их таймаут и так ограничен сроком.
+        
+        Args:
+            chunks: чанки текста (читаются лениво)
+            skip: индексы чанков, которые не нужно отправлять
+            deadline: крайний срок извлечения
+            
+        Yields:
+            Tuple: (индекс чанка, документы, ошибка или None) в порядке завершения
+        """
+        max_workers = Config.GPT_CONFIG['max_concurrency']
+        max_attempts = Config.RATE_LIMIT_CONFIG['max_attempts']
+        retry_config = Config.RETRY_CONFIG
+
+        skip = set(skip)
+        pending = ((index, chunk) for index, chunk in enumerate(chunks) if index not in skip)
+        exhausted = False
+        retry_queue = []  # куча (время повтора, индекс, попытка, чанк)
+        in_flight = {}
+
+        timed_out = False
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            while True:
+                if deadline is not None and deadline.expired():
+                    timed_out = True
+                    error = DeadlineExceededError("Истек бюджет времени извлечения")
+                    unfinished = [index for index, _, _ in in_flight.values()]
+                    unfinished.extend(index for _, index, _, _ in retry_queue)
+                    if not exhausted:
+                        unfinished.extend(index for index, _ in itertools.islice(pending, 1))
+                    self.extraction_stats['timed_out_chunks'] += len(unfinished)
+                    for index in sorted(unfinished):
+                        yield index, [], error
+                    break
+
+                # Заполняем пул: сначала созревшие повторы, затем новые чанки
+                while len(in_flight) < max_workers:
+                    if retry_queue and retry_queue[0][0] <= time.monotonic():
+                        _, index, attempt, chunk = heapq.heappop(retry_queue)
+                    elif not exhausted:
+                        try:
+                            # Чанки режутся лениво - замеряем выдачу каждого
+                            with stage_metrics.timer('extraction.split_text'):
+                                index, chunk = next(pending)
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                        attempt = 1
+                    else:
+                        break
+                    future = submit_with_context(pool, self._scheduled_chunk, chunk, deadline)
+                    in_flight[future] = (index, attempt, chunk)
+
+                if not in_flight:
+                    if not retry_queue:
+                        break
+                    delay = retry_queue[0][0] - time.monotonic()
+                    if deadline is not None:
+                        delay = min(delay, deadline.remaining())
+                    time.sleep(max(0.0, delay))
+                    continue
 
-        # КРИТИЧЕСКОЕ УЛУЧШЕНИЕ: обрабатываем ВСЕ чанки, а не только первые 3
-        print(f"📄 Обрабатываем {len(text_chunks)} чанков (все)")
+                timeout = None
+                if retry_queue:
+                    timeout = max(0.0, retry_queue[0][0] - time.monotonic())
+                if deadline is not None:
+                    timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, attempt, chunk = in_flight.pop(future)
+                    try:
+                        chunk_docs = future.result()
+                    except Exception as e:
+                        if deadline is not None and deadline.expired() and not isinstance(e, DeadlineExceededError):
+                            # Запрос прерван таймаутом, урезанным по сроку
+                            e = DeadlineExceededError(f"Истек бюджет времени извлечения: {e}")
+                        if attempt < max_attempts and not isinstance(e, DeadlineExceededError):
+                            delay = getattr(e, 'retry_after', None) or min(
+                                retry_config['base_delay'] * retry_config['backoff_factor'] ** (attempt - 1),
+                                retry_config['max_delay']
+                            )
+                            # Повтор, который не успеет до срока, не планируем
+                            if deadline is None or delay < deadline.remaining():
+                                logger.warning(f"Чанк {index + 1}: попытка {attempt} неудачна ({e}), повтор через {delay:.1f}с")
+                                self.extraction_stats['retries'] += 1
+                                heapq.heappush(retry_queue, (time.monotonic() + delay, index, attempt + 1, chunk))
+                                continue
+
+                        if isinstance(e, DeadlineExceededError):
+                            self.extraction_stats['timed_out_chunks'] += 1
+                        else:
+                            self.extraction_stats['failed_chunks'] += 1
+                        yield index, [], e
+                        continue
+
+                    self.extraction_stats['chunks_processed'] += 1
+                    yield index, chunk_docs, None
+        finally:
+            if timed_out:
+                # Пул получает только in_flight: отмена еще не начатых запросов
+                # (shutdown(cancel_futures=True) нет в Python 3.8)
+                for future in in_flight:
+                    future.cancel()
+            pool.shutdown(wait=not timed_out)
+
+    @timed('extraction.chunk')
+    def _scheduled_chunk(self, chunk: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        Обработка чанка после получения квоты у ограничителя
         
-        for i, chunk in enumerate(text_chunks, 1):
+        Args:
+            chunk: Фрагмент текста для обработки
+            deadline: крайний срок - ограничивает ожидание места, квоты и сам запрос
+            
+        Returns:
+            Список найденных документов
+        """
+        request = self._build_request(chunk)
+        tokens = estimate_request_tokens(request)
+
+        # Очередь по приоритету, затем квота RPM/TPM; стоимость - в тысячах токенов
+        slot_timeout = deadline.timeout() if deadline is not None else None
+        with self.scheduler.slot(cost=tokens / 1000, timeout=slot_timeout):
+            self.rate_limiter.acquire(tokens, timeout=deadline.timeout() if deadline is not None else None)
+            self.extraction_stats['requests'] += 1
+
             try:
-                print(f"🔄 Чанк {i}/{len(text_chunks)}", end=" ")
-                chunk_docs = self._process_chunk(chunk)
-                all_documents.extend(chunk_docs)
-                print(f"✅({len(chunk_docs)})")
-                
-                # Пауза между запросами для избежания rate limits
-                time.sleep(0.5)
+                # Провайдеры без параметра timeout работают как раньше, пока срок не задан
+                with stage_metrics.timer('extraction.llm_request'):
+                    if deadline is None:
+                        response = self.backend.complete(request)
+                    else:
+                        response = self.backend.complete(request, timeout=deadline.timeout())
             except Exception as e:
-                print(f"❌({str(e)[:20]})")
-                continue
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is not None:
+                    # 429: останавливаем выдачу квоты всем потокам
+                    self.extraction_stats['rate_limited'] += 1
+                    self.rate_limiter.pause(retry_after)
+                raise
+
+        return self._parse_response(response)
 
+    def _categorize_documents(self, all_documents: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Удаление дубликатов и разделение документов на НПА и письма
+        
+        Args:
+            all_documents: документы, извлеченные из всех чанков
+            
+        Returns:
+            Словарь с извлеченными документами по категориям
+        """
         # Удаляем дубликаты
         unique_documents = self._remove_duplicates(all_documents)
 
@@ -59,8 +358,7 @@ class GPTHelper:
         letter_docs = []
 
         for doc in unique_documents:
-            doc_type = doc.get('type', '').lower()
-            if 'письмо' in doc_type or doc.get('category') == 'ПИСЬМО':
+            if self.is_letter(doc):
                 letter_docs.append(doc)
             else:
                 npa_docs.append(doc)
@@ -71,15 +369,259 @@ class GPTHelper:
             'letters': letter_docs
         }
 
-    def _process_chunk(self, chunk: str) -> List[Dict[str, Any]]:
+    def extract_documents_batch(self, text: Optional[str] = None, batch_id: Optional[str] = None,
+                                work_dir: Optional[str] = None, wait: bool = True) -> Dict[str, Any]:
         """
-        Обработка одного чанка текста с улучшенным промптом
+        Извлечение документов через пакетное задание (Batch API)
+        
+        Все чанки записываются во входной JSONL файл, который загружается
+        одним заданием. Подходит для ночных прогонов корпуса: дешевле и не
+        упирается в лимиты интерактивных запросов.
+        
+        Состояние задания сохраняется в work_dir: повторный вызов с тем же
+        текстом (например, после прерванного прогона) продолжает ожидание
+        уже отправленного задания, а не отправляет новое.
+        
+        Args:
+            text: Текст для анализа (не нужен при возобновлении по batch_id)
+            batch_id: ID ранее отправленного задания для возобновления
+            work_dir: Папка для входных файлов и состояния заданий
+            wait: Ждать ли завершения задания
+            
+        Returns:
+            Словарь с документами по категориям и сведениями о задании
+            в ключе 'batch_info'
+        """
+        work_dir = work_dir or Config.GPT_CONFIG['batch_dir']
+        if batch_id is None:
+            if not text or not text.strip():
+                raise GPTError("Для нового пакетного задания нужен текст")
+            state = self._find_batch_state(self._batch_text_hash(text), work_dir)
+            if state is not None:
+                batch_id = state['batch_id']
+                self._report(f"♻️ Возобновляем пакетное задание {batch_id}")
+            else:
+                batch_id = self.submit_batch(text, work_dir)
+        state = self._load_batch_state(batch_id, work_dir)
+
+        if not wait:
+            return {
+                'all_documents': [],
+                'npa_documents': [],
+                'letters': [],
+                'batch_info': {'batch_id': batch_id, 'status': 'submitted', 'failed_chunks': []}
+            }
+
+        batch = self.wait_for_batch(batch_id)
+        return self.collect_batch_results(batch, chunks=state.get('chunks') if state else None)
+
+    def _batch_text_hash(self, text: str) -> str:
+        """Отпечаток текста и модели: по нему находится ранее отправленное задание"""
+        return hashlib.sha256(f"{self.model}\0{text}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _load_batch_state(batch_id: str, work_dir: str) -> Optional[Dict[str, Any]]:
+        """Состояние задания из work_dir (None - задание отправлено не отсюда)"""
+        path = os.path.join(work_dir, f"batch_{batch_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _find_batch_state(self, text_hash: str, work_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Ранее отправленное задание для того же текста
+        
+        Задания, завершившиеся неудачно (failed, expired, cancelled), пропускаются
+        """
+        for path in sorted(glob.glob(os.path.join(work_dir, 'batch_*.json')), reverse=True):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if state.get('text_hash') != text_hash:
+                continue
+            try:
+                status = self.backend.retrieve_batch(state['batch_id']).status
+            except Exception as e:
+                logger.warning(f"Не удалось проверить пакетное задание {state['batch_id']}: {e}")
+                continue
+            if status not in ('failed', 'expired', 'cancelled'):
+                return state
+        return None
+
+    def submit_batch(self, text: str, work_dir: Optional[str] = None) -> str:
+        """
+        Создание входного JSONL файла и отправка пакетного задания
+        
+        Args:
+            text: Текст для анализа
+            work_dir: Папка для входных файлов и состояния заданий
+            
+        Returns:
+            ID пакетного задания
+        """
+        work_dir = work_dir or Config.GPT_CONFIG['batch_dir']
+        os.makedirs(work_dir, exist_ok=True)
+
+        chunk_count = 0
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        input_path = os.path.join(work_dir, f"batch_input_{timestamp}.jsonl")
+
+        with open(input_path, 'w', encoding='utf-8') as f:
+            for i, chunk in enumerate(iter_text_chunks(text, 5000)):
+                chunk_count += 1
+                line = {
+                    'custom_id': f"chunk-{i}",
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': self._build_request(chunk)
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+        input_file_id = self.backend.upload_batch_file(input_path)
+        batch = self.backend.create_batch(input_file_id, Config.GPT_CONFIG['batch_completion_window'])
+
+        # Сохраняем состояние, чтобы задание можно было возобновить по ID
+        state = {
+            'batch_id': batch.id,
+            'input_file': input_path,
+            'input_file_id': input_file_id,
+            'chunks': chunk_count,
+            'text_hash': self._batch_text_hash(text),
+            'created_at': timestamp
+        }
+        with open(os.path.join(work_dir, f"batch_{batch.id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"Пакетное задание {batch.id} отправлено: {input_path}, {chunk_count} чанков")
+        self._report(f"📦 Пакетное задание {batch.id} отправлено ({chunk_count} чанков)")
+        return batch.id
+
+    def wait_for_batch(self, batch_id: str, poll_interval: Optional[float] = None,
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Ожидание завершения пакетного задания
+        
+        Args:
+            batch_id: ID пакетного задания
+            poll_interval: Интервал опроса в секундах
+            timeout: Максимальное время ожидания в секундах (None - без ограничения)
+            
+        Returns:
+            Объект пакетного задания в финальном статусе
+        """
+        if poll_interval is None:
+            poll_interval = Config.GPT_CONFIG['batch_poll_interval']
+        started = time.monotonic()
+
+        while True:
+            batch = self.backend.retrieve_batch(batch_id)
+            if batch.status in BATCH_FINAL_STATUSES:
+                self._report(f"📦 Пакетное задание {batch_id}: {batch.status}")
+                return batch
+
+            logger.debug(f"Пакетное задание {batch_id}: {batch.status}")
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise GPTError(f"Пакетное задание {batch_id} не завершилось за {timeout} с",
+                               {'batch_id': batch_id, 'status': batch.status})
+
+            time.sleep(poll_interval)
+
+    def collect_batch_results(self, batch: Any, chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Загрузка файла результатов пакетного задания и разбор ответов
+        
+        Args:
+            batch: Объект пакетного задания (или его ID)
+            chunks: Число отправленных чанков (из состояния задания): чанки
+                без ответа и без ошибки тоже считаются ошибочными
+            
+        Returns:
+            Словарь с документами по категориям и сведениями о задании
+        """
+        if isinstance(batch, str):
+            batch = self.backend.retrieve_batch(batch)
+
+        if batch.status != 'completed' or not batch.output_file_id:
+            raise GPTError(f"Пакетное задание {batch.id} завершилось со статусом {batch.status}",
+                           {'batch_id': batch.id, 'status': batch.status})
+
+        responses = {}
+        failed_chunks = []
+
+        output = self.backend.download_file(batch.output_file_id)
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            custom_id = record.get('custom_id', '')
+            response = record.get('response') or {}
+
+            if record.get('error') or response.get('status_code') != 200:
+                failed_chunks.append(custom_id)
+                continue
+
+            choices = response.get('body', {}).get('choices', [])
+            content = choices[0].get('message', {}).get('content', '') if choices else ''
+            responses[custom_id] = self._parse_response(content)
+
+        # Строки с ошибками OpenAI выносит в отдельный файл
+        if getattr(batch, 'error_file_id', None):
+            errors = self.backend.download_file(batch.error_file_id)
+            for line in errors.splitlines():
+                if line.strip():
+                    failed_chunks.append(json.loads(line).get('custom_id', ''))
+
+        # Сохраняем исходный порядок чанков
+        all_documents = []
+        for custom_id in sorted(responses, key=lambda cid: int(cid.rsplit('-', 1)[-1])):
+            all_documents.extend(responses[custom_id])
+
+        if chunks is not None:
+            failed_chunks.extend(f"chunk-{i}" for i in range(chunks)
+                                 if f"chunk-{i}" not in responses and f"chunk-{i}" not in failed_chunks)
+
+        if failed_chunks:
+            logger.warning(f"Пакетное задание {batch.id}: чанков с ошибками {len(failed_chunks)}")
+            self._report(f"❌ Чанков с ошибками в пакете: {len(failed_chunks)}")
+
+        results = self._categorize_documents(all_documents)
+        results['batch_info'] = {
+            'batch_id': batch.id,
+            'status': batch.status,
+            'processed_chunks': len(responses),
+            'failed_chunks': sorted(set(failed_chunks))
+        }
+        return results
+
+    def _build_request(self, chunk: str) -> Dict[str, Any]:
+        """
+        Формирование тела запроса chat.completions для чанка
         
         Args:
             chunk: Фрагмент текста для обработки
             
         Returns:
-            Список найденных документов
+            Параметры запроса (модель, сообщения, температура, лимит токенов)
+        """
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": self._build_prompt(chunk)}],
+            'temperature': 0.1,  # низкая температура для точности
+            'max_tokens': 2000   # увеличено для большего количества документов
+        }
+
+    def _build_prompt(self, chunk: str) -> str:
+        """
+        Формирование промпта для извлечения документов из чанка
+        
+        Args:
+            chunk: Фрагмент текста для обработки
+            
+        Returns:
+            Текст промпта
         """
         # УЛУЧШЕННЫЙ ПРОМПТ: более точные инструкции и примеры
         prompt = f"""
@@ -119,46 +661,47 @@ class GPTHelper:
         {chunk[:4500]}
         """
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,  # низкая температура для точности
-                max_tokens=2000   # увеличено для большего количества документов
-            )
-
-            result = response.choices[0].message.content
+        return prompt
+
+    def _parse_response(self, result: str) -> List[Dict[str, Any]]:
+        """
+        Разбор ответа модели в список документов
+        
+        Args:
+            result: Текст ответа модели
             
-            # Более надежный парсинг JSON
-            json_start = result.find('{')
-            json_end = result.rfind('}') + 1
+        Returns:
+            Список валидных документов
+        """
+        if not result:
+            return []
 
-            if json_start != -1 and json_end != -1:
-                json_str = result[json_start:json_end]
+        # Более надежный парсинг JSON
+        json_start = result.find('{')
+        json_end = result.rfind('}') + 1
+
+        if json_start != -1 and json_end != -1:
+            json_str = result[json_start:json_end]
+            try:
+                chunk_data = json.loads(json_str)
+                documents = chunk_data.get('documents', [])
+                
+                # Базовая фильтрация от мусора
+                valid_docs = []
+                for doc in documents:
+                    if self._is_valid_document(doc):
+                        valid_docs.append(doc)
+                
+                return valid_docs
+            except json.JSONDecodeError:
+                # Попытка исправить JSON
                 try:
-                    chunk_data = json.loads(json_str)
-                    documents = chunk_data.get('documents', [])
-                    
-                    # Базовая фильтрация от мусора
-                    valid_docs = []
-                    for doc in documents:
-                        if self._is_valid_document(doc):
-                            valid_docs.append(doc)
-                    
-                    return valid_docs
-                except json.JSONDecodeError:
-                    # Попытка исправить JSON
-                    try:
-                        # Убираем возможные проблемы с кавычками
-                        fixed_json = json_str.replace('\\"', '"').replace('\\n', ' ')
-                        chunk_data = json.loads(fixed_json)
-                        return chunk_data.get('documents', [])
-                    except:
-                        return []
-
-        except Exception as e:
-            print(f"Ошибка обработки чанка: {e}")
-            return []
+                    # Убираем возможные проблемы с кавычками
+                    fixed_json = json_str.replace('\\"', '"').replace('\\n', ' ')
+                    chunk_data = json.loads(fixed_json)
+                    return chunk_data.get('documents', [])
+                except:
+                    return []
 
         return []
 
@@ -188,59 +731,32 @@ class GPTHelper:
         # Все остальное считаем валидным
         return True
 
-    def _split_text(self, text: str, max_size: int) -> List[str]:
+    @staticmethod
+    def is_letter(doc: Dict[str, Any]) -> bool:
         """
-        Разбивка текста на чанки с улучшенной логикой
+        Является ли документ письмом (а не НПА)
         
         Args:
-            text: Исходный текст
-            max_size: Максимальный размер чанка
+            doc: Документ
             
         Returns:
-            Список чанков текста
+            True для писем
         """
-        if len(text) <= max_size:
-            return [text]
+        doc_type = doc.get('type', '').lower()
+        return 'письмо' in doc_type or doc.get('category') == 'ПИСЬМО'
 
-        chunks = []
-        start = 0
-        overlap = 500  # перекрытие между чанками
-
-        while start < len(text):
-            end = start + max_size
-            
-            if end >= len(text):
-                # Последний чанк
-                chunks.append(text[start:])
-                break
-            
-            # Ищем удобное место для разрыва
-            chunk = text[start:end]
-            
-            # Приоритет разрыва: двойной перенос > одинарный > точка > пробел
-            break_points = [
-                chunk.rfind('\n\n'),
-                chunk.rfind('\n'),
-                chunk.rfind('. '),
-                chunk.rfind(' ')
-            ]
-            
-            best_break = -1
-            for bp in break_points:
-                if bp > max_size - 300:  # не слишком близко к концу
-                    best_break = bp
-                    break
+    @staticmethod
+    def document_key(doc: Dict[str, Any]) -> str:
+        """
+        Ключ дедупликации документа: тип + канонический номер
+        
+        Args:
+            doc: Документ
             
-            if best_break > 0:
-                actual_end = start + best_break + 1
-                chunks.append(text[start:actual_end])
-                start = actual_end - overlap  # с перекрытием
-            else:
-                # Если не нашли хорошее место, разрываем по размеру
-                chunks.append(chunk)
-                start = end - overlap
-
-        return chunks
+        Returns:
+            Строковый ключ (см. npa_searcher.document_keys)
+        """
+        return document_keys.document_key(doc).text
 
     def _remove_duplicates(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -257,14 +773,7 @@ class GPTHelper:
 
         for doc in documents:
             # Создаем ключ для дедупликации
-            doc_type = doc.get('type', '').lower().strip()
-            doc_number = str(doc.get('number', '')).lower().strip()
-            
-            # Нормализуем номер для сравнения
-            import re
-            clean_number = re.sub(r'[№n°#\s\-_]+', '', doc_number)
-            
-            key = f"{doc_type}_{clean_number}"
+            key = self.document_key(doc)
             
             if key not in seen:
                 seen[key] = doc
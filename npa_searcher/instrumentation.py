@@ -0,0 +1,205 @@
+"""
+Инструментирование этапов обработки
+Таймеры и гистограммы длительности по этапам (чанкинг, запросы к модели,
+стратегии поиска, скоринг, загрузка PDF, экспорт) с выгрузкой в формате
+Prometheus и JSON. Выключенное инструментирование стоит одной проверки флага
+"""
+
+import os
+import time
+import bisect
+import functools
+import threading
+from typing import Dict, Any, Optional, Callable, Sequence
+from npa_searcher.config import Config
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными границами корзин"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max', 'errors')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя - +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по корзинам (верхняя граница корзины)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = []
+        seen = 0
+        for count in self.counts:
+            seen += count
+            cumulative.append(seen)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'sum_seconds': self.sum,
+            'avg_seconds': self.sum / self.count if self.count else 0.0,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'p99_seconds': self.quantile(0.99),
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], cumulative)),
+        }
+
+class _NullTimer:
+    """Таймер выключенного инструментирования"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ('registry', 'stage', 'started')
+
+    def __init__(self, registry: 'StageMetrics', stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.started, error=exc_type is not None)
+        return False
+
+class StageMetrics:
+    """
+    Реестр длительностей этапов
+
+    Example:
+        >>> stage_metrics.enable()
+        >>> with stage_metrics.timer('export.close'):
+        ...     writer.close()
+        >>> print(stage_metrics.prometheus())
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Optional[Sequence[float]] = None):
+        """
+        Args:
+            enabled: собирать ли метрики
+            buckets: границы корзин в секундах (по умолчанию INSTRUMENTATION_CONFIG['buckets'])
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets or Config.INSTRUMENTATION_CONFIG['buckets'])
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def timer(self, stage: str):
+        """Контекстный менеджер замера этапа (no-op, если выключено)"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float, error: bool = False) -> None:
+        """Учет одного выполнения этапа"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                histogram.errors += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-снимок: гистограммы и квантили по этапам"""
+        with self._lock:
+            stages = {stage: histogram.to_dict() for stage, histogram in sorted(self._histograms.items())}
+        return {
+            'enabled': self.enabled,
+            'timestamp': time.time(),
+            'since': self.started_at,
+            'stages': stages,
+        }
+
+    def prometheus(self, prefix: str = 'npa_stage') -> str:
+        """Гистограммы в текстовом формате Prometheus"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            lines = [f"# HELP {prefix}_duration_seconds Длительность этапа обработки",
+                     f"# TYPE {prefix}_duration_seconds histogram"]
+            for stage, histogram in histograms:
+                seen = 0
+                for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    seen += count
+                    lines.append(f'{prefix}_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {seen}')
+                lines.append(f'{prefix}_duration_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{prefix}_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for stage, histogram in histograms:
+                lines.append(f'{prefix}_errors_total{{stage="{stage}"}} {histogram.errors}')
+        return '\n'.join(lines) + '\n'
+
+def _enabled_by_default() -> bool:
+    value = os.environ.get(Config.INSTRUMENTATION_CONFIG['env_var'], '')
+    if value:
+        return value.lower() not in ('0', 'false', 'no', 'off')
+    return Config.INSTRUMENTATION_CONFIG['enabled']
+
+# Общий реестр процесса
+stage_metrics = StageMetrics(enabled=_enabled_by_default())
+
+def timed(stage: str) -> Callable:
+    """
+    Декоратор замера длительности функции как этапа stage
+
+    Example:
+        >>> @timed('search.score')
+        ... def _score_results(self, results, document): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not stage_metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                stage_metrics.observe(stage, time.perf_counter() - started, error=error)
+        return wrapper
+    return decorator
@@ -0,0 +1,148 @@
+"""
+Журнал обработки корпуса для возобновления после сбоя
+Append-only JSONL: каждая запись сбрасывается на диск (fsync) до продолжения работы
+"""
+
+import os
+import json
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ProcessingJournal:
+    """
+    Долговечный журнал выполненной работы
+
+    Записи:
+        chunk     - документы, извлеченные из чанка входного файла
+        search    - результат поиска документа по ключу дедупликации
+        completed - входной файл обработан полностью
+
+    При открытии существующего журнала записи воспроизводятся в память,
+    а недописанная последняя строка (сбой во время записи) отбрасывается
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: путь к файлу журнала (создается при необходимости)
+        """
+        self.path = path
+        self._chunks: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+        self._searches: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._completed: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(path):
+            self._replay()
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _replay(self) -> None:
+        """
+        Восстановление состояния из существующего журнала
+
+        Недописанная последняя строка обрезается: иначе следующая запись
+        приклеится к ней и пропадет при следующем восстановлении
+        """
+        records = 0
+        valid_end = 0
+        missing_newline = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    logger.warning(f"Пропущена поврежденная запись журнала {self.path}")
+                    if line.endswith(b'\n'):
+                        valid_end = f.tell()
+                    continue
+                self._apply(record)
+                records += 1
+                valid_end = f.tell()
+                # Запись целиком, но сбой случился до перевода строки
+                missing_newline = not line.endswith(b'\n')
+
+        if valid_end < os.path.getsize(self.path):
+            logger.warning(f"Журнал {self.path}: обрезана недописанная запись")
+            os.truncate(self.path, valid_end)
+        if missing_newline:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+
+        logger.info(f"Журнал {self.path}: восстановлено {records} записей, "
+                    f"завершено входов: {len(self._completed)}, поисков: {len(self._searches)}")
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        kind = record.get('kind')
+        if kind == 'chunk':
+            self._chunks.setdefault(record['input'], {})[int(record['chunk'])] = record['documents']
+        elif kind == 'search':
+            self._searches[record['key']] = (record['category'], record['entry'])
+        elif kind == 'completed':
+            self._completed[record['input']] = record
+            # Чанки завершенного входа больше не нужны
+            self._chunks.pop(record['input'], None)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._apply(record)
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_chunk(self, input_id: str, chunk: int, documents: List[Dict[str, Any]]) -> None:
+        """Запись документов, извлеченных из чанка"""
+        self._append({'kind': 'chunk', 'input': input_id, 'chunk': chunk, 'documents': documents})
+
+    def record_search(self, key: str, category: str, entry: Dict[str, Any]) -> None:
+        """Запись результата поиска документа"""
+        self._append({'kind': 'search', 'key': key, 'category': category, 'entry': entry})
+
+    def mark_completed(self, input_id: str, summary: Dict[str, Any] = None) -> None:
+        """Отметка о полной обработке входного файла"""
+        self._append({
+            'kind': 'completed',
+            'input': input_id,
+            'summary': summary or {},
+            'completed_at': datetime.now().isoformat(timespec='seconds')
+        })
+
+    def is_completed(self, input_id: str) -> bool:
+        with self._lock:
+            return input_id in self._completed
+
+    def get_chunks(self, input_id: str) -> Dict[int, List[Dict[str, Any]]]:
+        """Уже извлеченные чанки входного файла"""
+        with self._lock:
+            return dict(self._chunks.get(input_id, {}))
+
+    def get_search(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Сохраненный результат поиска (категория, запись) или None"""
+        with self._lock:
+            return self._searches.get(key)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'completed_inputs': len(self._completed),
+                'partial_inputs': len(self._chunks),
+                'searches': len(self._searches)
+            }
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'ProcessingJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,224 @@
+"""
+База известных документов
+Записи хранятся в JSON (по умолчанию npa_searcher/known_documents.json) и
+индексируются по каноническим номерам всех вариантов написания, eoNumber и
+идентификаторам СПС. Файл перечитывается при изменении (проверка не чаще
+reload_interval), поэтому базу можно править без перезапуска сервиса.
+
+Запись:
+    number, variants - номер и другие его написания
+    type, description, full_name, year, keywords
+    eo_hints - eoNumber документа в API (поиск без перебора запросов)
+    sps_id - идентификатор в СПС "Законодательство России"
+    document - элемент API: документ находится без обращений к API
+    source - 'manual' или 'learned' (добавлена успешным поиском)
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from npa_searcher.config import Config
+from npa_searcher.document_keys import canonical_number, canonical_type
+from npa_searcher.exceptions import ConfigError
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'known_documents.json')
+
+class KnowledgeBase:
+    """
+    Известные документы с поиском по вариантам номера
+
+    Example:
+        >>> kb = KnowledgeBase()
+        >>> kb.lookup('№ 273-фз')['sps_id']
+        '70291362'
+        >>> kb.by_eo_number('0001201212300007')['number']
+        '273-ФЗ'
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 5.0, writable: bool = False):
+        """
+        Args:
+            path: JSON-файл базы (по умолчанию встроенный known_documents.json;
+                если файла нет, база начинается со встроенной)
+            reload_interval: как часто проверять изменение файла, с (0 - при каждом обращении)
+            writable: сохранять ли в файл записи, добавленные learn()
+        """
+        self.path = path or DEFAULT_PATH
+        self.reload_interval = reload_interval
+        self.writable = writable
+        self.entries: List[Dict[str, Any]] = []
+        # Выученные записи, которые некуда сохранить, переживают перечитывание файла
+        self._unsaved: List[Dict[str, Any]] = []
+        self._by_number: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_eo: Dict[str, Dict[str, Any]] = {}
+        self._by_sps: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self.stats = {'lookups': 0, 'hits': 0, 'reloads': 0, 'learned': 0}
+        self.reload(force=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Перечитать файл, если он изменился
+
+        Returns:
+            bool: файл перечитан
+        """
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            self._checked_at = time.monotonic()
+            if not force and mtime == self._mtime:
+                return False
+
+            # Своего файла еще нет - начинаем со встроенной базы, первый learn() создаст файл
+            source = self.path if mtime is not None else DEFAULT_PATH
+            entries = []
+            if os.path.exists(source):
+                with open(source, 'r', encoding='utf-8') as f:
+                    try:
+                        data = json.load(f)
+                    except json.JSONDecodeError as e:
+                        # Файл могут сохранять прямо сейчас - остаемся на прежней версии
+                        if not force and self.entries:
+                            return False
+                        raise ConfigError(f"Некорректный файл базы известных документов: {e}", {'path': self.path})
+                entries = data.get('documents', []) if isinstance(data, dict) else data
+            self._mtime = mtime
+            self._index(entries + self._unsaved)
+            self.stats['reloads'] += 1
+            return True
+
+    def _index(self, entries: List[Dict[str, Any]]) -> None:
+        by_number, by_eo, by_sps = {}, {}, {}
+        for entry in entries:
+            numbers = [entry.get('number', '')] + list(entry.get('variants', []))
+            if entry.get('document'):
+                numbers.append(entry['document'].get('number', ''))
+            for number in {canonical_number(n) for n in numbers if n}:
+                by_number.setdefault(number, []).append(entry)
+
+            eo_numbers = list(entry.get('eo_hints', []))
+            if entry.get('document', {}).get('eoNumber'):
+                eo_numbers.append(entry['document']['eoNumber'])
+            for eo_number in eo_numbers:
+                by_eo[str(eo_number)] = entry
+            if entry.get('sps_id'):
+                by_sps[str(entry['sps_id'])] = entry
+        self.entries, self._by_number, self._by_eo, self._by_sps = entries, by_number, by_eo, by_sps
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+
+    def lookup(self, number: str, doc_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Запись по номеру в любом написании
+
+        Args:
+            number: номер документа ('273-ФЗ', '№ 273-фз', '273 ФЗ')
+            doc_type: тип документа; среди записей с одним номером предпочитается
+                запись того же типа, затем без типа. Запись другого типа тоже
+                возвращается: тип сверяет вызывающий, если это важно
+
+        Returns:
+            Dict записи или None
+        """
+        self._maybe_reload()
+        with self._lock:
+            self.stats['lookups'] += 1
+            candidates = self._by_number.get(canonical_number(number), [])
+            if doc_type:
+                wanted = canonical_type(doc_type)
+                typed = [entry for entry in candidates if canonical_type(entry.get('type', '')) == wanted]
+                candidates = typed or [entry for entry in candidates if not entry.get('type')] or candidates
+            if not candidates:
+                return None
+            self.stats['hits'] += 1
+            return candidates[0]
+
+    def by_eo_number(self, eo_number: str) -> Optional[Dict[str, Any]]:
+        """Запись по eoNumber документа в API"""
+        self._maybe_reload()
+        with self._lock:
+            return self._by_eo.get(str(eo_number))
+
+    def by_sps_id(self, sps_id: str) -> Optional[Dict[str, Any]]:
+        """Запись по идентификатору СПС"""
+        self._maybe_reload()
+        with self._lock:
+            return self._by_sps.get(str(sps_id))
+
+    def learn(self, document: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """
+        Запомнить документ, найденный поиском
+
+        Args:
+            document: искомый документ (type, number, title)
+            result: лучший результат поиска (элемент API со score)
+
+        Returns:
+            bool: добавлена новая запись (документ с тем же eoNumber уже известен - False)
+        """
+        eo_number = result.get('eoNumber')
+        if not eo_number or not document.get('number'):
+            return False
+        with self._lock:
+            if eo_number in self._by_eo:
+                return False
+            variants = sorted({result.get('number', '')} - {document['number'], ''})
+            entry = {
+                'number': document['number'],
+                'variants': variants,
+                'type': document.get('type', ''),
+                'description': result.get('name', ''),
+                'eo_hints': [eo_number],
+                'document': dict(result),
+                'source': 'learned',
+                'learned_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            if self.writable:
+                self._save(self.entries + [entry])
+            else:
+                self._unsaved.append(entry)
+                self._index(self.entries + [entry])
+            self.stats['learned'] += 1
+            return True
+
+    def _save(self, entries: List[Dict[str, Any]]) -> None:
+        """Атомарная запись файла базы и обновление индексов"""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'documents': entries}, f, ensure_ascii=False, indent=2)
+        os.replace(temporary, self.path)
+        self._mtime = os.path.getmtime(self.path)
+        self._index(entries)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Размер базы и счетчики обращений"""
+        with self._lock:
+            return dict(self.stats, entries=len(self.entries), path=self.path)
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_knowledge_base_lock = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Общая база процесса по Config.KNOWLEDGE_BASE_CONFIG"""
+    global _knowledge_base
+    with _knowledge_base_lock:
+        if _knowledge_base is None:
+            config = Config.KNOWLEDGE_BASE_CONFIG
+            # Встроенный файл не перезаписываем: выученное сохраняется только в свой файл
+            _knowledge_base = KnowledgeBase(config['path'], config['reload_interval'],
+                                            writable=bool(config['path']) and config['learn'])
+        return _knowledge_base
@@ -0,0 +1,558 @@
+"""
+Нагрузочное тестирование конвейера: npa-loadtest
+Виртуальные пользователи параллельно вызывают NPAProcessor.process_text
+(извлечение, поиск, экспорт) на заглушках OpenAI и API pravo.gov.ru
+с настраиваемыми задержками и ошибками. По каждому уровню нагрузки
+(по умолчанию 10, 50 и 200 пользователей) - пропускная способность,
+перцентили задержки, очереди планировщиков и потребление ресурсов
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+from npa_searcher.config import Config
+from npa_searcher.cache import LRUCache
+from npa_searcher.backends import create_backend
+from npa_searcher.gpt_helper import GPTHelper
+from npa_searcher.npa_searcher import NPASearcher
+from npa_searcher.processor import NPAProcessor
+from npa_searcher.export import create_writer
+from npa_searcher.corpus import iter_corpus_files, read_document
+from npa_searcher.rate_limiter import TokenRateLimiter
+from npa_searcher.scheduler import PriorityScheduler
+from npa_searcher.instrumentation import stage_metrics
+from npa_searcher.benchmark import environment_info
+from npa_searcher.standins import (OpenAIStandInServer, PravoStandInServer, PravoAPI, FaultProfile,
+                                   synthetic_documents)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOADTEST_VERSION = 1
+DEFAULT_USERS = (10, 50, 200)
+
+# Связующий текст между упоминаниями
+_FILLER = [
+    'Образовательная организация обеспечивает выполнение требований',
+    'Порядок проведения проверки определяется с учетом положений',
+    'Ответственность за нарушение установленных сроков наступает в соответствии с',
+    'Обработка персональных данных работников осуществляется согласно',
+    'Финансовое обеспечение мероприятий производится в пределах бюджетных ассигнований и',
+    'Квалификационные требования к работникам устанавливаются на основании',
+    'Сведения подлежат размещению в информационной системе, как предусмотрено',
+]
+
+def synthetic_corpus(catalog: Sequence[Dict[str, Any]], count: int, seed: int = 0,
+                     mentions: Sequence[int] = (3, 15), unknown_share: float = 0.1) -> List[str]:
+    """
+    Тексты с упоминаниями документов каталога заглушки pravo.gov.ru
+
+    Упоминания оформлены как в реальных документах ("Федеральный закон от
+    29.12.2012 № 273-ФЗ «...»"), часть номеров отсутствует в каталоге,
+    поэтому работают и успешная, и неуспешная ветви поиска.
+
+    Args:
+        catalog: документы каталога (synthetic_documents)
+        count: число текстов
+        seed: зерно для воспроизводимости
+        mentions: (минимум, максимум) упоминаний в тексте
+        unknown_share: доля упоминаний несуществующих документов
+
+    Returns:
+        List текстов
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(*mentions)):
+            doc = rng.choice(catalog)
+            doc_type = doc['complexName'].split(' от ')[0]
+            number = doc['number']
+            if rng.random() < unknown_share:
+                number = f"{rng.randint(5000, 9999)}-{rng.choice(['ФЗ', 'П', 'р'])}"
+            sentences = [rng.choice(_FILLER) for _ in range(rng.randint(2, 6))]
+            paragraphs.append('. '.join(sentences[:-1] + [
+                f"{sentences[-1]} {doc_type} от {doc['viewDate']} № {number} «{doc['name']}»"
+            ]) + '.')
+        texts.append('\n\n'.join(paragraphs))
+    return texts
+
+def load_corpus(source: str, limit: Optional[int] = None) -> List[str]:
+    """Тексты реального корпуса (папка, манифест или файл - см. iter_corpus_files)"""
+    texts = []
+    for _, path in iter_corpus_files(source):
+        text = read_document(path)
+        if text.strip():
+            texts.append(text)
+        if limit and len(texts) >= limit:
+            break
+    return texts
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (q от 0 до 1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def _rss_bytes() -> Optional[int]:
+    """Текущий RSS процесса (Linux); None, если недоступно"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class ResourceMonitor:
+    """Фоновая выборка потоков, памяти и глубины очередей планировщиков"""
+
+    def __init__(self, schedulers: Dict[str, PriorityScheduler], interval: float = 0.25):
+        self.schedulers = schedulers
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'ResourceMonitor':
+        self._cpu_started = time.process_time()
+        self._wall_started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='npa-loadtest-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            sample = {'threads': threading.active_count(), 'rss_bytes': _rss_bytes()}
+            for name, scheduler in self.schedulers.items():
+                classes = scheduler.get_statistics()['classes'].values()
+                sample[f'{name}_queue_depth'] = sum(cls['queue_depth'] for cls in classes)
+                sample[f'{name}_running'] = sum(cls['running'] for cls in classes)
+            self.samples.append(sample)
+
+    def stop(self) -> Dict[str, Any]:
+        """Остановка и сводка: CPU, память, потоки, очереди"""
+        self._stop.set()
+        self._thread.join()
+        wall = time.perf_counter() - self._wall_started
+        cpu = time.process_time() - self._cpu_started
+
+        def series(key: str) -> Dict[str, float]:
+            values = [sample[key] for sample in self.samples if sample.get(key) is not None]
+            if not values:
+                return {'avg': 0, 'max': 0}
+            return {'avg': sum(values) / len(values), 'max': max(values)}
+
+        summary = {
+            'cpu_seconds': cpu,
+            'cpu_utilization': cpu / wall if wall else 0.0,  # 1.0 - одно ядро
+            'threads': series('threads'),
+            'rss_bytes': series('rss_bytes'),
+            'samples': len(self.samples),
+        }
+        if resource is not None:
+            # ru_maxrss - КБ в Linux, байты в macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            summary['peak_rss_bytes'] = maxrss if sys.platform == 'darwin' else maxrss * 1024
+        for name in self.schedulers:
+            summary[f'{name}_queue_depth'] = series(f'{name}_queue_depth')
+            summary[f'{name}_running'] = series(f'{name}_running')
+        return summary
+
+class LoadTest:
+    """
+    Прогон уровней нагрузки на одних заглушках
+
+    Каждый уровень получает свежий процессор (свой кэш поиска, планировщики
+    и ограничитель RPM/TPM), который делят все его пользователи - так же,
+    как запросы одного экземпляра npa-service.
+
+    Example:
+        >>> with LoadTest(openai_faults=FaultProfile(latency=0.3)) as test:
+        ...     report = test.run([10, 50], duration=30)
+    """
+
+    def __init__(self, openai_faults: Optional[FaultProfile] = None,
+                 pravo_faults: Optional[FaultProfile] = None,
+                 openai_url: Optional[str] = None, pravo_url: Optional[str] = None,
+                 catalog_size: int = 2000, texts: Optional[List[str]] = None,
+                 corpus_size: int = 200, seed: int = 0,
+                 export_format: Optional[str] = 'csv', cache: bool = True,
+                 timeout_budget: Optional[float] = None, think_time: float = 0.0,
+                 rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 capacity: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            openai_faults, pravo_faults: задержки и ошибки встроенных заглушек
+            openai_url: внешняя OpenAI-совместимая заглушка (адрес с /v1)
+            pravo_url: внешняя заглушка pravo.gov.ru (адрес с /api; каталог
+                должен совпадать: тот же --catalog-size и --seed)
+            catalog_size: документов в синтетическом каталоге
+            texts: готовые тексты (по умолчанию - synthetic_corpus)
+            corpus_size: число синтетических текстов
+            seed: зерно
+            export_format: формат экспорта каждого результата (None - без экспорта)
+            cache: общий LRU-кэш поиска, как в npa-service
+            timeout_budget: бюджет времени каждого запроса, с
+            think_time: пауза пользователя между запросами, с
+            rpm, tpm: лимиты модели (None - из RATE_LIMIT_CONFIG, 0 - без лимита)
+            capacity: мощность планировщиков {'extraction': n, 'search': n}
+        """
+        self.catalog = synthetic_documents(catalog_size, seed)
+        self.texts = texts or synthetic_corpus(self.catalog, corpus_size, seed)
+        self.seed = seed
+        self.export_format = export_format
+        self.cache = cache
+        self.timeout_budget = timeout_budget
+        self.think_time = think_time
+        self.rpm, self.tpm = rpm, tpm
+        self.capacity = dict(Config.SCHEDULER_CONFIG['capacity'], **(capacity or {}))
+
+        self.openai_server = None
+        self.pravo_server = None
+        if openai_url is None:
+            self.openai_server = OpenAIStandInServer(faults=openai_faults)
+        if pravo_url is None:
+            self.pravo_server = PravoStandInServer(faults=pravo_faults, api=PravoAPI(catalog=self.catalog))
+        self.openai_url = openai_url
+        self.pravo_url = pravo_url
+
+    def start(self) -> 'LoadTest':
+        if self.openai_server is not None:
+            self.openai_url = self.openai_server.start().url + '/v1'
+        if self.pravo_server is not None:
+            self.pravo_url = self.pravo_server.start().api_url
+        return self
+
+    def stop(self) -> None:
+        for server in (self.openai_server, self.pravo_server):
+            if server is not None:
+                server.stop()
+
+    def __enter__(self) -> 'LoadTest':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _create_processor(self) -> NPAProcessor:
+        schedulers = {name: PriorityScheduler(capacity, name=name) for name, capacity in self.capacity.items()}
+        cache_config = Config.CACHE_CONFIG
+        cache = LRUCache(cache_config['search_maxsize'], cache_config['search_ttl']) if self.cache else None
+
+        searcher = NPASearcher(cache=cache, scheduler=schedulers['search'])
+        searcher.api_url = self.pravo_url
+        searcher.request_delay = 0.0  # паузы вежливости к реальному API заглушке не нужны
+        gpt_helper = GPTHelper(backend=create_backend('openai', api_key='loadtest', base_url=self.openai_url),
+                               rate_limiter=TokenRateLimiter(self.rpm, self.tpm), verbose=False,
+                               scheduler=schedulers['extraction'])
+        return NPAProcessor(searcher=searcher, gpt_helper=gpt_helper)
+
+    def run_level(self, users: int, duration: Optional[float] = 30.0,
+                  requests_per_user: Optional[int] = None, ramp_up: float = 0.0) -> Dict[str, Any]:
+        """
+        Один уровень нагрузки: users пользователей в замкнутом цикле
+
+        Args:
+            users: число одновременных пользователей
+            duration: длительность, с (новые запросы после нее не начинаются)
+            requests_per_user: запросов на пользователя (вместо duration)
+            ramp_up: за сколько секунд равномерно запустить всех пользователей
+
+        Returns:
+            Dict: requests, throughput, latency, queueing, resources, standins, stages
+        """
+        processor = self._create_processor()
+        gpt_helper, searcher = processor.gpt_helper, processor.searcher
+        monitor = ResourceMonitor({'extraction': gpt_helper.scheduler, 'search': searcher.scheduler})
+        standin_before = self._standin_stats()
+        stage_metrics.reset()
+
+        records: List[Dict[str, Any]] = []
+        records_lock = threading.Lock()
+        export_dir = tempfile.TemporaryDirectory(prefix='npa-loadtest-') if self.export_format else None
+        started = time.perf_counter()
+        stop_at = started + duration if duration and not requests_per_user else None
+
+        def user(index: int) -> None:
+            rng = random.Random(self.seed * 100003 + index)
+            if ramp_up:
+                time.sleep(ramp_up * index / users)
+            done = 0
+            while True:
+                if requests_per_user is not None and done >= requests_per_user:
+                    break
+                if stop_at is not None and time.perf_counter() >= stop_at:
+                    break
+                record = self._request(processor, rng.choice(self.texts), export_dir, f"{index}-{done}")
+                record['user'] = index
+                with records_lock:
+                    records.append(record)
+                done += 1
+                if self.think_time:
+                    time.sleep(rng.uniform(0, 2 * self.think_time))
+
+        monitor.start()
+        threads = [threading.Thread(target=user, args=(index,), name=f'npa-loadtest-user-{index}', daemon=True)
+                   for index in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+        resources = monitor.stop()
+        if export_dir is not None:
+            export_dir.cleanup()
+
+        return {
+            'users': users,
+            'wall_seconds': wall,
+            **self._summarize(records, wall),
+            'queueing': {
+                'extraction': self._scheduler_summary(gpt_helper.scheduler, resources, 'extraction'),
+                'search': self._scheduler_summary(searcher.scheduler, resources, 'search'),
+                'rate_limiter': gpt_helper.rate_limiter.get_statistics(),
+            },
+            'resources': {key: value for key, value in resources.items()
+                          if not key.startswith(('extraction_', 'search_'))},
+            'extraction': dict(gpt_helper.extraction_stats),
+            'search': searcher.get_search_statistics(),
+            'standins': self._standin_delta(standin_before),
+            'stages': stage_metrics.snapshot()['stages'],
+        }
+
+    def _request(self, processor: NPAProcessor, text: str, export_dir, name: str) -> Dict[str, Any]:
+        """Один запрос пользователя: process_text и экспорт результата"""
+        record = {'started': time.perf_counter(), 'ok': False, 'partial': False, 'documents': 0,
+                  'failed_chunks': 0}
+        try:
+            writer = None
+            if export_dir is not None:
+                writer = create_writer(os.path.join(export_dir.name, f'{name}.{self.export_format}'),
+                                       self.export_format)
+            try:
+                results = processor.process_text(text, writer=writer, timeout_budget=self.timeout_budget)
+            finally:
+                if writer is not None:
+                    writer.close()
+            record['ok'] = True
+            record['documents'] = sum(len(results[category]) for category in ('successful', 'amendments'))
+            record['not_found'] = len(results['failed'])
+            record['errors'] = len(results['errors'])
+            record['failed_chunks'] = len(results['extraction_info'].get('failed_chunks', []))
+            deadline = results.get('deadline')
+            record['partial'] = bool(deadline and (deadline['expired'] or deadline['extraction'] == 'partial'))
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['seconds'] = time.perf_counter() - record['started']
+        return record
+
+    @staticmethod
+    def _summarize(records: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+        latencies = [record['seconds'] for record in records if record['ok']]
+        errors = [record for record in records if not record['ok']]
+        error_kinds: Dict[str, int] = {}
+        for record in errors:
+            kind = record['error'].split(':', 1)[0]
+            error_kinds[kind] = error_kinds.get(kind, 0) + 1
+        documents = sum(record['documents'] for record in records)
+        return {
+            'requests': {
+                'total': len(records),
+                'ok': len(latencies),
+                'errors': len(errors),
+                'error_rate': len(errors) / len(records) if records else 0.0,
+                'error_kinds': error_kinds,
+                'partial': sum(1 for record in records if record['partial']),
+                'with_failed_chunks': sum(1 for record in records if record['failed_chunks']),
+            },
+            'throughput': {
+                'requests_per_second': len(latencies) / wall if wall else 0.0,
+                'documents_per_second': documents / wall if wall else 0.0,
+                'documents_found': documents,
+            },
+            'latency': {
+                'min': min(latencies) if latencies else 0.0,
+                'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+                'p50': percentile(latencies, 0.50),
+                'p90': percentile(latencies, 0.90),
+                'p95': percentile(latencies, 0.95),
+                'p99': percentile(latencies, 0.99),
+                'max': max(latencies) if latencies else 0.0,
+            },
+        }
+
+    @staticmethod
+    def _scheduler_summary(scheduler: PriorityScheduler, resources: Dict[str, Any], name: str) -> Dict[str, Any]:
+        """Ожидание места в планировщике и глубина его очереди"""
+        classes = scheduler.get_statistics()['classes'].values()
+        granted = sum(cls['granted'] for cls in classes)
+        wait_total = sum(cls['wait_seconds_total'] for cls in classes)
+        return {
+            'capacity': scheduler.capacity,
+            'granted': granted,
+            'wait_seconds_avg': wait_total / granted if granted else 0.0,
+            'wait_seconds_max': max((cls['wait_seconds_max'] for cls in classes), default=0.0),
+            'queue_depth': resources[f'{name}_queue_depth'],
+            'running': resources[f'{name}_running'],
+        }
+
+    def _standin_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: {key: server.stats[key] for key in ('requests', 'errors_injected', 'rate_limited')}
+                for name, server in (('openai', self.openai_server), ('pravo', self.pravo_server))
+                if server is not None}
+
+    def _standin_delta(self, before: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        after = self._standin_stats()
+        return {name: {key: value - before[name][key] for key, value in stats.items()}
+                for name, stats in after.items()}
+
+    def run(self, levels: Sequence[int] = DEFAULT_USERS, duration: Optional[float] = 30.0,
+            requests_per_user: Optional[int] = None, ramp_up: float = 0.0,
+            on_level=None) -> Dict[str, Any]:
+        """
+        Прогон всех уровней нагрузки подряд
+
+        Args:
+            levels: числа пользователей
+            duration, requests_per_user, ramp_up: см. run_level
+            on_level: вызывается с результатом каждого уровня
+
+        Returns:
+            Dict: version, created_at, environment, parameters, levels
+        """
+        metrics_enabled = stage_metrics.enabled
+        stage_metrics.enable()
+        try:
+            results = []
+            for users in levels:
+                level = self.run_level(users, duration, requests_per_user, ramp_up)
+                results.append(level)
+                if on_level is not None:
+                    on_level(level)
+        finally:
+            stage_metrics.enabled = metrics_enabled
+
+        return {
+            'version': LOADTEST_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': environment_info(),
+            'parameters': {
+                'levels': list(levels),
+                'duration': duration,
+                'requests_per_user': requests_per_user,
+                'ramp_up': ramp_up,
+                'think_time': self.think_time,
+                'texts': len(self.texts),
+                'catalog_size': len(self.catalog),
+                'export_format': self.export_format,
+                'cache': self.cache,
+                'timeout_budget': self.timeout_budget,
+                'capacity': self.capacity,
+                'openai_faults': _faults_dict(self.openai_server),
+                'pravo_faults': _faults_dict(self.pravo_server),
+                'seed': self.seed,
+            },
+            'levels': results,
+        }
+
+def _faults_dict(server) -> Optional[Dict[str, float]]:
+    if server is None:
+        return None  # внешняя заглушка
+    faults = server.faults
+    return {'latency': faults.latency, 'jitter': faults.jitter, 'error_rate': faults.error_rate,
+            'rate_limit_rate': faults.rate_limit_rate}
+
+def format_level(level: Dict[str, Any]) -> str:
+    """Строка сводки уровня для консоли"""
+    latency, resources = level['latency'], level['resources']
+    queueing = level['queueing']
+    return (f"{level['users']:>6} {level['requests']['total']:>8} {level['requests']['errors']:>7} "
+            f"{level['throughput']['requests_per_second']:>8.2f} "
+            f"{latency['p50']:>7.2f} {latency['p95']:>7.2f} {latency['p99']:>7.2f} "
+            f"{queueing['extraction']['wait_seconds_avg']:>9.3f} {queueing['search']['wait_seconds_avg']:>9.3f} "
+            f"{resources['cpu_utilization'] * 100:>6.0f}% {resources['rss_bytes']['max'] / 2 ** 20:>7.0f} "
+            f"{resources['threads']['max']:>7}")
+
+LEVEL_HEADER = (f"{'польз.':>6} {'запросов':>8} {'ошибок':>7} {'зап/с':>8} "
+                f"{'p50, с':>7} {'p95, с':>7} {'p99, с':>7} {'ожид.LLM':>9} {'ожид.API':>9} "
+                f"{'CPU':>7} {'RSS,МБ':>7} {'потоков':>7}")
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='npa-loadtest',
+                                     description='Нагрузочное тестирование NPAProcessor на заглушках API')
+    parser.add_argument('-o', '--output', default='npa_loadtest.json', help='файл отчета JSON')
+    parser.add_argument('--users', type=int, nargs='+', default=list(DEFAULT_USERS),
+                        help='уровни нагрузки (одновременных пользователей)')
+    parser.add_argument('--duration', type=float, default=30.0, help='длительность уровня, с')
+    parser.add_argument('--requests', type=int, help='запросов на пользователя (вместо --duration)')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='плавный запуск пользователей, с')
+    parser.add_argument('--think-time', type=float, default=0.0, help='средняя пауза между запросами, с')
+    parser.add_argument('--corpus', help='реальный корпус вместо синтетических текстов')
+    parser.add_argument('--texts', type=int, default=200, help='синтетических текстов')
+    parser.add_argument('--catalog-size', type=int, default=2000, help='документов в каталоге заглушки')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='задержка ответа модели, с')
+    parser.add_argument('--llm-jitter', type=float, default=0.5)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='доля HTTP 500 от модели')
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=0.0, help='доля HTTP 429 от модели')
+    parser.add_argument('--api-latency', type=float, default=0.1, help='задержка ответа pravo.gov.ru, с')
+    parser.add_argument('--api-jitter', type=float, default=0.1)
+    parser.add_argument('--api-error-rate', type=float, default=0.0, help='доля HTTP 500 от pravo.gov.ru')
+    parser.add_argument('--openai-url', help='внешняя заглушка OpenAI (…/v1)')
+    parser.add_argument('--pravo-url', help='внешняя заглушка pravo.gov.ru (…/api)')
+    parser.add_argument('--rpm', type=float, help='лимит запросов к модели в минуту (0 - без лимита)')
+    parser.add_argument('--tpm', type=float, help='лимит токенов в минуту (0 - без лимита)')
+    parser.add_argument('--extraction-capacity', type=int, help='одновременных запросов к модели')
+    parser.add_argument('--search-capacity', type=int, help='одновременных запросов к API')
+    parser.add_argument('--timeout-budget', type=float, help='бюджет времени запроса, с')
+    parser.add_argument('--export-format', default='csv', help="формат экспорта результатов ('none' - без)")
+    parser.add_argument('--no-cache', action='store_true', help='без общего кэша поиска')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа npa-loadtest"""
+    args = create_parser().parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    capacity = {}
+    if args.extraction_capacity:
+        capacity['extraction'] = args.extraction_capacity
+    if args.search_capacity:
+        capacity['search'] = args.search_capacity
+    texts = load_corpus(args.corpus, args.texts) if args.corpus else None
+
+    test = LoadTest(
+        openai_faults=FaultProfile(args.llm_latency, args.llm_jitter, args.llm_error_rate,
+                                   args.llm_rate_limit_rate, seed=args.seed),
+        pravo_faults=FaultProfile(args.api_latency, args.api_jitter, args.api_error_rate, seed=args.seed),
+        openai_url=args.openai_url, pravo_url=args.pravo_url,
+        catalog_size=args.catalog_size, texts=texts, corpus_size=args.texts, seed=args.seed,
+        export_format=None if args.export_format == 'none' else args.export_format,
+        cache=not args.no_cache, timeout_budget=args.timeout_budget, think_time=args.think_time,
+        rpm=args.rpm, tpm=args.tpm, capacity=capacity,
+    )
+    print(f"🚦 Нагрузка {args.users} пользователей, {len(test.texts)} текстов")
+    print(LEVEL_HEADER)
+    with test:
+        report = test.run(args.users, args.duration, args.requests, args.ramp_up,
+                          on_level=lambda level: print(format_level(level), flush=True))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 Отчет: {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Морфологическая нормализация слов русского текста
+Словоформы приводятся к основе, общей для всех форм слова ("образовании",
+"образования" -> "образован"), поэтому основа находится подстрокой в любом
+склонении. Основы используются в запросах по названию, скоринге названий
+и поиске профстандартов по ключевым словам.
+
+Бэкенды по убыванию качества: pymorphy (общий префикс форм лексемы),
+snowball (snowballstemmer / PyStemmer) и встроенный суффиксный стеммер.
+Словарь юридических текстов мал и повторяется, поэтому основа каждой
+словоформы считается один раз: LRU-таблица, которую можно сохранить в файл.
+
+Короткая основа ("данные" -> "дан") общая для всех форм, но как подстрока
+дает ложные совпадения ("задание"), поэтому ищется только с начала слова
+"""
+
+import os
+import re
+import json
+import threading
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable, Pattern
+from npa_searcher.config import Config
+from npa_searcher.cache import LRUCache
+from npa_searcher.exceptions import ConfigError
+
+BACKENDS = ('pymorphy', 'snowball', 'builtin')
+
+# Версия правил основ: таблицы и индексы, построенные по другим правилам, пересчитываются
+STEM_VERSION = 2
+
+_WORD = re.compile(r'[^\W\d_]+')
+_VOWELS = 'аеиоуыэюя'
+_FIRST_VOWEL = re.compile(f'[{_VOWELS}]')
+_REGION = re.compile(f'[{_VOWELS}][^{_VOWELS}]')
+
+def _endings(*groups) -> tuple:
+    """(окончание, требуется ли перед ним а/я), длинные первыми"""
+    endings = [(ending, after_a) for after_a, words in groups for ending in words.split()]
+    return tuple(sorted(endings, key=lambda item: -len(item[0])))
+
+# Группы окончаний Snowball для русского языка
+_GERUND = _endings((True, 'в вши вшись'), (False, 'ив ивши ившись ыв ывши ывшись'))
+_REFLEXIVE = _endings((False, 'ся сь'))
+_ADJECTIVE = _endings((False, 'ее ие ые ое ими ыми ей ий ый ой ем им ым ом его ого ему ому их ых ую юю ая яя ою ею'))
+_PARTICIPLE = _endings((True, 'ем нн вш ющ щ'), (False, 'ивш ывш ующ'))
+_VERB = _endings((True, 'ла на ете йте ли й л ем н ло но ет ют ны ть ешь нно'),
+                 (False, 'ила ыла ена ейте уйте ите или ыли ей уй ил ыл им ым ен ило ыло ено ят ует уют ит ыт ены '
+                         'ить ыть ишь ую ю'))
+_NOUN = _endings((False, 'а ев ов ие ье е иями ями ами еи ии и ией ей ой ий й иям ям ием ем ам ом о у ах иях ях ы ь '
+                         'ию ью ю ия ья я'))
+_SUPERLATIVE = _endings((False, 'ейш ейше'))
+_DERIVATIONAL = _endings((False, 'ост ость'))
+
+def _strip(text: str, endings: tuple) -> Optional[str]:
+    """text без самого длинного подходящего окончания или None"""
+    for ending, after_a in endings:
+        if text.endswith(ending):
+            stem = text[:-len(ending)]
+            if not after_a or stem[-1:] in ('а', 'я'):
+                return stem
+    return None
+
+def builtin_stem(word: str) -> str:
+    """
+    Встроенный стеммер (алгоритм Snowball для русского языка)
+
+    Example:
+        >>> builtin_stem('образовании'), builtin_stem('Федерации')
+        ('образован', 'федерац')
+    """
+    word = word.lower().replace('ё', 'е')
+    match = _FIRST_VOWEL.search(word)
+    if not match:
+        return word
+    # RV - после первой гласной, R2 - вторая область "гласная + согласная"
+    prefix, rv = word[:match.end()], word[match.end():]
+    r1 = _REGION.search(word)
+    r2 = _REGION.search(word, r1.end()) if r1 else None
+    r2_start = r2.end() if r2 else len(word)
+
+    stem = _strip(rv, _GERUND)
+    if stem is None:
+        reflexive = _strip(rv, _REFLEXIVE)
+        if reflexive is not None:
+            rv = reflexive
+        stem = _strip(rv, _ADJECTIVE)
+        if stem is not None:
+            participle = _strip(stem, _PARTICIPLE)
+            if participle is not None:
+                stem = participle
+        else:
+            stem = _strip(rv, _VERB)
+            if stem is None:
+                stem = _strip(rv, _NOUN)
+            if stem is None:
+                stem = rv
+    rv = stem
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    derivational = _strip(rv, _DERIVATIONAL)
+    if derivational is not None and len(prefix) + len(derivational) >= r2_start:
+        rv = derivational
+
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        superlative = _strip(rv, _SUPERLATIVE)
+        if superlative is not None:
+            rv = superlative[:-1] if superlative.endswith('нн') else superlative
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+    return prefix + rv
+
+@lru_cache(maxsize=4096)
+def _word_start(stem: str) -> Pattern:
+    """Основа в начале слова: перед ней не буква"""
+    return re.compile(r'(?<![^\W\d_])' + re.escape(stem))
+
+def _pymorphy_stemmer() -> Callable[[str], str]:
+    """Основа - общий префикс всех форм лексемы наиболее вероятного разбора"""
+    try:
+        from pymorphy3 import MorphAnalyzer
+    except ImportError:
+        from pymorphy2 import MorphAnalyzer
+    analyzer = MorphAnalyzer()
+
+    def stem(word: str) -> str:
+        forms = [form.word.replace('ё', 'е') for form in analyzer.parse(word)[0].lexeme] or [word]
+        return os.path.commonprefix(forms + [word])
+    return stem
+
+def _snowball_stemmer() -> Callable[[str], str]:
+    try:
+        import snowballstemmer
+        return snowballstemmer.stemmer('russian').stemWord
+    except ImportError:
+        import Stemmer
+        return Stemmer.Stemmer('russian').stemWord
+
+def available_backends() -> List[str]:
+    """Установленные бэкенды в порядке предпочтения"""
+    available = []
+    for backend, modules in (('pymorphy', ('pymorphy3', 'pymorphy2')), ('snowball', ('snowballstemmer', 'Stemmer'))):
+        for module in modules:
+            try:
+                __import__(module)
+                available.append(backend)
+                break
+            except ImportError:
+                continue
+    return available + ['builtin']
+
+class WordNormalizer:
+    """
+    Основы словоформ с запоминанием
+
+    Example:
+        >>> normalizer = WordNormalizer('builtin')
+        >>> normalizer.stems('Об образовании в Российской Федерации', min_length=4)
+        ['образован', 'российск', 'федерац']
+        >>> normalizer.matches('информационные системы', 'Специалист по информационным системам')
+        True
+        >>> normalizer.matches('персональные данные', 'О персональных данных')
+        True
+    """
+
+    def __init__(self, backend: str = 'auto', cache_size: int = 200000,
+                 memo_path: Optional[str] = None, min_stem_length: int = 4):
+        """
+        Args:
+            backend: 'auto' (pymorphy -> snowball -> builtin), 'pymorphy', 'snowball' или 'builtin'
+            cache_size: размер таблицы словоформа -> основа
+            memo_path: JSON-файл таблицы (загружается при создании, пишется save())
+            min_stem_length: более короткая основа ищется только с начала слова
+                (короткие подстроки дают ложные совпадения)
+        """
+        if backend not in BACKENDS + ('auto',):
+            raise ConfigError(f"Неизвестный бэкенд морфологии: {backend}", {'available': list(BACKENDS)})
+        if backend == 'auto':
+            backend = available_backends()[0]
+
+        self.backend = backend
+        self.memo_path = memo_path
+        self.min_stem_length = min_stem_length
+        if backend == 'pymorphy':
+            try:
+                self._stem = _pymorphy_stemmer()
+            except ImportError:
+                raise ImportError("Для бэкенда pymorphy установите pymorphy3")
+        elif backend == 'snowball':
+            try:
+                self._stem = _snowball_stemmer()
+            except ImportError:
+                raise ImportError("Для бэкенда snowball установите snowballstemmer")
+        else:
+            self._stem = builtin_stem
+
+        self.signature = f"{backend}/{STEM_VERSION}"
+        self.cache = LRUCache(cache_size)
+        if memo_path and os.path.exists(memo_path):
+            self.load(memo_path)
+
+    def stem(self, word: str) -> str:
+        """Основа словоформы (нижний регистр, ё -> е)"""
+        word = word.lower().replace('ё', 'е')
+        stem = self.cache.get(word)
+        if stem is None:
+            stem = self._stem(word).lower().replace('ё', 'е') or word
+            self.cache.set(word, stem)
+        return stem
+
+    def is_short(self, stem: str) -> bool:
+        """Основа короче min_stem_length: совпадает только с начала слова"""
+        return len(stem) < self.min_stem_length
+
+    def contains(self, stem: str, text: str) -> bool:
+        """Основа встречается в тексте (text - в нижнем регистре, ё -> е)"""
+        if not self.is_short(stem):
+            return stem in text
+        return _word_start(stem).search(text) is not None
+
+    def tokens(self, text: str, min_length: int = 0) -> List[str]:
+        """Основы всех слов текста длиннее min_length (с повторами)"""
+        return [self.stem(word) for word in _WORD.findall(text or '') if len(word) > min_length]
+
+    def stems(self, text: str, min_length: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Основы слов текста без повторов, в порядке появления
+
+        Args:
+            text: текст (знаки препинания и числа пропускаются)
+            min_length: учитывать слова длиннее min_length
+            limit: не больше limit основ
+        """
+        result = []
+        for word in _WORD.findall(text or ''):
+            if len(word) <= min_length:
+                continue
+            stem = self.stem(word)
+            if stem not in result:
+                result.append(stem)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def query_terms(self, text: str, min_length: int = 0, limit: Optional[int] = None) -> List[str]:
+        """
+        Подстроки для поиска на сервере (запросы Name к API)
+        
+        Как stems(), но короткая основа заменяется словом: сервер ищет
+        подстроку и не умеет искать с начала слова
+        """
+        result = []
+        for word in _WORD.findall(text or ''):
+            if len(word) <= min_length:
+                continue
+            stem = self.stem(word)
+            term = word.lower().replace('ё', 'е') if self.is_short(stem) else stem
+            if term not in result:
+                result.append(term)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def matches(self, phrase: str, text: str) -> bool:
+        """Все слова phrase встречаются в text в любой форме"""
+        stems = self.stems(phrase)
+        text = (text or '').lower().replace('ё', 'е')
+        return bool(stems) and all(self.contains(stem, text) for stem in stems)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Сохранение таблицы основ (JSON)"""
+        path = path or self.memo_path
+        if not path:
+            raise ConfigError("Не задан файл таблицы основ", {'memo_path': path})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'backend': self.backend, 'version': STEM_VERSION, 'stems': dict(self.cache.items())},
+                      f, ensure_ascii=False)
+
+    def load(self, path: str) -> int:
+        """Загрузка таблицы основ; таблица другого бэкенда или версии правил пропускается. Возвращает число записей"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('backend') != self.backend or data.get('version') != STEM_VERSION:
+            return 0
+        for word, stem in data.get('stems', {}).items():
+            self.cache.set(word, stem)
+        return len(data.get('stems', {}))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Бэкенд и счетчики таблицы основ"""
+        return dict(self.cache.get_statistics(), backend=self.backend)
+
+_normalizer: Optional[WordNormalizer] = None
+_normalizer_lock = threading.Lock()
+
+def get_normalizer() -> WordNormalizer:
+    """Общий нормализатор процесса по Config.MORPHOLOGY_CONFIG"""
+    global _normalizer
+    with _normalizer_lock:
+        if _normalizer is None:
+            config = Config.MORPHOLOGY_CONFIG
+            _normalizer = WordNormalizer(config['backend'], config['cache_size'],
+                                         config['memo_path'], config['min_stem_length'])
+        return _normalizer
@@ -0,0 +1,300 @@
+"""
+Локальный индекс названий документов с ранжированием BM25
+Строится из метаданных /Documents (name и complexName по основам слов,
+см. morphology) и хранится на диске. Отвечает на поиск по названию без
+обращений к API: дополняет кандидатов скоринга и служит запасным вариантом,
+когда номер документа отсутствует или искажен.
+
+Командная строка:
+    npa-index build index.npz --download-pages 200
+    npa-index build index.npz --input documents.json --append
+    npa-index search index.npz "о защите персональных данных"
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+import numpy as np
+import requests
+from npa_searcher.config import Config
+from npa_searcher.candidates import Candidate, candidates_from_items
+from npa_searcher.morphology import WordNormalizer, get_normalizer
+
+class NameIndex:
+    """
+    BM25 по основам слов названий
+
+    Постинги (основа -> документы и частоты) строятся при первом поиске
+    после изменений; add() только токенизирует новые документы.
+
+    Example:
+        >>> index = NameIndex()
+        >>> index.add(response.json()['items'])
+        >>> index.search('об образовании', limit=5)
+        [(12.3, {'eoNumber': '...', 'name': 'Об образовании в Российской Федерации', ...}), ...]
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, normalizer: Optional[WordNormalizer] = None):
+        """
+        Args:
+            k1: насыщение частоты слова
+            b: нормализация по длине названия
+            normalizer: нормализатор словоформ (по умолчанию общий)
+        """
+        self.k1 = k1
+        self.b = b
+        self.normalizer = normalizer or get_normalizer()
+        self.documents: List[Dict[str, Any]] = []
+        self.terms: Dict[str, int] = {}
+        self._doc_terms: List[np.ndarray] = []
+        self._positions: Dict[str, int] = {}
+        self._postings = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _document_key(item: Dict[str, Any]) -> str:
+        return str(item.get('eoNumber') or item.get('id') or f"{item.get('number')}_{item.get('name')}")
+
+    def _tokenize(self, item: Dict[str, Any]) -> np.ndarray:
+        text = f"{item.get('name') or ''} {item.get('complexName') or ''}"
+        ids = [self.terms.setdefault(stem, len(self.terms)) for stem in self.normalizer.tokens(text, min_length=2)]
+        return np.array(ids, dtype=np.int32)
+
+    def add(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Добавление документов (элементов ответа /Documents)
+
+        Документ с тем же eoNumber (id) заменяется.
+
+        Returns:
+            int: число новых документов
+        """
+        added = 0
+        with self._lock:
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                key = self._document_key(item)
+                terms = self._tokenize(item)
+                position = self._positions.get(key)
+                if position is None:
+                    self._positions[key] = len(self.documents)
+                    self.documents.append(item)
+                    self._doc_terms.append(terms)
+                    added += 1
+                else:
+                    self.documents[position] = item
+                    self._doc_terms[position] = terms
+            self._postings = None
+        return added
+
+    def _build(self) -> tuple:
+        """Постинги по основам: смещения, документы, частоты, нормы длины"""
+        with self._lock:
+            if self._postings is not None:
+                return self._postings
+            count = len(self.documents)
+            lengths = np.fromiter((len(terms) for terms in self._doc_terms), dtype=np.int64, count=count)
+            terms = np.concatenate(self._doc_terms).astype(np.int64) if count else np.zeros(0, dtype=np.int64)
+            owners = np.repeat(np.arange(count, dtype=np.int64), lengths)
+
+            # Одна сортировка по (основа, документ): постинги основ подряд
+            keys, tf = np.unique(terms * max(count, 1) + owners, return_counts=True)
+            term_of = keys // max(count, 1)
+            offsets = np.searchsorted(term_of, np.arange(len(self.terms) + 1))
+            average = lengths.mean() if count and lengths.sum() else 1.0
+            length_norm = self.k1 * (1 - self.b + self.b * lengths / average)
+
+            self._postings = (offsets, (keys % max(count, 1)).astype(np.int32),
+                              tf.astype(np.float64), length_norm, count)
+            return self._postings
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Документы по убыванию BM25
+
+        Args:
+            query: название или слова названия в любой форме
+            limit: максимум результатов
+
+        Returns:
+            List (балл, элемент API); документы без общих слов с запросом не попадают
+        """
+        offsets, docs, tf, length_norm, count = self._build()
+        scores = np.zeros(count, dtype=np.float64)
+        for stem in set(self.normalizer.tokens(query, min_length=2)):
+            term = self.terms.get(stem)
+            if term is None or term >= len(offsets) - 1:
+                continue
+            start, end = offsets[term], offsets[term + 1]
+            df = end - start
+            if not df:
+                continue
+            idf = np.log(1 + (count - df + 0.5) / (df + 0.5))
+            postings, freq = docs[start:end], tf[start:end]
+            scores[postings] += idf * freq * (self.k1 + 1) / (freq + length_norm[postings])
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+        return [(float(scores[i]), self.documents[i]) for i in hits]
+
+    def candidates(self, query: str, limit: int = 20) -> List[Candidate]:
+        """Кандидаты поиска по названию в порядке BM25"""
+        return candidates_from_items(dict(item) for _, item in self.search(query, limit))
+
+    def save(self, path: str) -> None:
+        """Сохранение индекса (npz: документы, основы и токены названий)"""
+        with self._lock:
+            terms = sorted(self.terms, key=self.terms.get)
+            lengths = [len(ids) for ids in self._doc_terms]
+            np.savez_compressed(
+                path,
+                documents=np.array(json.dumps(self.documents, ensure_ascii=False)),
+                terms=np.array(terms, dtype=str),
+                doc_terms=np.concatenate(self._doc_terms) if self._doc_terms else np.zeros(0, dtype=np.int32),
+                doc_lengths=np.array(lengths, dtype=np.int64),
+                params=np.array([self.k1, self.b]),
+                backend=np.array(self.normalizer.signature),
+            )
+
+    @classmethod
+    def load(cls, path: str, normalizer: Optional[WordNormalizer] = None) -> 'NameIndex':
+        """
+        Загрузка индекса, сохраненного save()
+
+        Если основы строились другим бэкендом морфологии или по другим
+        правилам, названия токенизируются заново.
+        """
+        with np.load(path) as data:
+            k1, b = (float(value) for value in data['params'])
+            index = cls(k1, b, normalizer)
+            documents = json.loads(str(data['documents']))
+            if str(data['backend']) != index.normalizer.signature:
+                index.add(documents)
+                return index
+            index.documents = documents
+            index.terms = {term: i for i, term in enumerate(data['terms'].tolist())}
+            index._doc_terms = np.split(data['doc_terms'], np.cumsum(data['doc_lengths'])[:-1]) if documents else []
+            index._positions = {cls._document_key(item): i for i, item in enumerate(documents)}
+        return index
+
+def download_metadata(session: Optional[requests.Session] = None, api_url: Optional[str] = None,
+                      pages: int = 100, page_size: int = 100, start_page: int = 1,
+                      delay: Optional[float] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Страницы метаданных /Documents без фильтра
+
+    Args:
+        session: сессия requests (по умолчанию новая с DEFAULT_HEADERS)
+        api_url: адрес API (по умолчанию Config.API_BASE_URL)
+        pages: максимум страниц
+        page_size: документов на странице
+        start_page: первая страница
+        delay: пауза между запросами (по умолчанию SEARCH_CONFIG['request_delay'])
+
+    Yields:
+        List элементов страницы
+    """
+    if session is None:
+        session = requests.Session()
+        session.headers.update(Config.DEFAULT_HEADERS)
+    api_url = api_url or Config.API_BASE_URL
+    delay = Config.SEARCH_CONFIG['request_delay'] if delay is None else delay
+
+    for page in range(start_page, start_page + pages):
+        response = session.get(f"{api_url}/Documents", params={"PageSize": page_size, "Index": page}, timeout=30)
+        if response.status_code != 200:
+            break
+        data = response.json()
+        items = data.get('items') or []
+        if not items:
+            break
+        yield items
+        if page >= data.get('pagesTotalCount', page + 1):
+            break
+        time.sleep(delay)
+
+_index: Optional[NameIndex] = None
+_index_lock = threading.Lock()
+
+def get_name_index() -> Optional[NameIndex]:
+    """Общий индекс процесса из NAME_INDEX_CONFIG['path'] (None - индекс не задан или не построен)"""
+    global _index
+    with _index_lock:
+        path = Config.NAME_INDEX_CONFIG['path']
+        if _index is None and path and os.path.exists(path):
+            _index = NameIndex.load(path)
+        return _index
+
+def _load_items(path: str) -> List[Dict[str, Any]]:
+    """Элементы из JSON (список, ответ /Documents) или JSON Lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        return data.get('items') or []
+    return data
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='npa-index', description='Локальный индекс названий НПА (BM25)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='построить или дополнить индекс')
+    build.add_argument('index', help='файл индекса (.npz)')
+    build.add_argument('--input', nargs='+', default=[], help='метаданные: JSON, ответы /Documents или JSON Lines')
+    build.add_argument('--download-pages', type=int, default=0, help='скачать страниц /Documents')
+    build.add_argument('--page-size', type=int, default=100)
+    build.add_argument('--start-page', type=int, default=1)
+    build.add_argument('--api-url', help='адрес API (по умолчанию Config.API_BASE_URL)')
+    build.add_argument('--append', action='store_true', help='дополнить существующий индекс')
+
+    search = commands.add_parser('search', help='поиск по индексу')
+    search.add_argument('index', help='файл индекса (.npz)')
+    search.add_argument('query', help='название или его слова')
+    search.add_argument('--limit', type=int, default=10)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа npa-index"""
+    args = create_parser().parse_args(argv)
+
+    if args.command == 'search':
+        index = NameIndex.load(args.index)
+        started = time.perf_counter()
+        results = index.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔍 {len(results)} из {len(index)} документов за {elapsed:.1f} мс")
+        for score, item in results:
+            print(f"  {score:6.2f}  {item.get('number', '')}  {item.get('name', '')}  ({item.get('eoNumber', '')})")
+        return 0
+
+    index = NameIndex.load(args.index) if args.append and os.path.exists(args.index) else NameIndex()
+    before = len(index)
+    for path in args.input:
+        added = index.add(_load_items(path))
+        print(f"📄 {path}: новых документов {added}")
+    if args.download_pages:
+        for page, items in enumerate(download_metadata(api_url=args.api_url, pages=args.download_pages,
+                                                       page_size=args.page_size, start_page=args.start_page),
+                                     start=args.start_page):
+            index.add(items)
+            print(f"⬇️  страница {page}: документов в индексе {len(index)}")
+
+    index.save(args.index)
+    print(f"✅ Индекс {args.index}: {len(index)} документов (+{len(index) - before}), основ {len(index.terms)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,15 +3,27 @@
 Реализует множественные стратегии поиска и систему скоринга релевантности
 """
 
+import os
 import requests
 import time
+import numpy as np
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union
 from npa_searcher.config import Config
-from npa_searcher.utils import clean_number, is_amendment, retry_request, validate_document_data
-from npa_searcher.exceptions import APIError, DocumentNotFoundError
-from typing import Optional
-import os
+from npa_searcher.utils import clean_number, validate_document_data
+from npa_searcher.exceptions import DeadlineExceededError
+from npa_searcher.cache import LRUCache
+from npa_searcher.scoring import CandidateBatch
+from npa_searcher.candidates import Candidate, parse_candidates
+from npa_searcher.morphology import get_normalizer
+from npa_searcher.name_index import NameIndex, get_name_index
+from npa_searcher.document_keys import canonical_number, canonical_type, document_key
+from npa_searcher.knowledge_base import KnowledgeBase, get_knowledge_base
+from npa_searcher.scheduler import PriorityScheduler, get_scheduler
+from npa_searcher.deadline import Deadline
+from npa_searcher.instrumentation import timed
+from npa_searcher.profiling import profiled
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +33,26 @@ class NPASearcher:
     Использует множественные стратегии поиска для максимальной эффективности
     """
     
-    def __init__(self):
-        """Инициализация поисковика"""
+    def __init__(self, cache: Optional[LRUCache] = None,
+                 scheduler: Optional[PriorityScheduler] = None,
+                 name_index: Optional[NameIndex] = None,
+                 knowledge_base: Optional[KnowledgeBase] = None):
+        """
+        Инициализация поисковика
+        
+        Args:
+            cache: кэш результатов поиска (общий для потоков и запросов сервиса)
+            scheduler: планировщик обращений к API (по умолчанию общий для процесса)
+            name_index: локальный индекс названий (по умолчанию из NAME_INDEX_CONFIG['path'])
+            knowledge_base: база известных документов (по умолчанию общая, KNOWLEDGE_BASE_CONFIG)
+        """
+        self.cache = cache
+        self.name_index = name_index if name_index is not None else get_name_index()
+        # Известные документы по вариантам номера ('273-фз' находится и для '№ 273-ФЗ')
+        self.knowledge_base = knowledge_base if knowledge_base is not None else get_knowledge_base()
+        self.scheduler = scheduler or get_scheduler('search')
         self.api_url = Config.API_BASE_URL
+        self.request_delay = Config.SEARCH_CONFIG['request_delay']
         self.session = requests.Session()
         self.session.headers.update(Config.DEFAULT_HEADERS)
         
@@ -34,24 +63,60 @@ class NPASearcher:
             'failed_searches': 0,
             'api_calls': 0
         }
+        # Поисковик используется из нескольких потоков конвейера
+        self._stats_lock = threading.Lock()
         
         logger.info("NPA Searcher инициализирован")
 
-    def search_document(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def search_document(self, document: Dict[str, Any], timeout_budget: Optional[float] = None,
+                        deadline: Union[Deadline, float, None] = None) -> List[Dict[str, Any]]:
         """
         Главная функция поиска документа с множественными стратегиями
         
         Args:
             document: словарь с информацией о документе (type, number, title)
+            timeout_budget: бюджет времени поиска в секундах
+            deadline: крайний срок (Deadline или момент по time.time())
             
         Returns:
             List отсортированных по релевантности результатов
+            (при истечении срока - найденные к этому моменту)
+        """
+        return self.search_document_detailed(document, timeout_budget, deadline)['results']
+
+    @profiled('searcher.search_document')
+    @timed('search.document')
+    def search_document_detailed(self, document: Dict[str, Any], timeout_budget: Optional[float] = None,
+                                 deadline: Union[Deadline, float, None] = None) -> Dict[str, Any]:
+        """
+        Поиск документа с отчетом о полноте
+        
+        Стратегии выполняются по очереди, пока не истечет срок; обращения
+        к API получают таймаут не больше оставшегося времени.
+        
+        Args:
+            document: словарь с информацией о документе (type, number, title)
+            timeout_budget: бюджет времени поиска в секундах
+            deadline: крайний срок (Deadline или момент по time.time())
+            
+        Returns:
+            Dict: results - результаты, status - complete/partial/not_attempted,
+            strategies - {стратегия: complete/partial/skipped}
         """
         # Валидация входных данных
         validate_document_data(document)
+        deadline = Deadline.resolve(deadline, timeout_budget)
         
         # Статистика
-        self.search_stats['total_searches'] += 1
+        self._increment_stat('total_searches')
+        
+        cache_key = self._cache_key(document)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if cached:
+                    self._increment_stat('successful_searches')
+                return {'results': [dict(item) for item in cached], 'status': 'complete', 'strategies': {}}
         
         doc_type = document.get('type', '')
         doc_number = document.get('number', '')
@@ -59,40 +124,116 @@ class NPASearcher:
         
         logger.info(f"Поиск документа: {doc_type} №{doc_number}")
         
-        all_results = []
+        known, resolved = self._lookup_known_document(document)
+        if resolved is not None:
+            self._increment_stat('successful_searches')
+            logger.info(f"Документ найден в базе известных документов: {resolved['eoNumber']}")
+            if self.cache is not None:
+                self.cache.set(cache_key, [resolved])
+            return {'results': [dict(resolved)], 'status': 'complete', 'strategies': {'knowledge_base': 'complete'}}
         
-        # Стратегия 1: Поиск по номеру
+        # Стратегия 1: Поиск по номеру, 2: по названию (локальный индекс и API), 3: известные документы
+        strategies = []
         if doc_number:
-            results = self._search_by_number(doc_number)
-            all_results.extend(results)
+            strategies.append(('number', self._search_by_number, doc_number))
+        if doc_title and self.name_index is not None:
+            strategies.append(('index', self._search_name_index, doc_title))
+        if doc_title and (self.name_index is None or not Config.NAME_INDEX_CONFIG['replace_title_queries']):
+            strategies.append(('title', self._search_by_title, doc_title))
+        if known is not None and known.get('eo_hints'):
+            strategies.append(('known', self._search_known_document, known))
         
-        # Стратегия 2: Поиск по названию  
-        if doc_title:
-            results = self._search_by_title(doc_title)
-            all_results.extend(results)
-        
-        # Стратегия 3: Известные документы
-        clean_num = clean_number(doc_number)
-        if clean_num in Config.KNOWN_DOCUMENTS:
-            results = self._search_known_document(clean_num)
+        all_results = []
+        index_results = []
+        statuses = {}
+        for name, strategy, argument in strategies:
+            if deadline is not None and deadline.expired():
+                statuses[name] = 'skipped'
+                continue
+            results, complete = strategy(argument, deadline)
             all_results.extend(results)
+            if name == 'index':
+                index_results = results
+            statuses[name] = 'complete' if complete else 'partial'
+        
+        if all(status == 'complete' for status in statuses.values()):
+            status = 'complete'
+        elif all(status == 'skipped' for status in statuses.values()):
+            status = 'not_attempted'
+        else:
+            status = 'partial'
         
         # Фильтрация и скоринг
         filtered_results = self._filter_relevant_items(all_results, document)
         scored_results = self._score_results(filtered_results, document)
         
+        # Номер отсутствует или искажен: кандидаты индекса без фильтра по номеру;
+        # индекс нашел их по основам слов, так же они и оцениваются
+        if not scored_results and index_results:
+            config = Config.SCORING_CONFIG
+            if config.get('title_mode', 'words') == 'words':
+                config = dict(config, title_mode='stems')
+            scored_results = self._score_results(index_results, document, config)
+        
         # Удаление дубликатов и сортировка
         unique_results = self._remove_duplicates(scored_results)
-        final_results = sorted(unique_results, key=lambda x: x.get('score', 0), reverse=True)
+        final_results = sorted(unique_results, key=lambda x: x.score, reverse=True)
         
         if final_results:
-            self.search_stats['successful_searches'] += 1
+            self._increment_stat('successful_searches')
+        
+        logger.info(f"Найдено результатов: {len(final_results)} ({status})")
+        # Топ 10 результатов; полный JSON разбирается только для них
+        final_results = [candidate.to_dict() for candidate in final_results[:10]]
+        # Неполный поиск не кэшируем: без срока он может найти больше
+        if self.cache is not None and status == 'complete':
+            self.cache.set(cache_key, final_results)
+        self._learn(document, final_results, status)
+        return {'results': final_results, 'status': status, 'strategies': statuses}
+
+    @staticmethod
+    def _cache_key(document: Dict[str, Any]) -> tuple:
+        """Ключ кэша: канонические тип и номер и название - от них зависит результат поиска"""
+        key = document_key(document)
+        return (key.type, key.number, ' '.join(str(document.get('title', '')).lower().split()))
+
+    def _increment_stat(self, name: str, value: int = 1) -> None:
+        """Потокобезопасное увеличение счетчика статистики"""
+        with self._stats_lock:
+            self.search_stats[name] += value
+
+    @timed('search.api_request')
+    def _api_get(self, url: str, deadline: Optional[Deadline] = None, **kwargs) -> requests.Response:
+        """
+        Запрос к сайту через планировщик приоритетов
         
-        logger.info(f"Найдено результатов: {len(final_results)}")
-        return final_results[:10]  # Топ 10 результатов
+        Со сроком deadline ожидание места и таймаут запроса не превышают
+        оставшегося времени; после срока запрос не отправляется
+        (DeadlineExceededError)
+        """
+        slot_timeout = None
+        if deadline is not None:
+            slot_timeout = deadline.timeout()
+            kwargs['timeout'] = deadline.timeout(kwargs.get('timeout'))
+        self._increment_stat('api_calls')
+        with self.scheduler.slot(timeout=slot_timeout):
+            return self.session.get(url, **kwargs)
+
+    @staticmethod
+    def _pause(seconds: float, deadline: Optional[Deadline] = None) -> None:
+        """Задержка между запросами, не дольше оставшегося времени"""
+        if deadline is not None:
+            seconds = min(seconds, deadline.remaining())
+        time.sleep(seconds)
+
+    @staticmethod
+    def _out_of_time(deadline: Optional[Deadline]) -> bool:
+        return deadline is not None and deadline.expired()
+
     def get_search_statistics(self) -> Dict[str, Any]:
         """Получение статистики поиска"""
-        stats = self.search_stats.copy()
+        with self._stats_lock:
+            stats = self.search_stats.copy()
         if stats['total_searches'] > 0:
             stats['success_rate'] = (stats['successful_searches'] / stats['total_searches']) * 100
         else:
@@ -100,8 +241,10 @@ class NPASearcher:
             
         return stats
 
-    def _search_by_number(self, doc_number: str) -> List[Dict[str, Any]]:
-        """Поиск по номеру документа"""
+    @timed('search.strategy.number')
+    def _search_by_number(self, doc_number: str,
+                          deadline: Optional[Deadline] = None) -> Tuple[List[Candidate], bool]:
+        """Поиск по номеру документа: (результаты, выполнены ли все запросы)"""
         clean_num = clean_number(doc_number)
         results = []
         
@@ -114,88 +257,148 @@ class NPASearcher:
         ]
         
         for query in search_queries:
+            if self._out_of_time(deadline):
+                return results, False
             try:
-                response = self.session.get(f"{self.api_url}/Documents", params=query, timeout=10)
+                response = self._api_get(f"{self.api_url}/Documents", deadline, params=query, timeout=10)
                 if response.status_code == 200:
-                    data = response.json()
-                    items = data.get('items', [])
+                    items = parse_candidates(response.content)
                     results.extend(items)
                     logger.debug(f"Поиск по номеру '{doc_number}': найдено {len(items)}")
-                time.sleep(0.5)  # Задержка между запросами
+                self._pause(self.request_delay, deadline)  # Задержка между запросами
             except Exception as e:
+                if self._out_of_time(deadline) or isinstance(e, DeadlineExceededError):
+                    return results, False
                 logger.warning(f"Ошибка поиска по номеру: {e}")
                 continue
         
-        return results
+        return results, True
     
-    def _search_by_title(self, doc_title: str) -> List[Dict[str, Any]]:
-        """Поиск по названию документа"""
-        # Извлекаем ключевые слова (длина > 4, максимум 3 слова)
-        words = [w for w in doc_title.split() if len(w) > 4][:3]
+    @timed('search.strategy.title')
+    def _search_by_title(self, doc_title: str,
+                         deadline: Optional[Deadline] = None) -> Tuple[List[Candidate], bool]:
+        """Поиск по названию документа: (результаты, выполнены ли все запросы)"""
+        # Извлекаем ключевые слова (длина > 4, максимум 3 слова); основы находят
+        # любые формы слова, а одинаковые основы не дают повторных запросов
+        if Config.SEARCH_CONFIG['title_query_stems']:
+            words = get_normalizer().query_terms(doc_title, min_length=4, limit=3)
+        else:
+            words = [w for w in doc_title.split() if len(w) > 4][:3]
         if not words:
-            return []
+            return [], True
         
         results = []
         
         for word in words:
+            if self._out_of_time(deadline):
+                return results, False
             try:
                 query = {"Name": word, "PageSize": 20, "Index": 1}
-                response = self.session.get(f"{self.api_url}/Documents", params=query, timeout=10)
+                response = self._api_get(f"{self.api_url}/Documents", deadline, params=query, timeout=10)
                 
                 if response.status_code == 200:
-                    data = response.json()
-                    items = data.get('items', [])
+                    items = parse_candidates(response.content)
                     results.extend(items)
                     logger.debug(f"Поиск по слову '{word}': найдено {len(items)}")
                 
-                time.sleep(0.5)
+                self._pause(self.request_delay, deadline)
             except Exception as e:
+                if self._out_of_time(deadline) or isinstance(e, DeadlineExceededError):
+                    return results, False
                 logger.warning(f"Ошибка поиска по названию: {e}")
                 continue
         
-        return results
+        return results, True
+    
+    @timed('search.strategy.index')
+    def _search_name_index(self, doc_title: str,
+                           deadline: Optional[Deadline] = None) -> Tuple[List[Candidate], bool]:
+        """Поиск по названию в локальном индексе (BM25, без обращений к API)"""
+        results = self.name_index.candidates(doc_title, Config.NAME_INDEX_CONFIG['limit'])
+        logger.debug(f"Поиск по индексу названий: найдено {len(results)}")
+        return results, True
     
-    def _search_known_document(self, clean_number: str) -> List[Dict[str, Any]]:
-        """Поиск известных документов по EO номерам"""
-        known_info = Config.KNOWN_DOCUMENTS.get(clean_number, {})
+    @timed('search.knowledge_base')
+    def _lookup_known_document(self, document: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Запись базы известных документов по номеру
+        
+        Returns:
+            Tuple: (запись или None, результат без обращений к API или None - нужен поиск)
+        """
+        doc_number = document.get('number', '')
+        if not doc_number:
+            return None, None
+        # Запись ищется по номеру: тип от GPT пишется по-разному ('ФЗ', 'Федеральный закон РФ')
+        doc_type = document.get('type', '')
+        known = self.knowledge_base.lookup(doc_number, doc_type)
+        if known is None or not known.get('document') or not Config.KNOWLEDGE_BASE_CONFIG['resolve_directly']:
+            return known, None
+        # Готовый результат - только при том же типе (Указ № 1490 и постановление № 1490)
+        if doc_type and canonical_type(known.get('type', '')) != canonical_type(doc_type):
+            return known, None
+        return known, dict(known['document'])
+    
+    def _learn(self, document: Dict[str, Any], results: List[Dict[str, Any]], status: str) -> None:
+        """Запоминание уверенно найденного документа в базе (KNOWLEDGE_BASE_CONFIG['learn'])"""
+        config = Config.KNOWLEDGE_BASE_CONFIG
+        if not config['learn'] or status != 'complete' or not results:
+            return
+        if results[0].get('score', 0) >= config['min_learn_score']:
+            try:
+                if self.knowledge_base.learn(document, results[0]):
+                    logger.info(f"Документ добавлен в базу известных документов: {results[0].get('eoNumber')}")
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить базу известных документов: {e}")
+    
+    @timed('search.strategy.known')
+    def _search_known_document(self, known: Dict[str, Any],
+                               deadline: Optional[Deadline] = None) -> Tuple[List[Candidate], bool]:
+        """Поиск известного документа по EO номерам записи базы: (результаты, выполнены ли все запросы)"""
         results = []
         
         # Поиск по известным EO номерам
-        for eo_number in known_info.get('eo_hints', []):
+        for eo_number in known.get('eo_hints', []):
+            if self._out_of_time(deadline):
+                return results, False
             try:
-                response = self.session.get(f"{self.api_url}/Document", 
-                                         params={"eoNumber": eo_number}, timeout=10)
+                response = self._api_get(f"{self.api_url}/Document", deadline,
+                                        params={"eoNumber": eo_number}, timeout=10)
                 if response.status_code == 200:
-                    doc_data = response.json()
-                    if doc_data:
-                        results.append(doc_data)
+                    found = parse_candidates(response.content, key=None)
+                    if found:
+                        results.extend(found)
                         logger.debug(f"Найден известный документ: {eo_number}")
-                time.sleep(0.5)
+                self._pause(self.request_delay, deadline)
             except Exception as e:
+                if self._out_of_time(deadline) or isinstance(e, DeadlineExceededError):
+                    return results, False
                 logger.warning(f"Ошибка поиска известного документа: {e}")
                 continue
         
-        return results
+        return results, True
     
-    def _filter_relevant_items(self, items: List[Dict[str, Any]], document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    @timed('search.filter')
+    def _filter_relevant_items(self, items: List[Candidate], document: Dict[str, Any]) -> List[Candidate]:
         """Фильтрация релевантных элементов"""
         doc_number = document.get('number', '').lower()
         clean_num = clean_number(doc_number).lower()
+        key_number = document_key(document).number
         
         relevant = []
         
         for item in items:
-            item_number = item.get('number', '').lower()
-            item_name = item.get('name', '').lower()
-            complex_name = item.get('complexName', '').lower()
+            item_number = item.number_lower
             
-            # Проверка совпадения номера
+            # Проверка совпадения номера; канонический номер совпадает и при
+            # другом написании ("273 ФЗ" и "273-ФЗ")
             is_number_match = (
                 doc_number == item_number or
                 clean_num == item_number or
                 clean_num in item_number or
                 item_number in clean_num or
-                clean_num in complex_name
+                clean_num in item.complex_lower or
+                (key_number and canonical_number(item_number) == key_number)
             )
             
             if is_number_match:
@@ -203,79 +406,36 @@ class NPASearcher:
         
         return relevant
     
-    def _score_results(self, results: List[Dict[str, Any]], document: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Система скоринга результатов"""
-        doc_number = document.get('number', '').lower()
-        doc_title = document.get('title', '').lower()
-        clean_num = clean_number(doc_number).lower()
-        
+    @timed('search.score')
+    def _score_results(self, results: List[Candidate], document: Dict[str, Any],
+                       config: Optional[Dict[str, Any]] = None) -> List[Candidate]:
+        """Система скоринга результатов (векторно, см. npa_searcher.scoring)"""
+        config = config or Config.SCORING_CONFIG
+        batch = CandidateBatch.from_candidates(results)
+        scores = batch.scores(document, config)
+        
+        # Добавляем результат если score достаточно высокий
         scored_results = []
-        
-        for result in results:
-            score = 0
-            item_number = result.get('number', '').lower()
-            item_name = result.get('name', '').lower()
-            complex_name = result.get('complexName', '').lower()
-            
-            # Оценка номера документа
-            if doc_number == item_number:
-                score += 8000
-            elif clean_num == item_number:
-                score += 7000
-            elif clean_num in item_number:
-                number_ratio = len(clean_num) / max(len(item_number), 1)
-                score += 6000 if number_ratio > 0.5 else 3000
-            elif item_number in clean_num:
-                score += 4000
-            
-            # Оценка названия
-            title_words = [w for w in doc_title.split() if len(w) > 3][:5]
-            name_matches = sum(1 for word in title_words if word in item_name)
-            complex_matches = sum(1 for word in title_words if word in complex_name)
-            total_matches = max(name_matches, complex_matches)
-            
-            if total_matches >= 3:
-                score += 3000
-            elif total_matches >= 2:
-                score += 1500
-            elif total_matches >= 1:
-                score += 500
-            
-            # Бонус за актуальность
-            publish_date = result.get('viewDate', '')
-            year_bonuses = {
-                '2024': 250, '2023': 200, '2022': 150,
-                '2021': 100, '2020': 50
-            }
-            for year, bonus in year_bonuses.items():
-                if year in publish_date:
-                    score += bonus
-                    break
-            
-            # Штрафы за изменения
-            is_amendment_doc = is_amendment(complex_name)
-            if is_amendment_doc:
-                score = min(score, 1000)
-            
-            # Добавляем результат если score достаточно высокий
-            if score >= 500:
-                result['score'] = score
-                result['is_amendment'] = is_amendment_doc
-                scored_results.append(result)
+        for index in np.flatnonzero(scores >= config['min_score_threshold']):
+            result = results[index]
+            result.score = int(scores[index])
+            result.is_amendment = bool(batch.amendment[index])
+            scored_results.append(result)
         
         return scored_results
     
-    def _remove_duplicates(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @timed('search.dedup')
+    def _remove_duplicates(self, results: List[Candidate]) -> List[Candidate]:
         """Удаление дубликатов результатов"""
         seen_keys = set()
         unique_results = []
         
         for result in results:
             # Создаем уникальные ключи
-            eo_number = result.get('eoNumber', '')
-            doc_id = result.get('id', '')
-            number = result.get('number', '')
-            name_part = result.get('name', '')[:30]
+            eo_number = result.eo_number
+            doc_id = result.doc_id
+            number = result.number
+            name_part = result.name_prefix
             
             keys = [eo_number, doc_id, f"{number}_{name_part}"]
             
@@ -415,7 +575,7 @@ class NPASearcher:
             'api_document': {
                 'source': 'API publication.pravo.gov.ru',
                 'eo_number': document_info.get('eoNumber', ''),
-                'pdf_url': f"http://publication.pravo.gov.ru/file/pdf?eoNumber={document_info.get('eoNumber', '')}",
+                'pdf_url': Config.PDF_URL_TEMPLATE.format(eo_number=document_info.get('eoNumber', '')),
                 'name': document_info.get('name', ''),
                 'number': document_info.get('number', ''),
                 'publish_date': document_info.get('viewDate', ''),
@@ -451,7 +611,7 @@ class NPASearcher:
             'type': 'api_document',
             'icon': '📄',
             'message': 'Оригинальный документ из официального API',
-            'url': f"http://publication.pravo.gov.ru/file/pdf?eoNumber={document_info.get('eoNumber', '')}",
+            'url': Config.PDF_URL_TEMPLATE.format(eo_number=document_info.get('eoNumber', '')),
             'purpose': 'Для изучения структуры и оригинальной версии',
             'date': document_info.get('viewDate', ''),
             'action': 'Скачать PDF из API'
@@ -494,6 +654,7 @@ class NPASearcher:
         return recommendations
 
 
+    @timed('pdf.download')
     def download_pdf(self, eo_number: str, filename: str = None) -> Optional[str]:
         """
         Скачивание PDF документа по EO номеру
@@ -512,29 +673,45 @@ class NPASearcher:
         if filename is None:
             filename = f"npa_{eo_number}.pdf"
         
+        content = self.fetch_pdf(eo_number)
+        if content is None:
+            return None
+        
+        # Сохраняем файл
+        with open(filename, 'wb') as f:
+            f.write(content)
+        
+        logger.info(f"PDF сохранен: {filename} ({len(content)} байт)")
+        return filename
+
+    @timed('pdf.fetch')
+    def fetch_pdf(self, eo_number: str) -> Optional[bytes]:
+        """
+        Загрузка PDF документа в память
+        
+        Args:
+            eo_number: номер электронного опубликования
+            
+        Returns:
+            bytes: содержимое PDF или None при ошибке
+        """
         # URL для скачивания PDF
-        pdf_url = f"http://publication.pravo.gov.ru/file/pdf?eoNumber={eo_number}"
+        pdf_url = Config.PDF_URL_TEMPLATE.format(eo_number=eo_number)
         
         try:
             logger.info(f"Скачивание PDF: {eo_number}")
             
             # Выполняем запрос на скачивание
-            response = self.session.get(pdf_url, timeout=60)
+            response = self._api_get(pdf_url, timeout=60)
             response.raise_for_status()
             
             # Проверяем, что это действительно PDF
             if (len(response.content) > 1000 and 
                 response.content[:8].startswith(b'%PDF')):
-                
-                # Сохраняем файл
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                
-                logger.info(f"PDF сохранен: {filename} ({len(response.content)} байт)")
-                return filename
-            else:
-                logger.error(f"Получен некорректный PDF файл для {eo_number}")
-                return None
+                return response.content
+            
+            logger.error(f"Получен некорректный PDF файл для {eo_number}")
+            return None
                 
         except Exception as e:
             logger.error(f"Ошибка скачивания PDF {eo_number}: {e}")
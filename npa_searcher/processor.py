@@ -3,67 +3,591 @@
 Объединяет GPT помощника и поисковик в простой интерфейс
 """
 
-import pandas as pd
+import time
+import queue
 import logging
+import threading
+import contextvars
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable, Union
 from npa_searcher.npa_searcher import NPASearcher
 from npa_searcher.gpt_helper import GPTHelper
-from npa_searcher.exceptions import NPASearchError
+from npa_searcher.backends import ExtractionBackend
+from npa_searcher.exceptions import NPASearchError, DeadlineExceededError
+from npa_searcher.config import Config
+from npa_searcher.corpus import iter_corpus_files, read_document, detect_encoding, is_plain_text
+from npa_searcher.journal import ProcessingJournal
+from npa_searcher.export import ResultWriter, create_writer
+from npa_searcher.results_store import ResultsStore, ResultsRun
+from npa_searcher.scheduler import submit_with_context
+from npa_searcher.deadline import Deadline
+from npa_searcher.instrumentation import timed
+from npa_searcher.profiling import profiled
 
 logger = logging.getLogger(__name__)
 
+# Маркер завершения очереди для поисковых потоков
+_STOP = object()
+
 class NPAProcessor:
     """
     Главный класс модуля - высокоуровневый интерфейс
     Объединяет все компоненты для полного цикла обработки НПА
     """
     
-    def __init__(self, openai_api_key: str):
+    def __init__(self, openai_api_key: Optional[str] = None,
+                 extraction_backend: Optional[ExtractionBackend] = None,
+                 results_store: Union[ResultsStore, str, None] = None,
+                 searcher: Optional[NPASearcher] = None,
+                 gpt_helper: Optional[GPTHelper] = None):
         """
         Инициализация процессора
         
         Args:
             openai_api_key: ключ для OpenAI API
+            extraction_backend: провайдер извлечения вместо OpenAI по ключу
+            results_store: хранилище результатов или его папка
+                (по умолчанию RESULTS_STORE_CONFIG['path']; None - не сохранять)
+            searcher: готовый поисковик (например, с общим кэшем сервиса)
+            gpt_helper: готовый GPTHelper (со своим планировщиком и ограничителем)
         """
         try:
-            self.searcher = NPASearcher()
-            self.gpt_helper = GPTHelper(openai_api_key)
+            self.searcher = searcher or NPASearcher()
+            self.gpt_helper = gpt_helper or GPTHelper(openai_api_key, backend=extraction_backend)
+            
+            store = results_store or Config.RESULTS_STORE_CONFIG['path']
+            self.results_store = ResultsStore(store) if isinstance(store, str) else store
             
             # Статистика работы
             self.processing_stats = {
                 'total_processed': 0,
                 'successful_extractions': 0,
                 'successful_searches': 0,
-                'total_documents_found': 0
+                'total_documents_found': 0,
+                'searches': 0,
+                'search_cache_hits': 0,      # результаты поиска из журнала
+                'chunk_cache_hits': 0,       # чанки, извлеченные в прошлых запусках
+                'extraction_seconds': 0.0,
+                'search_seconds': 0.0        # суммарно по поисковым потокам
             }
+            self._stats_lock = threading.Lock()
             
             logger.info("NPAProcessor успешно инициализирован")
             
         except Exception as e:
             raise NPASearchError(f"Ошибка инициализации NPAProcessor: {e}")
 
-    def process_text(self, text: str, include_letters: bool = True) -> Dict[str, Any]:
+    @profiled('processor.process_text')
+    @timed('pipeline.process_text')
+    def process_text(self, text: str, include_letters: bool = True,
+                     writer: Optional[ResultWriter] = None,
+                     timeout_budget: Optional[float] = None,
+                     deadline: Union[Deadline, float, None] = None) -> Dict[str, Any]:
         """
         Полная обработка текста: извлечение и поиск НПА
         
         Args:
             text: исходный текст с упоминаниями документов
             include_letters: включать ли письма в обработку
+            writer: потоковый экспорт - строки дописываются по мере готовности
+            timeout_budget: бюджет времени в секундах
+            deadline: крайний срок (Deadline или момент по time.time())
             
         Returns:
-            Dict с результатами обработки
+            Dict с результатами обработки; со сроком - то, что готово к его
+            истечению, и раздел deadline с полнотой по этапам
         """
         if not text or not text.strip():
             logger.warning("Передан пустой текст")
             return self._create_empty_results()
         
         logger.info(f"Начинаем обработку текста ({len(text)} символов)")
-        self.processing_stats['total_processed'] += 1
+        self._add_stat('total_processed')
+        
+        results = self._run_pipeline(text, include_letters, writer=writer,
+                                     deadline=Deadline.resolve(deadline, timeout_budget))
+        self._store_results(results)
+        
+        logger.info(f"Обработка завершена: найдено {len(results['successful'])}, "
+                    f"изменений {len(results['amendments'])}, не найдено {len(results['failed'])}, "
+                    f"ошибок {len(results['errors'])}")
+        return results
+
+    @profiled('processor.process_file')
+    @timed('pipeline.process_file')
+    def process_file(self, path: str, include_letters: bool = True,
+                     encoding: Optional[str] = None,
+                     writer: Optional[ResultWriter] = None,
+                     timeout_budget: Optional[float] = None,
+                     deadline: Union[Deadline, float, None] = None) -> Dict[str, Any]:
+        """
+        Обработка большого текстового файла без загрузки в память целиком
+        
+        Args:
+            path: путь к текстовому файлу
+            include_letters: включать ли письма в обработку
+            encoding: кодировка (по умолчанию определяется по началу файла)
+            writer: потоковый экспорт - строки дописываются по мере готовности
+            timeout_budget, deadline: бюджет времени, как в process_text
+            
+        Returns:
+            Dict с результатами обработки
+        """
+        encoding = encoding or detect_encoding(path)
+        logger.info(f"Начинаем обработку файла {path} ({encoding})")
+        self._add_stat('total_processed')
         
-        # Для краткости в Colab - упрощенная версия
-        # В полной версии здесь будет полная реализация
-        return self._create_empty_results()
+        results = self._run_pipeline(None, include_letters, path=path, encoding=encoding,
+                                     writer=writer, source=path,
+                                     deadline=Deadline.resolve(deadline, timeout_budget))
+        self._store_results(results)
+        return results
+
+    def process_corpus(self, source: Union[str, Iterable[str]], journal_path: str,
+                       include_letters: bool = True, writer: Optional[ResultWriter] = None,
+                       parallel_inputs: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Потоковая обработка корпуса с журналом для возобновления
+        
+        Файлы (txt, docx, pdf) читаются из папки или манифеста по одному.
+        Извлеченные чанки, результаты поиска и завершенные входы пишутся в
+        журнал; при повторном запуске с тем же журналом обработка продолжается
+        с места остановки без повторных вызовов LLM и API для готовой работы.
+        
+        Args:
+            source: папка, манифест (.lst/.manifest/.jsonl), файл или список таких путей
+            journal_path: путь к файлу журнала
+            include_letters: включать ли письма в обработку
+            writer: потоковый экспорт - строки дописываются по мере готовности
+            parallel_inputs: сколько входов обрабатывать одновременно
+            
+        Yields:
+            Dict с результатами по каждому еще не обработанному входу
+            (формат process_text, плюс ключ 'source'); при parallel_inputs > 1
+            - в порядке завершения
+        """
+        sources = [source] if isinstance(source, str) else list(source)
+        run = self.results_store.open_run() if self.results_store is not None else None
+        with ProcessingJournal(journal_path) as journal:
+            skipped = 0
+            pending = []
+            for corpus_source in sources:
+                for input_id, path in iter_corpus_files(corpus_source):
+                    if journal.is_completed(input_id):
+                        skipped += 1
+                    else:
+                        pending.append((input_id, path))
+            
+            def process_one(item: tuple) -> Dict[str, Any]:
+                return self._process_corpus_input(journal, item[0], item[1], include_letters, writer)
+            
+            if parallel_inputs > 1:
+                with ThreadPoolExecutor(max_workers=parallel_inputs) as pool:
+                    in_flight = set()
+                    for item in pending:
+                        # Держим в работе ограниченное число входов
+                        if len(in_flight) >= parallel_inputs * 2:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                yield self._finish_corpus_input(future.result(), run)
+                        in_flight.add(submit_with_context(pool, process_one, item))
+                    for future in as_completed(in_flight):
+                        yield self._finish_corpus_input(future.result(), run)
+            else:
+                for item in pending:
+                    yield self._finish_corpus_input(process_one(item), run)
+            
+            if skipped:
+                logger.info(f"Корпус: пропущено уже обработанных входов: {skipped}")
+        
+        # Запуск сохраняется, только если корпус пройден до конца
+        if run is not None:
+            run.close()
+
+    @profiled('processor.corpus_input')
+    def _process_corpus_input(self, journal: ProcessingJournal, input_id: str, path: str,
+                              include_letters: bool, writer: Optional[ResultWriter]) -> Dict[str, Any]:
+        """Обработка одного входа корпуса с отметкой о завершении в журнале"""
+        logger.info(f"Корпус: обработка {input_id}")
+        self._add_stat('total_processed')
+        try:
+            if is_plain_text(path):
+                # Текстовые файлы читаются окнами, без загрузки целиком
+                results = self._run_pipeline(None, include_letters, journal, input_id,
+                                             path=path, encoding=detect_encoding(path),
+                                             writer=writer, source=input_id)
+            else:
+                results = self._run_pipeline(read_document(path), include_letters,
+                                             journal, input_id, writer=writer, source=input_id)
+        except Exception as e:
+            logger.error(f"Не удалось прочитать {path}: {e}")
+            results = self._create_empty_results()
+            results['source'] = input_id
+            error = {'document': None, 'stage': 'read', 'error': str(e)}
+            results['errors'].append(error)
+            if writer is not None:
+                writer.write('errors', error, input_id)
+        
+        # Входы с ошибками не отмечаем - они будут повторены при возобновлении
+        if not results['errors'] and not results['extraction_info'].get('failed_chunks'):
+            journal.mark_completed(input_id, {
+                category: len(results[category])
+                for category in ('successful', 'amendments', 'failed')
+            })
+        return results
+
+    def _finish_corpus_input(self, results: Dict[str, Any], run: Optional[ResultsRun]) -> Dict[str, Any]:
+        if run is not None:
+            run.write_results(results)
+        return results
+
+    def _run_pipeline(self, text: Optional[str], include_letters: bool,
+                      journal: Optional[ProcessingJournal] = None,
+                      input_id: Optional[str] = None,
+                      path: Optional[str] = None, encoding: str = 'utf-8',
+                      writer: Optional[ResultWriter] = None, source: Any = None,
+                      deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Конвейер обработки одного текста
+        
+        Документы из GPT сразу попадают в ограниченную очередь, которую
+        разбирает пул поисковых потоков. Поиск идет параллельно с извлечением,
+        и общее время стремится к max(извлечение, поиск).
+        
+        Со сроком извлечение получает долю бюджета DEADLINE_CONFIG['extraction_share'],
+        поиск - весь бюджет. Документы, до поиска которых очередь не дошла,
+        попадают в errors со статусом not_attempted.
+        
+        Args:
+            text: исходный текст (None, если текст читается из path)
+            include_letters: включать ли письма в обработку
+            journal: журнал для записи и повторного использования работы
+            input_id: идентификатор входа в журнале
+            path: текстовый файл для оконного чтения вместо text
+            encoding: кодировка файла path
+            writer: потоковый экспорт результатов
+            source: источник для результатов и строк экспорта
+            deadline: крайний срок обработки
+            
+        Returns:
+            Dict с результатами обработки
+        """
+        results = self._create_empty_results()
+        if source is not None:
+            results['source'] = source
+        results_lock = threading.Lock()
+        search_queue = queue.Queue(maxsize=Config.PIPELINE_CONFIG['queue_size'])
+        
+        def add_result(category: str, entry: Dict[str, Any]) -> None:
+            with results_lock:
+                results[category].append(entry)
+            if writer is not None:
+                writer.write(category, entry, source)
+        
+        def on_result(key: str, category: str, entry: Dict[str, Any]) -> None:
+            # Неполный поиск не журналируем, чтобы при возобновлении он повторился
+            if journal is not None and category != 'errors' and entry.get('search_status') == 'complete':
+                journal.record_search(key, category, entry)
+            add_result(category, entry)
+        
+        workers = self._start_search_workers(search_queue, on_result, deadline)
+        
+        def enqueue(doc: Dict[str, Any]) -> None:
+            if not include_letters and self.gpt_helper.is_letter(doc):
+                return
+            results['extraction_info']['processed_for_search'] += 1
+            key = self.gpt_helper.document_key(doc)
+            
+            cached = journal.get_search(key) if journal is not None else None
+            if cached is not None:
+                self._add_stat('search_cache_hits')
+                category, entry = cached
+                add_result(category, dict(entry, document=doc))
+                return
+            
+            self._add_stat('searches')
+            search_queue.put((key, doc))  # блокируется при полной очереди
+        
+        extract_kwargs = {}
+        if deadline is not None:
+            extract_kwargs['deadline'] = deadline.share(Config.DEADLINE_CONFIG['extraction_share'])
+        if journal is not None:
+            extract_kwargs['on_chunk'] = lambda index, docs: journal.record_chunk(input_id, index, docs)
+            extract_kwargs['done_chunks'] = journal.get_chunks(input_id)
+            self._add_stat('chunk_cache_hits', len(extract_kwargs['done_chunks']))
+        
+        started = time.perf_counter()
+        try:
+            if path is not None:
+                extracted = self.gpt_helper.extract_documents_from_file(
+                    path, encoding, on_document=enqueue, **extract_kwargs)
+            else:
+                extracted = self.gpt_helper.extract_documents(text, on_document=enqueue, **extract_kwargs)
+            self._add_stat('successful_extractions')
+            results['extraction_info'].update(self._extraction_info(extracted))
+        except Exception as e:
+            logger.error(f"Ошибка извлечения документов: {e}")
+            add_result('errors', {'document': None, 'stage': 'extraction', 'error': str(e)})
+        finally:
+            self._add_stat('extraction_seconds', time.perf_counter() - started)
+            self._stop_search_workers(search_queue, workers)
+        
+        if deadline is not None:
+            results['deadline'] = self._deadline_info(deadline, results)
+        self._update_found_stats(results)
+        return results
+
+    @profiled('processor.process_texts')
+    @timed('pipeline.process_texts')
+    def process_texts(self, texts: Iterable[Any], include_letters: bool = True) -> Dict[str, Any]:
+        """
+        Пакетная обработка нескольких текстов с глобальной дедупликацией
+        
+        Тексты извлекаются параллельно, документы дедуплицируются между
+        всеми текстами до поиска: каждый уникальный документ ищется в API
+        один раз, а результат раскладывается по всем текстам, где он упомянут.
+        
+        Args:
+            texts: тексты (str) или пары (идентификатор источника, текст)
+            include_letters: включать ли письма в обработку
+            
+        Returns:
+            Dict: 'texts' - результаты по каждому тексту в формате process_text,
+            'documents' - уникальные документы с упоминаниями,
+            'summary' - число упоминаний, уникальных документов и поисков
+        """
+        sources = []
+        extraction_infos = {}
+        extraction_errors = {}
+        unique = {}  # ключ документа -> запись с упоминаниями и результатом
+        state_lock = threading.Lock()
+        search_queue = queue.Queue(maxsize=Config.PIPELINE_CONFIG['queue_size'])
+        
+        def on_result(key: str, category: str, entry: Dict[str, Any]) -> None:
+            with state_lock:
+                unique[key]['category'] = category
+                unique[key]['entry'] = entry
+        
+        workers = self._start_search_workers(search_queue, on_result)
+        
+        def extract_one(index: int, source: Any, text: str) -> None:
+            def on_document(doc: Dict[str, Any]) -> None:
+                if not include_letters and self.gpt_helper.is_letter(doc):
+                    return
+                key = self.gpt_helper.document_key(doc)
+                with state_lock:
+                    record = unique.get(key)
+                    is_new = record is None
+                    if is_new:
+                        record = unique[key] = {'key': key, 'document': doc, 'mentions': [],
+                                                'category': None, 'entry': None}
+                    record['mentions'].append({'text_index': index, 'source': source, 'document': doc})
+                # Поиск запускается только по первому упоминанию
+                if is_new:
+                    self._add_stat('searches')
+                    search_queue.put((key, doc))
+            
+            try:
+                extracted = self.gpt_helper.extract_documents(text, on_document=on_document)
+                extraction_infos[index] = self._extraction_info(extracted)
+                self._add_stat('successful_extractions')
+            except Exception as e:
+                logger.error(f"Ошибка извлечения документов ({source}): {e}")
+                extraction_errors[index] = str(e)
+        
+        max_workers = Config.PIPELINE_CONFIG['extraction_workers']
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                in_flight = set()
+                for index, item in enumerate(texts):
+                    source, text = item if isinstance(item, tuple) else (index, item)
+                    sources.append(source)
+                    self._add_stat('total_processed')
+                    if not text or not text.strip():
+                        extraction_infos[index] = {}
+                        continue
+                    
+                    # Держим в работе ограниченное число текстов
+                    if len(in_flight) >= max_workers * 2:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight.add(submit_with_context(pool, extract_one, index, source, text))
+        finally:
+            self._stop_search_workers(search_queue, workers)
+        
+        # Раскладываем результаты уникальных документов по исходным текстам
+        per_text = [self._create_empty_results() for _ in sources]
+        for index, results in enumerate(per_text):
+            results['source'] = sources[index]
+            results['extraction_info'].update(extraction_infos.get(index, {}))
+            if index in extraction_errors:
+                results['errors'].append({'document': None, 'stage': 'extraction',
+                                          'error': extraction_errors[index]})
+        
+        total_mentions = 0
+        for record in unique.values():
+            mentioned_in = [mention['source'] for mention in record['mentions']]
+            total_mentions += len(record['mentions'])
+            for mention in record['mentions']:
+                results = per_text[mention['text_index']]
+                results['extraction_info']['processed_for_search'] += 1
+                results[record['category']].append(
+                    dict(record['entry'], document=mention['document'], mentioned_in=mentioned_in)
+                )
+        
+        for results in per_text:
+            self._update_found_stats(results)
+        
+        summary = {
+            'texts': len(sources),
+            'total_mentions': total_mentions,
+            'unique_documents': len(unique),
+            'searches': len(unique),
+            'searches_saved': total_mentions - len(unique)
+        }
+        logger.info(f"Пакетная обработка: {summary['texts']} текстов, "
+                    f"{total_mentions} упоминаний, {len(unique)} уникальных документов")
+        
+        batch_results = {
+            'texts': per_text,
+            'documents': list(unique.values()),
+            'summary': summary
+        }
+        self._store_results(batch_results)
+        return batch_results
+
+    def _store_results(self, results: Dict[str, Any]) -> None:
+        """Сохранение результатов в хранилище, если оно подключено"""
+        if self.results_store is None:
+            return
+        try:
+            run_id = self.results_store.append(results)
+            results['run_id'] = run_id
+        except Exception as e:
+            # Сбой аналитики не должен терять результаты обработки
+            logger.error(f"Не удалось сохранить результаты в хранилище: {e}")
+
+    def _start_search_workers(self, search_queue: queue.Queue,
+                              on_result: Callable[[Any, str, Dict[str, Any]], None],
+                              deadline: Optional[Deadline] = None) -> List[threading.Thread]:
+        """Запуск пула поисковых потоков конвейера"""
+        # Потоки наследуют класс нагрузки вызывающего (см. scheduler.use_priority)
+        workers = [
+            threading.Thread(target=contextvars.copy_context().run,
+                             args=(self._search_worker, search_queue, on_result, deadline),
+                             name=f"npa-search-{i}", daemon=True)
+            for i in range(Config.PIPELINE_CONFIG['search_workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        return workers
+
+    def _stop_search_workers(self, search_queue: queue.Queue, workers: List[threading.Thread]) -> None:
+        """Остановка пула после того, как очередь будет разобрана"""
+        for _ in workers:
+            search_queue.put(_STOP)
+        for worker in workers:
+            worker.join()
+
+    def _search_worker(self, search_queue: queue.Queue,
+                       on_result: Callable[[Any, str, Dict[str, Any]], None],
+                       deadline: Optional[Deadline] = None) -> None:
+        """
+        Поисковый поток конвейера: берет пары (метка, документ) из очереди
+        и передает категорию и запись результата в on_result по мере готовности
+        """
+        while True:
+            item = search_queue.get()
+            if item is _STOP:
+                break
+            
+            token, doc = item
+            if deadline is not None and deadline.expired():
+                # Очередь дочитывается без запросов, чтобы извлечение не блокировалось
+                on_result(token, 'errors', {'document': doc, 'stage': 'search',
+                                            'error': 'Истек бюджет времени до начала поиска',
+                                            'search_status': 'not_attempted'})
+                continue
+            
+            started = time.perf_counter()
+            category, entry = self._search_and_classify(doc, deadline)
+            self._add_stat('search_seconds', time.perf_counter() - started)
+            on_result(token, category, entry)
+
+    def _extraction_info(self, extracted: Dict[str, Any]) -> Dict[str, Any]:
+        """Сводка извлечения для раздела extraction_info"""
+        return {
+            'total_extracted': len(extracted['all_documents']),
+            'npa_extracted': len(extracted['npa_documents']),
+            'letters_extracted': len(extracted['letters']),
+            'failed_chunks': extracted.get('failed_chunks', [])
+        }
+
+    def _update_found_stats(self, results: Dict[str, Any]) -> None:
+        """Учет найденных документов в статистике обработки"""
+        found = len(results['successful']) + len(results['amendments'])
+        self._add_stat('successful_searches', found)
+        self._add_stat('total_documents_found', found)
+
+    def _search_and_classify(self, doc: Dict[str, Any], deadline: Optional[Deadline] = None) -> tuple:
+        """
+        Поиск одного документа и определение категории результата
+        
+        Args:
+            doc: извлеченный документ
+            deadline: крайний срок поиска
+            
+        Returns:
+            Tuple: (категория - successful/amendments/failed/errors, запись результата
+            с search_status - complete/partial/not_attempted)
+        """
+        try:
+            search = self.searcher.search_document_detailed(doc, deadline=deadline)
+        except Exception as e:
+            logger.warning(f"Ошибка поиска {doc.get('number', '')}: {e}")
+            status = 'not_attempted' if isinstance(e, DeadlineExceededError) else 'complete'
+            return 'errors', {'document': doc, 'stage': 'search', 'error': str(e), 'search_status': status}
+        
+        search_results = search['results']
+        if not search_results:
+            reason = 'Документ не найден' if search['status'] == 'complete' else 'Документ не найден до истечения срока'
+            return 'failed', {'document': doc, 'reason': reason, 'search_status': search['status']}
+        
+        best_match = search_results[0]
+        entry = {
+            'document': doc,
+            'best_match': best_match,
+            'alternatives': search_results[1:],
+            'score': best_match.get('score', 0),
+            'search_status': search['status']
+        }
+        
+        if best_match.get('is_amendment'):
+            return 'amendments', entry
+        return 'successful', entry
+
+    @staticmethod
+    def _deadline_info(deadline: Deadline, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Полнота результатов при обработке со сроком"""
+        documents = {'complete': 0, 'partial': 0, 'not_attempted': 0}
+        for category in ('successful', 'amendments', 'failed', 'errors'):
+            for entry in results[category]:
+                status = entry.get('search_status')
+                if status in documents:
+                    documents[status] += 1
+        
+        timed_out = [failed for failed in results['extraction_info'].get('failed_chunks', [])
+                     if failed.get('timed_out')]
+        # Deadline(expires_at), созданный вызывающим, не знает бюджета - затраченное время неизвестно
+        elapsed = deadline.elapsed()
+        return {
+            'budget_seconds': deadline.budget,
+            'elapsed_seconds': round(elapsed, 3) if elapsed is not None else None,
+            'expired': deadline.expired(),
+            'extraction': 'partial' if timed_out else 'complete',
+            'timed_out_chunks': len(timed_out),
+            'documents': documents
+        }
 
     def _create_empty_results(self) -> Dict[str, Any]:
         """Создание пустой структуры результатов"""
@@ -81,17 +605,50 @@ class NPAProcessor:
         }
 
     def export_to_excel(self, results: Dict[str, Any], filename: str = None) -> str:
-        """Экспорт результатов в Excel"""
+        """Экспорт результатов в Excel (листы по категориям)"""
+        return self.export_results(results, filename, 'xlsx')
+
+    def export_results(self, results: Dict[str, Any], filename: str = None,
+                       fmt: Optional[str] = None) -> str:
+        """
+        Экспорт результатов в xlsx, csv или parquet
+        
+        Args:
+            results: результаты process_text / process_file
+            filename: путь к файлу (по умолчанию npa_results_<время>.<формат>)
+            fmt: формат; по умолчанию определяется по расширению
+            
+        Returns:
+            str: путь к файлу (для csv/parquet - основа имен файлов категорий)
+        """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"npa_results_{timestamp}.xlsx"
+            filename = f"npa_results_{timestamp}.{fmt or 'xlsx'}"
         
-        # Для краткости в Colab - упрощенная версия
-        df = pd.DataFrame([])
-        df.to_excel(filename, index=False)
+        with create_writer(filename, fmt) as writer:
+            writer.write_results(results)
         
         return filename
 
+    def create_writer(self, filename: str, fmt: Optional[str] = None) -> ResultWriter:
+        """
+        Потоковый писатель для передачи в process_text/process_file/process_corpus
+        
+        Args:
+            filename: путь к файлу результатов
+            fmt: формат (xlsx, csv, parquet); по умолчанию по расширению
+            
+        Returns:
+            ResultWriter: писатель (закрыть после обработки)
+        """
+        return create_writer(filename, fmt)
+
+    def _add_stat(self, name: str, value: float = 1) -> None:
+        """Потокобезопасное увеличение счетчика статистики"""
+        with self._stats_lock:
+            self.processing_stats[name] += value
+
     def get_processing_statistics(self) -> Dict[str, Any]:
         """Получение статистики обработки"""
-        return self.processing_stats
+        with self._stats_lock:
+            return self.processing_stats.copy()
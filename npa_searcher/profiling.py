@@ -0,0 +1,341 @@
+"""
+Профилирование по запросу
+Точки входа NPAProcessor/NPASearcher/GPTHelper обернуты profiled(): при
+включенном профилировщике доля вызовов (sample_rate) профилируется целиком
+(cProfile или выборка стеков всех потоков), а по этапам собирается
+память через tracemalloc. Отчеты пишутся в папку на каждый запуск.
+
+Включение без изменения кода: NPA_PROFILE=0.01 (доля запусков),
+NPA_PROFILE_MODE=stack, NPA_PROFILE_DIR=profiles.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import cProfile
+import pstats
+import logging
+import functools
+import threading
+import tracemalloc
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Iterator, List
+from npa_searcher.config import Config
+from npa_searcher.exceptions import ConfigError
+
+logger = logging.getLogger(__name__)
+
+MODES = ('cprofile', 'stack')
+
+# Запуск, внутри которого выполняется текущий код; переносится в потоки через copy_context
+_active_run: contextvars.ContextVar = contextvars.ContextVar('npa_profile_run', default=None)
+
+# tracemalloc общий для процесса: включаем на время профилируемых запусков
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+def _tracemalloc_start(frames: int) -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+def _tracemalloc_stop() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+class StackSampler:
+    """
+    Статистический профилировщик: раз в interval секунд снимает стеки всех
+    потоков и считает свернутые стеки (формат flamegraph.pl / speedscope)
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='npa-profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top_functions(self, limit: int) -> List[Dict[str, Any]]:
+        """Функции по доле выборок, в которых они на вершине стека"""
+        total = sum(self.stacks.values()) or 1
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [{'function': name, 'samples': count, 'share': round(count / total, 4)}
+                for name, count in leaves.most_common(limit)]
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class ProfileRun:
+    """Один профилируемый запуск: профилировщик, память по этапам и отчет"""
+
+    def __init__(self, name: str, mode: str, output_dir: str, options: Dict[str, Any]):
+        self.name = name
+        self.mode = mode
+        self.output_dir = output_dir
+        self.options = options
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:6]}"
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._profile = None
+        self._sampler = None
+        self._snapshot = None
+
+    def start(self) -> None:
+        if self.options['tracemalloc']:
+            _tracemalloc_start(self.options['tracemalloc_frames'])
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.mode == 'cprofile':
+            # cProfile видит только вызывающий поток; для пулов потоков - режим stack
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(self.options['sample_interval'])
+            self._sampler.start()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Время и чистый прирост памяти вложенного этапа"""
+        tracing = tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            memory_delta = tracemalloc.get_traced_memory()[0] - memory_before if tracing else 0
+            with self._lock:
+                stats = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'memory_net_bytes': 0,
+                                                       'memory_max_delta_bytes': 0})
+                stats['calls'] += 1
+                stats['seconds'] += elapsed
+                stats['memory_net_bytes'] += memory_delta
+                stats['memory_max_delta_bytes'] = max(stats['memory_max_delta_bytes'], memory_delta)
+
+    def finish(self) -> Dict[str, Any]:
+        """Остановка профилировщика и запись отчета"""
+        elapsed = time.perf_counter() - self.started
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.run_id)
+        limit = self.options['top']
+        report = {
+            'run_id': self.run_id,
+            'entry_point': self.name,
+            'mode': self.mode,
+            'elapsed_seconds': round(elapsed, 6),
+            'stages': self.stages,
+        }
+
+        if self._profile is not None:
+            self._profile.dump_stats(base + '.prof')
+            report['profile_file'] = base + '.prof'
+            report['top_functions'] = self._top_cprofile(limit)
+        else:
+            self._sampler.dump(base + '.folded')
+            report['profile_file'] = base + '.folded'
+            report['samples'] = self._sampler.samples
+            report['top_functions'] = self._sampler.top_functions(limit)
+
+        if self._snapshot is not None:
+            try:
+                report['memory'] = self._memory_report(limit)
+            finally:
+                _tracemalloc_stop()
+
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"Профиль {self.name}: {base}.json")
+        return report
+
+    def _top_cprofile(self, limit: int) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(self._profile)
+        rows = []
+        for (filename, line, function), (calls, _, own, cumulative, _) in stats.stats.items():
+            rows.append({'function': f"{os.path.basename(filename)}:{line}:{function}",
+                         'calls': calls, 'own_seconds': round(own, 6),
+                         'cumulative_seconds': round(cumulative, 6)})
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:limit]
+
+    def _memory_report(self, limit: int) -> Dict[str, Any]:
+        """Прирост памяти за запуск: по строкам кода и по модулям пакета"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        diff = snapshot.compare_to(self._snapshot, 'lineno')
+        by_module: Counter = Counter()
+        for stat in snapshot.compare_to(self._snapshot, 'filename'):
+            by_module[os.path.basename(stat.traceback[0].filename)] += stat.size_diff
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_current_bytes': current,
+            'traced_peak_bytes': peak,
+            'top_lines': [{'line': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                           'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                          for stat in diff[:limit]],
+            'by_module_bytes': dict(by_module.most_common(limit)),
+        }
+
+class Profiler:
+    """
+    Профилировщик точек входа
+
+    Example:
+        >>> profiler.enable(sample_rate=0.05, mode='stack', output_dir='profiles')
+        >>> processor.process_text(text)   # каждый 20-й вызов - с отчетом
+        >>> with profiler.profile('nightly'):
+        ...     processor.process_file('dump.txt')
+    """
+
+    def __init__(self):
+        config = Config.PROFILING_CONFIG
+        self.enabled = False
+        self.sample_rate = config['sample_rate']
+        self.mode = config['mode']
+        self.output_dir = config['output_dir']
+        self.options = {key: config[key] for key in
+                        ('tracemalloc', 'tracemalloc_frames', 'sample_interval', 'top')}
+        self.runs = 0
+        self.active_runs = 0  # запуски profile() идут и при выключенной выборке
+        self._lock = threading.Lock()
+
+        env = config['env_vars']
+        rate = os.environ.get(env['sample_rate'])
+        if rate:
+            self.enable(sample_rate=float(rate),
+                        mode=os.environ.get(env['mode']) or None,
+                        output_dir=os.environ.get(env['output_dir']) or None)
+
+    def enable(self, sample_rate: Optional[float] = None, mode: Optional[str] = None,
+               output_dir: Optional[str] = None, memory: Optional[bool] = None) -> None:
+        """
+        Включение профилирования точек входа
+
+        Args:
+            sample_rate: доля профилируемых вызовов (0..1)
+            mode: 'cprofile' - детерминированный профиль вызывающего потока,
+                'stack' - выборка стеков всех потоков (дешевле, видит пулы)
+            output_dir: папка отчетов
+            memory: собирать ли память через tracemalloc
+        """
+        if mode is not None:
+            if mode not in MODES:
+                raise ConfigError(f"Неизвестный режим профилирования: {mode}", {'available': MODES})
+            self.mode = mode
+        if sample_rate is not None:
+            self.sample_rate = max(0.0, min(1.0, sample_rate))
+        if output_dir is not None:
+            self.output_dir = output_dir
+        if memory is not None:
+            self.options['tracemalloc'] = memory
+        self.enabled = self.sample_rate > 0
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def profile(self, name: str = 'block') -> Iterator[ProfileRun]:
+        """Профилирование блока независимо от sample_rate"""
+        current = _active_run.get()
+        if current is not None:
+            # Вложенный блок - этап уже идущего запуска
+            with current.stage(name):
+                yield current
+            return
+
+        run = ProfileRun(name, self.mode, self.output_dir, dict(self.options))
+        token = _active_run.set(run)
+        with self._lock:
+            self.active_runs += 1
+        run.start()
+        try:
+            yield run
+        finally:
+            _active_run.reset(token)
+            with self._lock:
+                self.active_runs -= 1
+            try:
+                run.finish()
+                with self._lock:
+                    self.runs += 1
+            except Exception as e:
+                # Отчет профилировщика не должен ломать обработку
+                logger.error(f"Не удалось записать профиль {run.run_id}: {e}")
+
+    def call(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        """Вызов точки входа: этап текущего запуска, новый запуск по выборке или как есть"""
+        run = _active_run.get()
+        if run is not None:
+            with run.stage(name):
+                return func(*args, **kwargs)
+        if random.random() >= self.sample_rate:
+            return func(*args, **kwargs)
+        with self.profile(name):
+            return func(*args, **kwargs)
+
+# Общий профилировщик процесса
+profiler = Profiler()
+
+def profiled(name: str) -> Callable:
+    """
+    Декоратор точки входа: при выключенном профилировщике - одна проверка флага
+
+    Example:
+        >>> @profiled('processor.process_text')
+        ... def process_text(self, text): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not (profiler.enabled or profiler.active_runs):
+                return func(*args, **kwargs)
+            return profiler.call(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
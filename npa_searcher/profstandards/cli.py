@@ -0,0 +1,103 @@
+"""
+Командная строка profstandards-download: параллельная загрузка профстандартов
+Повторный запуск продолжает загрузку - готовые файлы пропускаются
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+from .downloader import ProfstandardDownloader
+
+logger = logging.getLogger(__name__)
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='profstandards-download',
+        description='Параллельная загрузка PDF профессиональных стандартов с возобновлением'
+    )
+    parser.add_argument('codes', nargs='*', help='коды профстандартов (например 06.001)')
+    parser.add_argument('--all', action='store_true', help='скачать все коды из реестра')
+    parser.add_argument('--codes-file', help='файл с кодами, по одному на строку')
+    parser.add_argument('-o', '--output-dir', default='data/profstandards', help='папка для PDF')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='параллельных загрузок')
+    parser.add_argument('--delay', type=float, default=None,
+                        help='пауза после каждой загрузки в потоке, с')
+    parser.add_argument('--force', action='store_true', help='скачать заново уже скачанные')
+    parser.add_argument('--retry-missing', action='store_true',
+                        help='повторить коды, ранее не найденные в источнике (HTTP 404)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='без строки прогресса')
+    parser.add_argument('-v', '--verbose', action='store_true', help='подробный лог')
+    return parser
+
+def collect_codes(args, downloader: ProfstandardDownloader) -> List[str]:
+    """Коды из аргументов, файла и реестра без повторов"""
+    codes = list(args.codes)
+    if args.codes_file:
+        with open(args.codes_file, 'r', encoding='utf-8') as f:
+            codes.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if args.all:
+        codes.extend(ps['code'] for ps in downloader.get_registry())
+    return list(dict.fromkeys(codes))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа profstandards-download"""
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s', stream=sys.stderr)
+
+    downloader = ProfstandardDownloader(output_dir=args.output_dir)
+    if args.delay is not None:
+        downloader.delay = args.delay
+
+    codes = collect_codes(args, downloader)
+    if not codes:
+        parser.error('укажите коды, --codes-file или --all')
+
+    invalid = [code for code in codes if not downloader._validate_code(code)]
+    codes = [code for code in codes if code not in invalid]
+
+    counts: Dict[str, int] = {}
+    started = time.monotonic()
+    interactive = sys.stderr.isatty()
+
+    def on_result(code: str, result: Dict) -> None:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        if args.quiet:
+            return
+        done = sum(counts.values())
+        line = (f"{done}/{len(codes)} | скачано {counts.get('success', 0)}, "
+                f"пропущено {counts.get('skipped', 0)}, нет в источнике {counts.get('not_found', 0)}, "
+                f"ошибок {counts.get('error', 0)}")
+        sys.stderr.write('\r' + line + '\033[K' if interactive else line + '\n')
+        sys.stderr.flush()
+
+    results = downloader.download_parallel(codes, workers=args.workers, force=args.force,
+                                           retry_missing=args.retry_missing, on_result=on_result)
+    if not args.quiet and interactive and codes:
+        sys.stderr.write('\n')
+
+    elapsed = time.monotonic() - started
+    summary = {
+        'output_dir': str(downloader.output_dir),
+        'requested': len(codes) + len(invalid),
+        'invalid_codes': invalid,
+        'statuses': counts,
+        'errors': {code: result['error'] for code, result in results.items()
+                   if result['status'] == 'error'},
+        'downloaded_bytes': sum(downloader.profstandard_path(code).stat().st_size
+                                for code, result in results.items() if result['status'] == 'success'),
+        'elapsed_seconds': round(elapsed, 3),
+    }
+    sys.stdout.write(json.dumps(summary, ensure_ascii=False, indent=2) + '\n')
+
+    # Ошибки сети/сервера можно повторить запуском с теми же аргументами
+    return 1 if counts.get('error') or invalid else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
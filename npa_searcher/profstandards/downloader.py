@@ -7,9 +7,13 @@ import requests
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import json
 import time
 import logging
-from typing import Dict, List, Optional
+import threading
+from typing import Callable, Dict, List, Optional
 import re
 
 # Простое логирование без сложных зависимостей
@@ -40,9 +44,12 @@ class ProfstandardDownloader:
     Интегрирован с конфигурацией NPA_Processor
     """
     
-    def __init__(self, config=None):
+    # Файл с кодами, которых нет в источнике (не запрашиваются повторно)
+    STATE_FILE = 'download_state.json'
+    
+    def __init__(self, config=None, output_dir: Optional[str] = None):
         self.config = config
-        self.output_dir = Path('data/profstandards')
+        self.output_dir = Path(output_dir or 'data/profstandards')
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Проверенные рабочие источники
@@ -60,6 +67,7 @@ class ProfstandardDownloader:
         
         self.timeout = 30
         self.delay = 2.0
+        self._state_lock = threading.Lock()
     
     def get_registry(self) -> List[Dict]:
         """Получить реестр профстандартов"""
@@ -98,7 +106,26 @@ class ProfstandardDownloader:
             raise ProfstandardDownloadError(f"Не удалось загрузить реестр: {e}")
     
     def download_pdf(self, code: str) -> Optional[bytes]:
-        """Скачать PDF профстандарта"""
+        """Скачать PDF профстандарта (None - не найден или ошибка загрузки)"""
+        try:
+            return self._fetch_pdf(code)
+        except ProfstandardDownloadError as e:
+            if not self._validate_code(code):
+                raise
+            logger.error(str(e))
+            return None
+    
+    def _fetch_pdf(self, code: str) -> Optional[bytes]:
+        """
+        Скачать PDF профстандарта, отличая отсутствие в источнике от сбоя
+        
+        Returns:
+            bytes PDF или None - источник ответил HTTP 404
+            
+        Raises:
+            ProfstandardDownloadError: сетевая ошибка, другой HTTP статус или не PDF
+                (временный сбой: код стоит запросить снова)
+        """
         if not self._validate_code(code):
             raise ProfstandardDownloadError(f"Некорректный код профстандарта: {code}")
         
@@ -107,35 +134,38 @@ class ProfstandardDownloader:
         
         try:
             response = self.session.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                # Проверяем что это PDF
-                content_type = response.headers.get('content-type', '').lower()
-                if 'pdf' in content_type or len(response.content) > 10000:
-                    logger.info(f"Профстандарт {code} загружен ({len(response.content):,} байт)")
-                    return response.content
-                else:
-                    logger.warning(f"Получен файл неподходящего формата для {code}")
-            elif response.status_code == 404:
-                logger.warning(f"Профстандарт {code} не найден (HTTP 404)")
-            else:
-                logger.warning(f"Ошибка загрузки {code}: HTTP {response.status_code}")
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Ошибка скачивания {code}: {e}")
+        except requests.RequestException as e:
+            raise ProfstandardDownloadError(f"Ошибка скачивания {code}: {e}")
+        
+        if response.status_code == 404:
+            logger.warning(f"Профстандарт {code} не найден (HTTP 404)")
             return None
+        if response.status_code != 200:
+            raise ProfstandardDownloadError(f"Ошибка загрузки {code}: HTTP {response.status_code}")
+        
+        # Проверяем что это PDF
+        content_type = response.headers.get('content-type', '').lower()
+        if 'pdf' not in content_type and len(response.content) <= 10000:
+            raise ProfstandardDownloadError(f"Получен файл неподходящего формата для {code}")
+        
+        logger.info(f"Профстандарт {code} загружен ({len(response.content):,} байт)")
+        return response.content
+    
+    def profstandard_path(self, code: str) -> Path:
+        """Путь к PDF профстандарта"""
+        return self.output_dir / f"PS_{code.replace('.', '_')}.pdf"
     
     def save_profstandard(self, code: str, content: bytes) -> str:
         """Сохранить профстандарт"""
-        filename = f"PS_{code.replace('.', '_')}.pdf"
-        filepath = self.output_dir / filename
+        filepath = self.profstandard_path(code)
         
-        with open(filepath, 'wb') as f:
+        # Через временный файл: прерванная запись не выглядит скачанным файлом
+        partial_path = filepath.with_suffix('.pdf.part')
+        with open(partial_path, 'wb') as f:
             f.write(content)
+        os.replace(partial_path, filepath)
         
-        logger.info(f"Профстандарт {code} сохранен: {filename}")
+        logger.info(f"Профстандарт {code} сохранен: {filepath.name}")
         return str(filepath)
     
     def download_multiple(self, codes: List[str]) -> Dict[str, str]:
@@ -164,6 +194,100 @@ class ProfstandardDownloader:
         
         return results
     
+    def download_parallel(self, codes: List[str], workers: int = 4, force: bool = False,
+                          retry_missing: bool = False,
+                          on_result: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Dict]:
+        """
+        Параллельное скачивание с возобновлением
+        
+        Уже скачанные файлы и коды, ранее не найденные в источнике,
+        пропускаются, поэтому прерванную загрузку можно просто запустить снова.
+        
+        Args:
+            codes: коды профстандартов
+            workers: число параллельных загрузок
+            force: скачать заново уже скачанные
+            retry_missing: повторить коды, ранее не найденные в источнике
+            on_result: вызывается (код, результат) по мере готовности
+            
+        Returns:
+            Dict: код -> {'status': success/skipped/not_found/error, 'file' или 'error'};
+            в состоянии сохраняются только not_found (HTTP 404), error повторяется
+        """
+        state = self._load_state()
+        missing = set(state.get('not_found', []))
+        results = {}
+        pending = []
+        
+        for code in dict.fromkeys(codes):
+            filepath = self.profstandard_path(code)
+            if not force and filepath.exists() and filepath.stat().st_size > 0:
+                results[code] = {'status': 'skipped', 'file': str(filepath)}
+            elif not retry_missing and code in missing:
+                results[code] = {'status': 'not_found', 'file': None, 'cached': True}
+            else:
+                pending.append(code)
+                continue
+            if on_result is not None:
+                on_result(code, results[code])
+        
+        logger.info(f"Профстандарты: к загрузке {len(pending)}, пропущено {len(results)}")
+        
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(workers, 10))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        def download_one(code: str) -> Dict:
+            try:
+                # not_found - только настоящий HTTP 404; сбои сети и 5xx/429 - error,
+                # такие коды не запоминаются и запрашиваются при следующем запуске
+                pdf_content = self._fetch_pdf(code)
+                if pdf_content:
+                    return {'status': 'success', 'file': self.save_profstandard(code, pdf_content)}
+                return {'status': 'not_found', 'file': None}
+            except Exception as e:
+                logger.error(f"Ошибка обработки {code}: {e}")
+                return {'status': 'error', 'error': str(e)}
+            finally:
+                # Задержка на каждый поток, чтобы не перегружать источник
+                time.sleep(self.delay)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(download_one, code): code for code in pending}
+            for future in as_completed(futures):
+                code = futures[future]
+                results[code] = future.result()
+                
+                if results[code]['status'] == 'not_found':
+                    missing.add(code)
+                elif results[code]['status'] == 'success':
+                    missing.discard(code)
+                self._save_state({'not_found': sorted(missing)})
+                
+                if on_result is not None:
+                    on_result(code, results[code])
+        
+        return results
+    
+    def _load_state(self) -> Dict:
+        state_path = self.output_dir / self.STATE_FILE
+        if not state_path.exists():
+            return {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать {state_path}: {e}")
+            return {}
+    
+    def _save_state(self, state: Dict) -> None:
+        state_path = self.output_dir / self.STATE_FILE
+        with self._state_lock:
+            temp_path = state_path.with_suffix('.json.part')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, state_path)
+    
     def _validate_code(self, code: str) -> bool:
         """Валидация кода профстандарта"""
         pattern = r'^\d{2}\.\d{3}$'
@@ -4,6 +4,7 @@
 
 from typing import Dict, List, Optional, Any
 import logging
+from npa_searcher.morphology import get_normalizer
 
 logger = logging.getLogger(__name__)
 
@@ -45,26 +46,28 @@ class NPAProfstandardsIntegration:
             }
         ]
         
-        # Простая фильтрация по ключевым словам
+        # Простая фильтрация по ключевым словам; слова сравниваются по основам,
+        # поэтому "информационные системы" находит "информационным системам"
+        normalizer = get_normalizer()
         results = []
         for ps in mock_profstandards:
-            for keyword in keywords:
-                if keyword.lower() in ps['name'].lower() or keyword.lower() in ps['area'].lower():
-                    # Добавляем релевантность
-                    relevance = 0.5
-                    if keyword.lower() in ps['name'].lower():
-                        relevance += 0.4
-                    if keyword.lower() in ps['area'].lower():
-                        relevance += 0.1
-                    
-                    ps_copy = ps.copy()
-                    ps_copy['relevance'] = relevance
-                    ps_copy['matched_keywords'] = [kw for kw in keywords 
-                                                  if kw.lower() in ps['name'].lower() or kw.lower() in ps['area'].lower()]
-                    
-                    if ps_copy not in results:
-                        results.append(ps_copy)
-                    break
+            in_name = [kw for kw in keywords if normalizer.matches(kw, ps['name'])]
+            in_area = [kw for kw in keywords if normalizer.matches(kw, ps['area'])]
+            if not in_name and not in_area:
+                continue
+            
+            # Добавляем релевантность (по первому совпавшему ключевому слову)
+            keyword = next(kw for kw in keywords if kw in in_name or kw in in_area)
+            relevance = 0.5
+            if keyword in in_name:
+                relevance += 0.4
+            if keyword in in_area:
+                relevance += 0.1
+            
+            ps_copy = ps.copy()
+            ps_copy['relevance'] = relevance
+            ps_copy['matched_keywords'] = [kw for kw in keywords if kw in in_name or kw in in_area]
+            results.append(ps_copy)
         
         # Сортируем по релевантности
         results.sort(key=lambda x: x['relevance'], reverse=True)
@@ -0,0 +1,168 @@
+"""
+Ограничитель скорости запросов с учетом токенов
+Пускает запросы в пределах бюджетов RPM/TPM и учитывает Retry-After
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+from npa_searcher.config import Config
+from npa_searcher.exceptions import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding('o200k_base')
+except Exception:
+    _ENCODING = None
+
+def estimate_tokens(text: str) -> int:
+    """
+    Оценка числа токенов в тексте
+
+    Использует tiktoken, если он установлен, иначе - оценку по числу
+    символов (Config.RATE_LIMIT_CONFIG['chars_per_token'])
+
+    Args:
+        text: текст
+
+    Returns:
+        int: оценка числа токенов
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return int(len(text) / Config.RATE_LIMIT_CONFIG['chars_per_token']) + 1
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    Оценка токенов запроса chat.completions: промпт + лимит ответа
+
+    OpenAI списывает из TPM бюджета max_tokens целиком, поэтому
+    ответ оценивается по max_tokens, а не по ожидаемой длине
+
+    Args:
+        request: тело запроса
+
+    Returns:
+        int: оценка числа токенов
+    """
+    prompt_tokens = sum(estimate_tokens(m.get('content', '')) for m in request.get('messages', []))
+    return prompt_tokens + int(request.get('max_tokens') or 0)
+
+class TokenRateLimiter:
+    """
+    Два "ведра" - запросы и токены в минуту
+    Бюджеты пополняются непрерывно, acquire() блокирует до появления квоты
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute: лимит запросов в минуту (None - из конфига, 0 - без лимита)
+            tokens_per_minute: лимит токенов в минуту (None - из конфига, 0 - без лимита)
+        """
+        config = Config.RATE_LIMIT_CONFIG
+        self.rpm = config['requests_per_minute'] if requests_per_minute is None else requests_per_minute
+        self.tpm = config['tokens_per_minute'] if tokens_per_minute is None else tokens_per_minute
+
+        # Начинаем с полных ведер
+        self._requests = float(self.rpm)
+        self._tokens = float(self.tpm)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+        self.stats = {
+            'admitted': 0,
+            'tokens_admitted': 0,
+            'throttled': 0,
+            'wait_time': 0.0,
+            'pauses': 0
+        }
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _wait_needed(self, tokens: int, now: float) -> float:
+        """Сколько секунд ждать до появления квоты (0 - можно выполнять)"""
+        wait = max(0.0, self._paused_until - now)
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+        if self.tpm:
+            # Запрос больше всего бюджета пропускаем при полном ведре
+            needed = min(tokens, self.tpm)
+            if self._tokens < needed:
+                wait = max(wait, (needed - self._tokens) * 60.0 / self.tpm)
+        return wait
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Ожидание квоты на один запрос с указанным числом токенов
+
+        Args:
+            tokens: оценка токенов запроса
+            timeout: сколько можно ждать квоту, с (None - без ограничения)
+
+        Returns:
+            float: время ожидания в секундах
+
+        Raises:
+            DeadlineExceededError: квота не появится за timeout
+        """
+        started = time.monotonic()
+        throttled = False
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_needed(tokens, now)
+                if wait <= 0:
+                    break
+                if timeout is not None and now + wait > started + timeout:
+                    # Квота не успеет появиться - не занимаем ее зря
+                    raise DeadlineExceededError(f"Квота API освободится через {wait:.1f}с")
+                throttled = True
+                self._condition.wait(wait)
+
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= min(tokens, self.tpm)
+
+            waited = time.monotonic() - started
+            self.stats['admitted'] += 1
+            self.stats['tokens_admitted'] += tokens
+            self.stats['wait_time'] += waited
+            if throttled:
+                self.stats['throttled'] += 1
+
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """
+        Приостановка выдачи квоты (ответ 429 с Retry-After)
+
+        Args:
+            seconds: длительность паузы
+        """
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.stats['pauses'] += 1
+            self._condition.notify_all()
+        logger.warning(f"Лимит API: пауза {seconds:.1f}с")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Статистика ограничителя"""
+        with self._condition:
+            return dict(self.stats, requests_per_minute=self.rpm, tokens_per_minute=self.tpm)
@@ -0,0 +1,301 @@
+"""
+Колоночное хранилище результатов для аналитики по прошлым запускам
+Parquet с разбиением по дате запуска (run_date=YYYY-MM-DD/<run_id>.parquet)
+и векторные агрегации на pyarrow.compute
+"""
+
+import os
+import uuid
+import logging
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Iterable, Union
+from npa_searcher.config import Config
+from npa_searcher.document_keys import document_key
+from npa_searcher.exceptions import ConfigError
+from npa_searcher.export import CATEGORIES, COLUMNS, ResultWriter, result_to_row
+from npa_searcher.instrumentation import timed
+
+logger = logging.getLogger(__name__)
+
+# Колонки хранилища: колонки экспорта + сведения о запуске и упоминании
+STORE_COLUMNS = [
+    ('run_id', 'string'),
+    ('run_at', 'timestamp'),
+    ('category', 'string'),
+    ('doc_key', 'string'),
+    ('doc_date', 'string'),
+] + COLUMNS
+
+# Категории, в которых документ найден
+FOUND_CATEGORIES = ('successful', 'amendments')
+
+# Префикс незавершенных файлов: pyarrow.dataset пропускает файлы на '_'
+_IN_PROGRESS_PREFIX = '_inprogress_'
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Для хранилища результатов установите pyarrow")
+    return pa, pc, ds, pq
+
+def _store_schema(pa):
+    """Схема файла запуска"""
+    return pa.schema([
+        (name, pa.timestamp('s') if dtype == 'timestamp' else getattr(pa, dtype)())
+        for name, dtype in STORE_COLUMNS
+    ])
+
+def _as_date_string(value: Union[str, date, None]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime('%Y-%m-%d')
+
+class ResultsRun(ResultWriter):
+    """
+    Запись одного запуска в хранилище
+
+    Строки буферизуются и пишутся группами в один файл запуска. До close()
+    файл имеет служебное имя и не виден запросам, поэтому прерванный
+    запуск не попадает в аналитику.
+    """
+
+    format = 'parquet-store'
+
+    def __init__(self, root: str, run_id: Optional[str] = None,
+                 run_at: Optional[datetime] = None, row_group_size: Optional[int] = None):
+        """
+        Args:
+            root: папка хранилища
+            run_id: идентификатор запуска (по умолчанию - время + случайный суффикс)
+            run_at: время запуска (по умолчанию - текущее)
+            row_group_size: строк в группе Parquet
+        """
+        self._pa, _, _, self._pq = _import_pyarrow()
+
+        self.run_at = (run_at or datetime.now()).replace(microsecond=0)
+        self.run_id = run_id or f"{self.run_at.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.run_date = self.run_at.strftime('%Y-%m-%d')
+
+        partition = os.path.join(root, f"run_date={self.run_date}")
+        self.final_path = os.path.join(partition, f"{self.run_id}.parquet")
+        super().__init__(os.path.join(partition, f"{_IN_PROGRESS_PREFIX}{self.run_id}.parquet"))
+
+        self.schema = _store_schema(self._pa)
+        self.row_group_size = row_group_size or Config.RESULTS_STORE_CONFIG['row_group_size']
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+
+    def write(self, category: str, entry: Dict[str, Any], source: Any = None) -> None:
+        """Дописать запись результата вместе с ключом документа и датой запуска"""
+        row = result_to_row(category, entry, source)
+        document = entry.get('document') or {}
+        row.update({
+            'run_id': self.run_id,
+            'run_at': self.run_at,
+            'category': category,
+            'doc_key': document_key(document).text if document else '',
+            'doc_date': str(document.get('date', '')),
+        })
+        self.write_row(category, row)
+
+    def write_results(self, results: Dict[str, Any]) -> None:
+        """Дописать результаты process_text/process_file или process_texts"""
+        for item in results.get('texts', [results]):
+            source = item.get('source')
+            for category in CATEGORIES:
+                for entry in item.get(category, []):
+                    self.write(category, entry, source)
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self.schema))
+        self._buffer = []
+
+    def _write_row(self, category: str, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _close(self) -> None:
+        self._flush()
+        if self._writer is None:
+            # Пустой запуск в хранилище не сохраняем
+            return
+        self._writer.close()
+        os.replace(self.path, self.final_path)
+        self.path = self.final_path
+
+class ResultsStore:
+    """
+    Хранилище результатов обработки по запускам
+
+    Каждая запись - одно упоминание документа: исходный документ из текста,
+    категория, выбранный eoNumber и оценка. Запросы читают только нужные
+    колонки и разделы по датам и агрегируют векторно.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: папка хранилища (по умолчанию RESULTS_STORE_CONFIG['path'])
+        """
+        self.root = root or Config.RESULTS_STORE_CONFIG['path']
+        if not self.root:
+            raise ConfigError("Не задана папка хранилища результатов")
+        self._pa, self._pc, self._ds, _ = _import_pyarrow()
+        os.makedirs(self.root, exist_ok=True)
+
+    def open_run(self, run_id: Optional[str] = None,
+                 run_at: Optional[datetime] = None) -> ResultsRun:
+        """
+        Начать запись запуска (для потоковой записи в process_corpus)
+
+        Returns:
+            ResultsRun: писатель; запуск становится виден запросам после close()
+        """
+        return ResultsRun(self.root, run_id, run_at)
+
+    @timed('store.append')
+    def append(self, results: Dict[str, Any], run_id: Optional[str] = None,
+               run_at: Optional[datetime] = None) -> str:
+        """
+        Сохранить результаты как отдельный запуск
+
+        Args:
+            results: результаты process_text/process_file или process_texts
+            run_id: идентификатор запуска
+            run_at: время запуска
+
+        Returns:
+            str: идентификатор запуска
+        """
+        with self.open_run(run_id, run_at) as run:
+            run.write_results(results)
+        return run.run_id
+
+    def load(self, columns: Optional[List[str]] = None,
+             date_from: Union[str, date, None] = None, date_to: Union[str, date, None] = None,
+             categories: Optional[Iterable[str]] = None):
+        """
+        Чтение записей хранилища
+
+        Args:
+            columns: нужные колонки (по умолчанию все)
+            date_from: первая дата запуска включительно (YYYY-MM-DD или date)
+            date_to: последняя дата запуска включительно
+            categories: только эти категории
+
+        Returns:
+            pyarrow.Table: записи; колонка run_date берется из раздела
+        """
+        pa, pc, ds = self._pa, self._pc, self._ds
+        partitioning = ds.partitioning(pa.schema([('run_date', pa.string())]), flavor='hive')
+        # Явная схема: запросы к пустому хранилищу возвращают пустую таблицу
+        schema = _store_schema(pa).append(pa.field('run_date', pa.string()))
+        dataset = ds.dataset(self.root, format='parquet', partitioning=partitioning, schema=schema)
+
+        expression = None
+        conditions = []
+        date_from, date_to = _as_date_string(date_from), _as_date_string(date_to)
+        if date_from:
+            conditions.append(ds.field('run_date') >= date_from)
+        if date_to:
+            conditions.append(ds.field('run_date') <= date_to)
+        if categories is not None:
+            conditions.append(ds.field('category').isin(list(categories)))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return dataset.to_table(columns=columns, filter=expression)
+
+    def runs(self, **period) -> List[Dict[str, Any]]:
+        """Запуски: дата, время, число записей и найденных документов"""
+        table = self.load(['run_id', 'run_date', 'run_at', 'category'], **period)
+        table = table.append_column('found', self._is_found(table))
+        grouped = table.group_by(['run_id', 'run_date']).aggregate([
+            ('run_at', 'min'),
+            ('category', 'count'),
+            ('found', 'sum'),
+        ])
+        grouped = grouped.sort_by([('run_at_min', 'ascending')])
+        return [
+            {'run_id': row['run_id'], 'run_date': row['run_date'], 'run_at': row['run_at_min'],
+             'records': row['category_count'], 'found': row['found_sum']}
+            for row in grouped.to_pylist()
+        ]
+
+    def most_cited(self, limit: int = 20, **period) -> List[Dict[str, Any]]:
+        """
+        Самые часто упоминаемые найденные акты
+
+        Args:
+            limit: число актов в ответе
+            **period: date_from / date_to
+
+        Returns:
+            List[Dict]: eoNumber, название, число упоминаний и источников
+        """
+        pc = self._pc
+        table = self.load(['eo_number', 'found_name', 'source', 'run_id'],
+                          categories=FOUND_CATEGORIES, **period)
+        table = table.filter(pc.not_equal(table['eo_number'], ''))
+        grouped = table.group_by('eo_number').aggregate([
+            ('found_name', 'max'),
+            ('eo_number', 'count'),
+            ('source', 'count_distinct'),
+            ('run_id', 'count_distinct'),
+        ])
+        grouped = grouped.sort_by([('eo_number_count', 'descending'), ('eo_number', 'ascending')])
+        return [
+            {'eo_number': row['eo_number'], 'name': row['found_name_max'],
+             'mentions': row['eo_number_count'], 'sources': row['source_count_distinct'],
+             'runs': row['run_id_count_distinct']}
+            for row in grouped.slice(0, limit).to_pylist()
+        ]
+
+    def miss_rate_by_type(self, **period) -> List[Dict[str, Any]]:
+        """
+        Доля ненайденных документов по типам
+
+        Returns:
+            List[Dict]: тип, всего упоминаний, не найдено, доля (по убыванию доли)
+        """
+        pc = self._pc
+        table = self.load(['doc_type', 'category'],
+                          categories=FOUND_CATEGORIES + ('failed',), **period)
+        missed = pc.cast(pc.equal(table['category'], 'failed'), self._pa.int64())
+        table = table.append_column('missed', missed)
+        grouped = table.group_by('doc_type').aggregate([('missed', 'sum'), ('missed', 'count')])
+
+        total = grouped['missed_count']
+        rate = pc.divide(pc.cast(grouped['missed_sum'], self._pa.float64()), total)
+        grouped = grouped.append_column('miss_rate', rate)
+        grouped = grouped.sort_by([('miss_rate', 'descending'), ('missed_count', 'descending')])
+        return [
+            {'doc_type': row['doc_type'], 'total': row['missed_count'],
+             'missed': row['missed_sum'], 'miss_rate': round(row['miss_rate'], 4)}
+            for row in grouped.to_pylist()
+        ]
+
+    def score_summary(self, **period) -> List[Dict[str, Any]]:
+        """Число записей и оценки (средняя, минимум, максимум) по категориям"""
+        table = self.load(['category', 'score'], categories=FOUND_CATEGORIES + ('failed',), **period)
+        grouped = table.group_by('category').aggregate([
+            ('score', 'count'), ('score', 'mean'), ('score', 'min'), ('score', 'max'),
+        ])
+        return [
+            {'category': row['category'], 'records': row['score_count'],
+             'mean_score': round(row['score_mean'] or 0, 1),
+             'min_score': row['score_min'], 'max_score': row['score_max']}
+            for row in grouped.sort_by('category').to_pylist()
+        ]
+
+    def _is_found(self, table):
+        return self._pc.is_in(table['category'], value_set=self._pa.array(FOUND_CATEGORIES))
@@ -0,0 +1,213 @@
+"""
+Приоритетный планировщик обращений к внешним API
+Взвешенная справедливая очередь (WFQ) между классами нагрузки с резервом
+мощности для интерактивного класса
+"""
+
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterator
+from npa_searcher.config import Config
+from npa_searcher.exceptions import ConfigError, DeadlineExceededError
+
+# Класс нагрузки текущего запроса; переносится в рабочие потоки через copy_context
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('npa_priority', default=None)
+
+def current_priority() -> str:
+    """Класс нагрузки текущего контекста (по умолчанию из SCHEDULER_CONFIG)"""
+    return _current_priority.get() or Config.SCHEDULER_CONFIG['default_class']
+
+def validate_priority(name: str) -> str:
+    """Проверка имени класса нагрузки"""
+    if name not in Config.SCHEDULER_CONFIG['classes']:
+        raise ConfigError(f"Неизвестный класс нагрузки: {name}",
+                          {'available': sorted(Config.SCHEDULER_CONFIG['classes'])})
+    return name
+
+@contextmanager
+def use_priority(name: str) -> Iterator[None]:
+    """
+    Выполнение блока с заданным классом нагрузки
+
+    Example:
+        >>> with use_priority('batch'):
+        ...     processor.process_file('dump.txt')
+    """
+    validate_priority(name)
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def submit_with_context(pool, func: Callable, *args, **kwargs):
+    """pool.submit с переносом класса нагрузки в поток пула"""
+    return pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+class _Ticket:
+    __slots__ = ('cls', 'cost', 'enqueued_at', 'granted')
+
+    def __init__(self, cls: str, cost: float):
+        self.cls = cls
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.granted = threading.Event()
+
+class PriorityScheduler:
+    """
+    Выдача мест (одновременных обращений к API) по классам нагрузки
+
+    Свободное место получает класс с наименьшим виртуальным временем
+    (start-time fair queuing): после выдачи оно растет на cost / weight,
+    поэтому при постоянной очереди классы делят мощность пропорционально
+    весам. Доля reserved_share мощности доступна только своему классу:
+    ночной пакет не может занять места, зарезервированные для интерактивных
+    запросов. Работа выполняется в потоке вызывающего.
+    """
+
+    def __init__(self, capacity: int, classes: Optional[Dict[str, Dict[str, float]]] = None,
+                 name: str = ''):
+        """
+        Args:
+            capacity: число одновременных обращений
+            classes: {класс: {'weight': вес, 'reserved_share': доля резерва}}
+                (по умолчанию SCHEDULER_CONFIG['classes'])
+            name: имя планировщика для статистики
+        """
+        classes = classes or Config.SCHEDULER_CONFIG['classes']
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.weights = {cls: float(options.get('weight', 1.0)) for cls, options in classes.items()}
+
+        # Резерв не может занять все места - иначе остальные классы встанут
+        self.reserved = {}
+        for cls, options in classes.items():
+            share = float(options.get('reserved_share', 0.0))
+            self.reserved[cls] = min(self.capacity - 1, int(round(self.capacity * share))) if share else 0
+
+        self._lock = threading.Lock()
+        self._queues = {cls: deque() for cls in classes}
+        self._running = {cls: 0 for cls in classes}
+        self._vtime = {cls: 0.0 for cls in classes}
+        self._virtual_clock = 0.0
+        self._stats = {
+            cls: {'granted': 0, 'completed': 0, 'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+            for cls in classes
+        }
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None, cost: float = 1.0,
+             timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Занять место на время блока
+
+        Args:
+            priority: класс нагрузки (по умолчанию из контекста)
+            cost: стоимость обращения для справедливого распределения
+            timeout: сколько ждать места, с (None - без ограничения)
+
+        Raises:
+            DeadlineExceededError: место не выдано за timeout
+        """
+        ticket = self._acquire(priority or current_priority(), cost, timeout)
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def run(self, func: Callable, *args, priority: Optional[str] = None,
+            cost: float = 1.0, **kwargs) -> Any:
+        """Выполнить func, заняв место"""
+        with self.slot(priority, cost):
+            return func(*args, **kwargs)
+
+    def _acquire(self, cls: str, cost: float, timeout: Optional[float] = None) -> _Ticket:
+        if cls not in self._queues:
+            raise ConfigError(f"Неизвестный класс нагрузки: {cls}", {'available': sorted(self._queues)})
+
+        ticket = _Ticket(cls, max(cost, 1e-6))
+        with self._lock:
+            queue = self._queues[cls]
+            if not queue:
+                # Простаивавший класс не копит кредит за время простоя
+                self._vtime[cls] = max(self._vtime[cls], self._virtual_clock)
+            queue.append(ticket)
+            self._dispatch()
+        if not ticket.granted.wait(timeout):
+            with self._lock:
+                # Место могли выдать между таймаутом и блокировкой
+                if not ticket.granted.is_set():
+                    self._queues[cls].remove(ticket)
+                    raise DeadlineExceededError(
+                        f"Нет места в очереди {self.name or 'планировщика'} за {timeout:.2f}с")
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._running[ticket.cls] -= 1
+            self._stats[ticket.cls]['completed'] += 1
+            self._dispatch()
+
+    def _eligible(self, cls: str) -> bool:
+        """Можно ли выдать место классу, не трогая чужие незанятые резервы"""
+        free = self.capacity - sum(self._running.values())
+        protected = sum(max(0, reserved - self._running[other])
+                        for other, reserved in self.reserved.items() if other != cls)
+        return free > protected
+
+    def _dispatch(self) -> None:
+        """Выдача свободных мест очередям в порядке виртуального времени (под блокировкой)"""
+        while True:
+            candidates = [cls for cls, queue in self._queues.items() if queue and self._eligible(cls)]
+            if not candidates:
+                return
+
+            cls = min(candidates, key=lambda name: self._vtime[name])
+            ticket = self._queues[cls].popleft()
+            self._virtual_clock = self._vtime[cls]
+            self._vtime[cls] += ticket.cost / self.weights[cls]
+            self._running[cls] += 1
+
+            waited = time.monotonic() - ticket.enqueued_at
+            stats = self._stats[cls]
+            stats['granted'] += 1
+            stats['wait_seconds_total'] += waited
+            stats['wait_seconds_max'] = max(stats['wait_seconds_max'], waited)
+            ticket.granted.set()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Глубина очереди, занятые места и ожидание по классам"""
+        with self._lock:
+            classes = {}
+            for cls, stats in self._stats.items():
+                queue = self._queues[cls]
+                oldest = time.monotonic() - queue[0].enqueued_at if queue else 0.0
+                classes[cls] = dict(
+                    stats,
+                    queue_depth=len(queue),
+                    running=self._running[cls],
+                    weight=self.weights[cls],
+                    reserved_slots=self.reserved[cls],
+                    wait_seconds_avg=stats['wait_seconds_total'] / stats['granted'] if stats['granted'] else 0.0,
+                    oldest_wait_seconds=oldest,
+                )
+            return {'name': self.name, 'capacity': self.capacity, 'classes': classes}
+
+# Общие планировщики процесса: все поисковики и GPTHelper делят одну мощность API
+_schedulers: Dict[str, PriorityScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(name: str) -> PriorityScheduler:
+    """
+    Общий планировщик ресурса ('search' - API pravo.gov.ru, 'extraction' - модель)
+    с мощностью из SCHEDULER_CONFIG['capacity']
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            capacity = Config.SCHEDULER_CONFIG['capacity'][name]
+            scheduler = _schedulers[name] = PriorityScheduler(capacity, name=name)
+        return scheduler
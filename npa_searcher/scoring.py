@@ -0,0 +1,197 @@
+"""
+Пакетный скоринг кандидатов поиска на NumPy
+Поля кандидатов нормализуются один раз в массивы; уровни совпадения номера,
+число совпавших слов или основ названия (или сходство TF-IDF, см. title_similarity),
+бонус за год и ограничение для изменений считаются векторно.
+Веса - из Config.SCORING_CONFIG
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+from npa_searcher.config import Config
+from npa_searcher.exceptions import ConfigError
+from npa_searcher.morphology import get_normalizer
+from npa_searcher.title_similarity import get_title_vectorizer, title_scores
+from npa_searcher.utils import clean_number
+
+_NON_LETTERS = re.compile(r'[\W\d_]+')
+
+def _word_starts(texts: np.ndarray) -> np.ndarray:
+    """Тексты, где каждое слово начинается после пробела: ' ' + основа находит основу с начала слова"""
+    return np.array([' ' + _NON_LETTERS.sub(' ', text.replace('ё', 'е')) for text in texts.tolist()], dtype=str)
+
+def _contains(haystack: np.ndarray, needle) -> np.ndarray:
+    """Маска needle in haystack поэлементно (needle - строка или массив)"""
+    return np.char.find(haystack, needle) >= 0
+
+class CandidateBatch:
+    """
+    Кандидаты, подготовленные к скорингу
+
+    Нормализация (нижний регистр, длины номеров, признак изменения)
+    выполняется один раз, после чего партию можно оценивать относительно
+    любого числа документов.
+
+    Example:
+        >>> batch = CandidateBatch.from_candidates(candidates)
+        >>> scores = batch.scores({'number': '273-ФЗ', 'title': 'Об образовании'})
+    """
+
+    def __init__(self, numbers: Sequence[str], names: Sequence[str], complex_names: Sequence[str],
+                 dates: Sequence[str], amendment_keywords: Optional[List[str]] = None):
+        """
+        Args:
+            numbers, names, complex_names: поля кандидатов в нижнем регистре
+            dates: даты публикации (viewDate)
+            amendment_keywords: признаки изменений (по умолчанию Config.AMENDMENT_KEYWORDS)
+        """
+        self.size = len(numbers)
+        self.numbers = np.array(numbers, dtype=str)
+        self.names = np.array(names, dtype=str)
+        self.complex_names = np.array(complex_names, dtype=str)
+        self.dates = np.array(dates, dtype=str)
+        self.number_lengths = np.char.str_len(self.numbers) if self.size else np.zeros(0, dtype=np.int64)
+        # Названия для режима tfidf: n-граммы считаются при первом обращении
+        self._titles = [name or complex_name for name, complex_name in zip(names, complex_names)]
+        self._title_matrix = None
+        # Названия по словам для коротких основ (режим stems): считаются при первом обращении
+        self._word_names = None
+
+        keywords = Config.AMENDMENT_KEYWORDS if amendment_keywords is None else amendment_keywords
+        # Признак, содержащий другой признак, ничего не добавляет ('изменения в' -> 'изменени')
+        keywords = [k for k in keywords if not any(other != k and other in k for other in keywords)]
+        amendment = np.zeros(self.size, dtype=bool)
+        if self.size:
+            for keyword in keywords:
+                amendment |= _contains(self.complex_names, keyword)
+            amendment &= np.char.str_len(self.complex_names) > 0
+        self.amendment = amendment
+
+    @classmethod
+    def from_candidates(cls, candidates: Sequence[Any], amendment_keywords: Optional[List[str]] = None) -> 'CandidateBatch':
+        """Партия из Candidate: нижний регистр уже посчитан при разборе ответа"""
+        return cls([c.number_lower for c in candidates], [c.name_lower for c in candidates],
+                   [c.complex_lower for c in candidates], [c.view_date for c in candidates],
+                   amendment_keywords)
+
+    @classmethod
+    def from_items(cls, items: Sequence[Dict[str, Any]], amendment_keywords: Optional[List[str]] = None) -> 'CandidateBatch':
+        """Партия из элементов ответа API (словарей)"""
+        # str.lower() в Python, а не np.char.lower: результат должен совпадать с прежним скорингом
+        return cls([item.get('number', '').lower() for item in items],
+                   [item.get('name', '').lower() for item in items],
+                   [item.get('complexName', '').lower() for item in items],
+                   [item.get('viewDate', '') for item in items],
+                   amendment_keywords)
+
+    def number_scores(self, document: Dict[str, Any], config: Dict[str, Any]) -> np.ndarray:
+        """Уровни совпадения номера: точный, очищенный, частичный, вложенный"""
+        doc_number = document.get('number', '').lower()
+        clean_num = clean_number(doc_number).lower()
+
+        exact = self.numbers == doc_number
+        clean = self.numbers == clean_num
+        partial = _contains(self.numbers, clean_num)
+        contained = _contains(np.full(self.size, clean_num), self.numbers)
+        ratio = len(clean_num) / np.maximum(self.number_lengths, 1)
+
+        return np.select(
+            [exact, clean, partial & (ratio > config['partial_number_ratio']), partial, contained],
+            [config['exact_number_match'], config['clean_number_match'], config['partial_number_match'],
+             config['weak_partial_number_match'], config['contained_number_match']],
+            default=0,
+        ).astype(np.int64)
+
+    def title_scores(self, document: Dict[str, Any], config: Dict[str, Any]) -> np.ndarray:
+        """Баллы за название: слова (основы) названия документа в названии кандидата или сходство TF-IDF"""
+        mode = config.get('title_mode', 'words')
+        if mode == 'tfidf':
+            return self.title_similarity_scores(document)
+        if mode == 'stems':
+            # Основы совпадают подстрокой с любой формой слова в названии кандидата
+            return self._match_scores(self._stem_matches(document), config)
+        if mode != 'words':
+            raise ConfigError(f"Неизвестный режим скоринга названий: {mode}",
+                              {'available': ['words', 'stems', 'tfidf']})
+        title_words = [w for w in document.get('title', '').lower().split() if len(w) > 3][:5]
+
+        name_matches = np.zeros(self.size, dtype=np.int64)
+        complex_matches = np.zeros(self.size, dtype=np.int64)
+        for word in title_words:
+            name_matches += _contains(self.names, word)
+            complex_matches += _contains(self.complex_names, word)
+        return self._match_scores(np.maximum(name_matches, complex_matches), config)
+
+    def _stem_matches(self, document: Dict[str, Any]) -> np.ndarray:
+        """Число основ названия документа в названии кандидата; короткие основы - с начала слова"""
+        normalizer = get_normalizer()
+        name_matches = np.zeros(self.size, dtype=np.int64)
+        complex_matches = np.zeros(self.size, dtype=np.int64)
+        for stem in normalizer.stems(document.get('title', ''), min_length=3, limit=5):
+            if normalizer.is_short(stem):
+                if self._word_names is None:
+                    self._word_names = (_word_starts(self.names), _word_starts(self.complex_names))
+                names, complex_names, stem = self._word_names[0], self._word_names[1], ' ' + stem
+            else:
+                names, complex_names = self.names, self.complex_names
+            name_matches += _contains(names, stem)
+            complex_matches += _contains(complex_names, stem)
+        return np.maximum(name_matches, complex_matches)
+
+    @staticmethod
+    def _match_scores(matches: np.ndarray, config: Dict[str, Any]) -> np.ndarray:
+        """Баллы за число совпавших слов названия"""
+        return np.select(
+            [matches >= 3, matches >= 2, matches >= 1],
+            [config['title_match_3_words'], config['title_match_2_words'], config['title_match_1_word']],
+            default=0,
+        ).astype(np.int64)
+
+    def title_similarity_scores(self, document: Dict[str, Any]) -> np.ndarray:
+        """Баллы за косинусное сходство n-грамм названия (Config.TITLE_SIMILARITY_CONFIG)"""
+        vectorizer = get_title_vectorizer()
+        if self._title_matrix is None:
+            self._title_matrix = vectorizer.transform(self._titles)
+        similarity = vectorizer.similarities(document.get('title', ''), self._title_matrix)
+        return title_scores(similarity)
+
+    def year_bonus(self, config: Dict[str, Any]) -> np.ndarray:
+        """Бонус за актуальность: первый по порядку year_bonuses год в дате публикации"""
+        bonus = np.zeros(self.size, dtype=np.int64)
+        assigned = np.zeros(self.size, dtype=bool)
+        for year, value in config['year_bonuses'].items():
+            hit = _contains(self.dates, year) & ~assigned
+            bonus[hit] = value
+            assigned |= hit
+        return bonus
+
+    def scores(self, document: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Баллы всех кандидатов относительно документа
+
+        Args:
+            document: искомый документ (number, title)
+            config: веса (по умолчанию Config.SCORING_CONFIG)
+
+        Returns:
+            np.ndarray int64 длины size
+        """
+        config = config or Config.SCORING_CONFIG
+        if not self.size:
+            return np.zeros(0, dtype=np.int64)
+
+        scores = self.number_scores(document, config) + self.title_scores(document, config) + self.year_bonus(config)
+        cap = config['amendment_score_cap']
+        return np.where(self.amendment, np.minimum(scores, cap), scores)
+
+def score_candidates(items: Sequence[Dict[str, Any]], document: Dict[str, Any],
+                     config: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Баллы и признаки изменений для кандидатов одного документа
+
+    Returns:
+        Tuple: (баллы int64, маска изменений)
+    """
+    batch = CandidateBatch.from_items(items)
+    return batch.scores(document, config), batch.amendment
@@ -0,0 +1,482 @@
+"""
+HTTP-сервис npa-service
+Держит прогретые NPASearcher/GPTHelper, общие кэши и пул потоков между
+запросами; ограничивает число одновременных запросов по видам и отдает метрики
+"""
+
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, Optional, Callable, Tuple
+from npa_searcher.config import Config
+from npa_searcher.cache import LRUCache
+from npa_searcher.backends import create_backend
+from npa_searcher.npa_searcher import NPASearcher
+from npa_searcher.processor import NPAProcessor
+from npa_searcher.scheduler import use_priority, validate_priority
+from npa_searcher.deadline import Deadline
+from npa_searcher.instrumentation import stage_metrics
+from npa_searcher.exceptions import NPASearchError, InvalidDocumentError, ServiceBusyError, ConfigError
+
+logger = logging.getLogger(__name__)
+
+# Номер электронного опубликования
+EO_NUMBER_PATTERN = re.compile(r'^\d{16}$')
+
+class EndpointMetrics:
+    """Счетчики запросов одного вида"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = self.requests - self.rejected
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'in_flight': self.in_flight,
+            'latency_avg': self.latency_sum / completed if completed else 0.0,
+            'latency_max': self.latency_max,
+        }
+
+class NPAService:
+    """
+    Долгоживущий сервис поверх NPAProcessor
+
+    Поисковик, GPTHelper, HTTP-сессии и кэши создаются один раз и
+    используются всеми запросами. Тяжелая работа выполняется в общем пуле
+    потоков; число одновременных запросов каждого вида ограничено, и
+    запрос, не получивший места за queue_timeout, отклоняется (HTTP 503).
+    """
+
+    def __init__(self, processor: Optional[NPAProcessor] = None, workers: Optional[int] = None,
+                 max_concurrent: Optional[Dict[str, int]] = None,
+                 queue_timeout: Optional[float] = None):
+        """
+        Args:
+            processor: готовый процессор (по умолчанию создается с общим кэшем поиска)
+            workers: размер пула потоков
+            max_concurrent: лимиты одновременных запросов по видам
+            queue_timeout: сколько ждать свободного места, с
+        """
+        config = Config.SERVICE_CONFIG
+        cache_config = Config.CACHE_CONFIG
+
+        if processor is None:
+            searcher = NPASearcher(cache=LRUCache(cache_config['search_maxsize'],
+                                                  cache_config['search_ttl']))
+            processor = NPAProcessor(searcher=searcher)
+        elif processor.searcher.cache is None:
+            processor.searcher.cache = LRUCache(cache_config['search_maxsize'],
+                                                cache_config['search_ttl'])
+        self.processor = processor
+        self.searcher = processor.searcher
+        self.pdf_cache = LRUCache(cache_config['pdf_maxsize'])
+
+        self.workers = workers or config['workers']
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='npa-service')
+        self.queue_timeout = config['queue_timeout'] if queue_timeout is None else queue_timeout
+        limits = dict(config['max_concurrent'], **(max_concurrent or {}))
+        self._limits = {kind: threading.BoundedSemaphore(limit) for kind, limit in limits.items()}
+        self.limits = limits
+
+        self.metrics = {kind: EndpointMetrics() for kind in limits}
+        self._metrics_lock = threading.Lock()
+        self.started_at = time.time()
+
+        logger.info(f"NPAService: пул {self.workers} потоков, лимиты {limits}")
+
+    def process_text(self, text: str, include_letters: bool = True,
+                     priority: Optional[str] = None,
+                     timeout_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Извлечение и поиск документов в тексте (бюджет считается с приема запроса)"""
+        if not text or not text.strip():
+            raise InvalidDocumentError("Пустой текст")
+        deadline = self._deadline(timeout_budget)
+        return self.call('process_text', functools.partial(self.processor.process_text, deadline=deadline),
+                         text, include_letters, priority=priority)
+
+    def search_document(self, document: Dict[str, Any], priority: Optional[str] = None,
+                        timeout_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Поиск одного документа: результаты и полнота поиска"""
+        deadline = self._deadline(timeout_budget)
+        search = self.call('search_document',
+                           functools.partial(self.searcher.search_document_detailed, deadline=deadline),
+                           document, priority=priority)
+        return dict(search, document=document)
+
+    def fetch_pdf(self, eo_number: str, priority: Optional[str] = None) -> Optional[bytes]:
+        """PDF документа (из кэша или с сайта)"""
+        if not EO_NUMBER_PATTERN.match(eo_number or ''):
+            raise InvalidDocumentError(f"Некорректный eoNumber: {eo_number}")
+
+        def fetch() -> Optional[bytes]:
+            content = self.pdf_cache.get(eo_number)
+            if content is None:
+                content = self.searcher.fetch_pdf(eo_number)
+                if content is not None:
+                    self.pdf_cache.set(eo_number, content)
+            return content
+
+        return self.call('pdf', fetch, priority=priority)
+
+    def call(self, kind: str, func: Callable, *args, priority: Optional[str] = None) -> Any:
+        """
+        Выполнение работы в пуле с ограничением одновременных запросов
+
+        Args:
+            kind: вид запроса (ключ лимитов max_concurrent)
+            func, args: работа
+            priority: класс нагрузки для обращений к API (по умолчанию
+                SCHEDULER_CONFIG['default_class'] - интерактивный)
+
+        Raises:
+            ServiceBusyError: нет свободного места за queue_timeout
+        """
+        if priority is not None:
+            validate_priority(priority)
+        metrics = self.metrics[kind]
+        with self._metrics_lock:
+            metrics.requests += 1
+
+        if not self._limits[kind].acquire(timeout=self.queue_timeout):
+            with self._metrics_lock:
+                metrics.rejected += 1
+            raise ServiceBusyError(f"Превышен лимит одновременных запросов {kind}",
+                                   retry_after=max(1.0, self.queue_timeout))
+
+        started = time.perf_counter()
+        with self._metrics_lock:
+            metrics.in_flight += 1
+        try:
+            return self.pool.submit(self._run_with_priority, priority, func, *args).result()
+        except Exception:
+            with self._metrics_lock:
+                metrics.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._metrics_lock:
+                metrics.in_flight -= 1
+                metrics.latency_sum += elapsed
+                metrics.latency_max = max(metrics.latency_max, elapsed)
+            self._limits[kind].release()
+
+    @staticmethod
+    def _deadline(timeout_budget: Optional[float]) -> Optional[Deadline]:
+        """Срок запроса по бюджету клиента или DEADLINE_CONFIG['service_timeout_budget']"""
+        if timeout_budget is None:
+            timeout_budget = Config.DEADLINE_CONFIG['service_timeout_budget']
+        if timeout_budget is None:
+            return None
+        try:
+            return Deadline.from_budget(timeout_budget)
+        except (TypeError, ValueError):
+            raise InvalidDocumentError(f"Некорректный timeout_budget: {timeout_budget}")
+
+    @staticmethod
+    def _run_with_priority(priority: Optional[str], func: Callable, *args) -> Any:
+        if priority is None:
+            return func(*args)
+        with use_priority(priority):
+            return func(*args)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Метрики сервиса: запросы по видам, кэши, поиск и обработка"""
+        with self._metrics_lock:
+            endpoints = {kind: metrics.to_dict() for kind, metrics in self.metrics.items()}
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'endpoints': endpoints,
+            'limits': self.limits,
+            'caches': {
+                'search': self.searcher.cache.get_statistics() if self.searcher.cache else {},
+                'pdf': self.pdf_cache.get_statistics(),
+            },
+            'search': self.searcher.get_search_statistics(),
+            'processing': self.processor.get_processing_statistics(),
+            'extraction': dict(self.processor.gpt_helper.extraction_stats),
+            'schedulers': {
+                'search': self.searcher.scheduler.get_statistics(),
+                'extraction': self.processor.gpt_helper.scheduler.get_statistics(),
+            },
+            'stages': stage_metrics.snapshot()['stages'],
+        }
+
+    def prometheus_metrics(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        metrics = self.get_metrics()
+        lines = [
+            '# TYPE npa_service_uptime_seconds gauge',
+            f"npa_service_uptime_seconds {metrics['uptime_seconds']:.3f}",
+        ]
+
+        endpoint_metrics = [
+            ('requests', 'counter', 'requests'),
+            ('errors', 'counter', 'errors'),
+            ('rejected', 'counter', 'rejected'),
+            ('in_flight', 'gauge', 'in_flight'),
+            ('latency_seconds_avg', 'gauge', 'latency_avg'),
+            ('latency_seconds_max', 'gauge', 'latency_max'),
+        ]
+        for name, kind, field in endpoint_metrics:
+            lines.append(f"# TYPE npa_service_{name} {kind}")
+            for endpoint, values in metrics['endpoints'].items():
+                lines.append(f'npa_service_{name}{{endpoint="{endpoint}"}} {values[field]}')
+
+        for name in ('hits', 'misses', 'evictions', 'size'):
+            lines.append(f"# TYPE npa_cache_{name} {'gauge' if name == 'size' else 'counter'}")
+            for cache, values in metrics['caches'].items():
+                if values:
+                    lines.append(f'npa_cache_{name}{{cache="{cache}"}} {values[name]}')
+
+        scheduler_metrics = [
+            ('queue_depth', 'gauge'),
+            ('running', 'gauge'),
+            ('granted', 'counter'),
+            ('wait_seconds_total', 'counter'),
+            ('wait_seconds_max', 'gauge'),
+            ('oldest_wait_seconds', 'gauge'),
+        ]
+        for name, kind in scheduler_metrics:
+            lines.append(f"# TYPE npa_scheduler_{name} {kind}")
+            for resource, values in metrics['schedulers'].items():
+                for cls, class_values in values['classes'].items():
+                    lines.append(f'npa_scheduler_{name}{{resource="{resource}",class="{cls}"}} '
+                                 f'{class_values[name]}')
+
+        for section, prefix in (('search', 'npa_search'), ('processing', 'npa_processing'),
+                                ('extraction', 'npa_extraction')):
+            for name, value in metrics[section].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{prefix}_{name} {value}")
+
+        # Гистограммы этапов (пусто, если инструментирование выключено)
+        return '\n'.join(lines) + '\n' + stage_metrics.prometheus()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    Маршруты:
+        POST /process_text     {"text": ..., "include_letters": true, "priority": "batch",
+                                "timeout_budget": 2.0}
+        POST /search_document  {"type": ..., "number": ..., "title": ..., "priority": ...,
+                                "timeout_budget": ...}
+        GET  /pdf/<eoNumber>   application/pdf (?priority=batch)
+
+    Без priority запросы идут интерактивным классом; с timeout_budget (секунды)
+    возвращается то, что готово к сроку, с отметками полноты
+        GET  /metrics          Prometheus (?format=json - JSON)
+        GET  /health
+    """
+
+    service: NPAService = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif url.path == '/metrics':
+            if parse_qs(url.query).get('format') == ['json']:
+                self._send_json(200, self.service.get_metrics())
+            else:
+                self._send(200, self.service.prometheus_metrics().encode('utf-8'),
+                           'text/plain; version=0.0.4; charset=utf-8')
+        elif url.path.startswith('/pdf/'):
+            priority = parse_qs(url.query).get('priority', [None])[0]
+            self._dispatch(lambda: self._pdf(url.path[len('/pdf/'):], priority))
+        else:
+            self._send_json(404, {'error': f'Неизвестный путь {url.path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        routes = {
+            '/process_text': lambda body: self.service.process_text(
+                body.get('text', ''), bool(body.get('include_letters', True)), body.get('priority'),
+                body.get('timeout_budget')),
+            '/search_document': lambda body: self.service.search_document(
+                {key: value for key, value in body.items() if key not in ('priority', 'timeout_budget')},
+                body.get('priority'), body.get('timeout_budget')),
+        }
+        handler = routes.get(url.path)
+        if handler is None:
+            self._send_json(404, {'error': f'Неизвестный путь {url.path}'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > Config.SERVICE_CONFIG['max_body_bytes']:
+            self._send_json(413, {'error': 'Слишком большой запрос'})
+            self.close_connection = True
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError('ожидается JSON-объект')
+        except ValueError as e:
+            self._send_json(400, {'error': f'Некорректный JSON: {e}'})
+            return
+
+        self._dispatch(lambda: (200, handler(body)))
+
+    def _pdf(self, eo_number: str, priority: Optional[str] = None) -> Tuple[int, Any]:
+        content = self.service.fetch_pdf(eo_number, priority)
+        if content is None:
+            return 404, {'error': f'PDF {eo_number} не найден'}
+        return 200, content
+
+    def _dispatch(self, action: Callable[[], Tuple[int, Any]]) -> None:
+        try:
+            status, payload = action()
+        except ServiceBusyError as e:
+            self._send_json(503, {'error': str(e)}, {'Retry-After': str(int(e.retry_after or 1))})
+            return
+        except (InvalidDocumentError, ConfigError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except NPASearchError as e:
+            self._send_json(502, {'error': str(e)})
+            return
+        except Exception as e:
+            logger.exception("Ошибка обработки запроса")
+            self._send_json(500, {'error': str(e)})
+            return
+
+        if isinstance(payload, bytes):
+            self._send(status, payload, 'application/pdf')
+        else:
+            self._send_json(status, payload)
+
+    def _send_json(self, status: int, payload: Any, headers: Dict[str, str] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self._send(status, data, 'application/json; charset=utf-8', headers)
+
+    def _send(self, status: int, data: bytes, content_type: str, headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+class NPAServiceServer:
+    """
+    HTTP-сервер сервиса в фоновом потоке
+    Используется как контекстный менеджер в тестах на localhost
+    """
+
+    def __init__(self, service: Optional[NPAService] = None, host: Optional[str] = None,
+                 port: Optional[int] = None):
+        """
+        Args:
+            service: сервис (по умолчанию создается с настройками SERVICE_CONFIG)
+            host: адрес для прослушивания
+            port: порт (0 - выбрать свободный)
+        """
+        self.service = service or NPAService()
+        self.host = host or Config.SERVICE_CONFIG['host']
+        self.port = Config.SERVICE_CONFIG['port'] if port is None else port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'NPAServiceServer':
+        handler = type('BoundServiceHandler', (ServiceHandler,), {'service': self.service})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"npa-service запущен: {self.url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.service.close()
+
+    def serve_forever(self) -> None:
+        """Запуск в текущем потоке (для запуска из командной строки)"""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            self.stop()
+
+    def __enter__(self) -> 'NPAServiceServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main(argv=None):
+    """Запуск сервиса из командной строки"""
+    config = Config.SERVICE_CONFIG
+    parser = argparse.ArgumentParser(prog='npa-service', description='HTTP-сервис поиска НПА')
+    parser.add_argument('--host', default=config['host'])
+    parser.add_argument('--port', type=int, default=config['port'])
+    parser.add_argument('--workers', type=int, default=config['workers'], help='потоков в пуле')
+    parser.add_argument('--max-process-text', type=int, default=config['max_concurrent']['process_text'])
+    parser.add_argument('--max-search', type=int, default=config['max_concurrent']['search_document'])
+    parser.add_argument('--max-pdf', type=int, default=config['max_concurrent']['pdf'])
+    parser.add_argument('--queue-timeout', type=float, default=config['queue_timeout'])
+    parser.add_argument('--timeout-budget', type=float, default=Config.DEADLINE_CONFIG['service_timeout_budget'],
+                        help='бюджет времени запроса по умолчанию, с')
+    parser.add_argument('--backend', default=Config.GPT_CONFIG['backend'], help='провайдер извлечения')
+    parser.add_argument('--base-url', help='адрес OpenAI-совместимого сервера')
+    parser.add_argument('--api-key', help='ключ API (по умолчанию OPENAI_API_KEY)')
+    parser.add_argument('--instrument', action='store_true',
+                        help='гистограммы длительности этапов в /metrics')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s', stream=sys.stderr)
+    Config.DEADLINE_CONFIG['service_timeout_budget'] = args.timeout_budget
+    if args.instrument:
+        stage_metrics.enable()
+
+    backend_kwargs = {'api_key': args.api_key}
+    if args.base_url:
+        backend_kwargs['base_url'] = args.base_url
+    cache_config = Config.CACHE_CONFIG
+    searcher = NPASearcher(cache=LRUCache(cache_config['search_maxsize'], cache_config['search_ttl']))
+    processor = NPAProcessor(extraction_backend=create_backend(args.backend, **backend_kwargs),
+                             searcher=searcher)
+    processor.gpt_helper.verbose = args.verbose
+
+    service = NPAService(processor, workers=args.workers, queue_timeout=args.queue_timeout,
+                         max_concurrent={'process_text': args.max_process_text,
+                                         'search_document': args.max_search,
+                                         'pdf': args.max_pdf})
+    server = NPAServiceServer(service, args.host, args.port)
+    print(f"🌐 npa-service: {server.url}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
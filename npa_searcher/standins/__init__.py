@@ -0,0 +1,21 @@
+"""
+Локальные серверы-заглушки внешних API
+Позволяют измерять производительность и отказоустойчивость без платных вызовов
+"""
+
+from .base import StandInServer, FaultProfile
+from .openai_server import OpenAIStandInServer
+from .pravo_server import (PravoStandInServer, PravoAPI, ReplaySession, RecordingSession,
+                           load_recording, synthetic_documents)
+
+__all__ = [
+    'StandInServer',
+    'FaultProfile',
+    'OpenAIStandInServer',
+    'PravoStandInServer',
+    'PravoAPI',
+    'ReplaySession',
+    'RecordingSession',
+    'load_recording',
+    'synthetic_documents'
+]
@@ -0,0 +1,197 @@
+"""
+Общая основа локальных серверов-заглушек
+HTTP сервер в отдельном потоке с настраиваемой задержкой и внедрением ошибок
+"""
+
+import json
+import time
+import random
+import threading
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class FaultProfile:
+    """
+    Профиль задержек и ошибок заглушки
+    Детерминирован: при одинаковом seed и порядке запросов ошибки повторяются
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0):
+        """
+        Args:
+            latency: базовая задержка ответа в секундах
+            jitter: максимальная случайная добавка к задержке в секундах
+            error_rate: доля ответов с HTTP 500
+            rate_limit_rate: доля ответов с HTTP 429 и заголовком Retry-After
+            retry_after: значение Retry-After для ответов 429
+            seed: зерно генератора для воспроизводимости
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """
+        Выбор задержки и кода ошибки для очередного запроса
+
+        Returns:
+            Tuple: (задержка в секундах, HTTP код ошибки или None)
+        """
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Базовый обработчик заглушки
+    Наследники реализуют route(method, path, body) -> (status, payload)
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело пишутся отдельно: без TCP_NODELAY keep-alive ждет delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+
+    # Проставляется сервером
+    standin = None
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method: str):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        standin = self.standin
+        delay, error_status = standin.faults.draw()
+        if delay:
+            time.sleep(delay)
+
+        standin.count(self.path.split('?', 1)[0], error_status)
+
+        if error_status == 429:
+            self._send(429, {'error': {'message': 'Rate limit exceeded', 'type': 'rate_limit_error'}},
+                       {'Retry-After': str(standin.faults.retry_after)})
+            return
+        if error_status == 500:
+            self._send(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+            return
+
+        try:
+            status, payload = self.route(method, self.path, body)
+        except Exception as e:
+            logger.exception("Ошибка заглушки")
+            status, payload = 500, {'error': {'message': str(e), 'type': 'server_error'}}
+
+        self._send(status, payload)
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        return 404, {'error': {'message': f'Unknown path {path}'}}
+
+    def _send(self, status: int, payload: Any, headers: Dict[str, str] = None):
+        if isinstance(payload, (bytes, str)):
+            data = payload.encode('utf-8') if isinstance(payload, str) else payload
+            content_type = 'application/octet-stream'
+        else:
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент не дождался ответа (таймаут, истекший срок) - для нагрузки это норма
+            self.close_connection = True
+
+class StandInServer:
+    """
+    Локальный сервер-заглушка в фоновом потоке
+    Используется как контекстный менеджер в тестах и бенчмарках
+    """
+
+    handler_class = StandInHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, faults: FaultProfile = None):
+        """
+        Args:
+            host: адрес для прослушивания
+            port: порт (0 - выбрать свободный)
+            faults: профиль задержек и ошибок
+        """
+        self.host = host
+        self.port = port
+        self.faults = faults or FaultProfile()
+        self.stats = {'requests': 0, 'errors_injected': 0, 'rate_limited': 0, 'by_path': {}}
+        self._stats_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Базовый адрес запущенного сервера"""
+        return f"http://{self.host}:{self.port}"
+
+    def count(self, path: str, error_status: Optional[int]) -> None:
+        """Учет запроса в статистике заглушки"""
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['by_path'][path] = self.stats['by_path'].get(path, 0) + 1
+            if error_status == 429:
+                self.stats['rate_limited'] += 1
+            elif error_status:
+                self.stats['errors_injected'] += 1
+
+    def start(self) -> 'StandInServer':
+        handler = type(self.handler_class.__name__, (self.handler_class,), {'standin': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Заглушка {type(self).__name__} запущена: {self.url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def serve_forever(self) -> None:
+        """Запуск в текущем потоке (для запуска из командной строки)"""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            self.stop()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
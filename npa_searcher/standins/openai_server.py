@@ -0,0 +1,238 @@
+"""
+Локальная OpenAI-совместимая заглушка для нагрузочного тестирования извлечения
+Детерминированно "извлекает" документы регулярными выражениями, поддерживает
+chat.completions, загрузку файлов и пакетные задания (Batch API)
+
+Запуск из командной строки:
+    python -m npa_searcher.standins.openai_server --port 8089 --latency 0.2 --error-rate 0.05
+"""
+
+import re
+import json
+import time
+import argparse
+import itertools
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Dict, Any, List, Tuple
+from npa_searcher.standins.base import StandInServer, StandInHandler, FaultProfile
+
+# Тип документа по ключевому слову перед номером
+TYPE_MARKERS = [
+    ('федеральн', 'Федеральный закон', 'НПА'),
+    ('постановлени', 'Постановление Правительства', 'НПА'),
+    ('приказ', 'Приказ', 'НПА'),
+    ('указ', 'Указ', 'НПА'),
+    ('распоряжени', 'Распоряжение', 'НПА'),
+    ('письм', 'Письмо', 'ПИСЬМО'),
+]
+
+NUMBER_PATTERN = re.compile(r'№\s*([0-9A-Za-zА-Яа-яЁё][0-9A-Za-zА-Яа-яЁё\-/\.]*[0-9A-Za-zА-Яа-яЁё])')
+TITLE_PATTERN = re.compile(r'\s*(?:от\s+[\d\.]+\s*(?:г\.?)?\s*)?[«"]([^«»"]{5,200})[»"]')
+
+def extract_mentions(text: str) -> List[Dict[str, str]]:
+    """
+    Детерминированное извлечение упоминаний документов из текста
+
+    Args:
+        text: текст чанка
+
+    Returns:
+        List документов в формате ответа GPTHelper
+    """
+    documents = []
+    for match in NUMBER_PATTERN.finditer(text):
+        context = text[max(0, match.start() - 80):match.start()].lower()
+
+        doc_type, category = 'Документ', 'НПА'
+        best_pos = -1
+        for marker, marker_type, marker_category in TYPE_MARKERS:
+            pos = context.rfind(marker)
+            if pos > best_pos:
+                best_pos, doc_type, category = pos, marker_type, marker_category
+
+        number = match.group(1)
+        title_match = TITLE_PATTERN.match(text, match.end())
+        title = title_match.group(1) if title_match else f"{doc_type} №{number}"
+
+        documents.append({'type': doc_type, 'number': number, 'title': title, 'category': category})
+
+    return documents
+
+def prompt_text(request: Dict[str, Any]) -> str:
+    """Текст для анализа из промпта GPTHelper"""
+    messages = request.get('messages') or [{}]
+    content = messages[-1].get('content', '')
+    return content.split('Текст для анализа:', 1)[-1]
+
+class OpenAIStandInHandler(StandInHandler):
+    """Маршруты OpenAI API, используемые GPTHelper"""
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        standin = self.standin
+        path = path.split('?', 1)[0]
+        if path.startswith('/v1/'):
+            path = path[3:]
+
+        if method == 'POST' and path == '/chat/completions':
+            return 200, standin.chat_completion(json.loads(body or b'{}'))
+
+        if method == 'POST' and path == '/files':
+            content_type = self.headers.get('Content-Type', '')
+            return 200, standin.upload_file(content_type, body)
+
+        match = re.fullmatch(r'/files/([\w\-]+)/content', path)
+        if method == 'GET' and match:
+            content = standin.files.get(match.group(1))
+            if content is None:
+                return 404, {'error': {'message': 'File not found'}}
+            return 200, content
+
+        if method == 'POST' and path == '/batches':
+            return 200, standin.create_batch(json.loads(body or b'{}'))
+
+        match = re.fullmatch(r'/batches/([\w\-]+)', path)
+        if method == 'GET' and match:
+            batch = standin.batches.get(match.group(1))
+            if batch is None:
+                return 404, {'error': {'message': 'Batch not found'}}
+            return 200, batch
+
+        if method == 'GET' and path == '/_standin/stats':
+            return 200, standin.stats
+
+        return super().route(method, path, body)
+
+class OpenAIStandInServer(StandInServer):
+    """
+    OpenAI-совместимая заглушка
+    Ответы зависят только от текста запроса, поэтому результаты воспроизводимы
+    """
+
+    handler_class = OpenAIStandInHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, faults: FaultProfile = None):
+        super().__init__(host, port, faults)
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _next_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}-{next(self._ids)}"
+
+    def chat_completion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Ответ chat.completions с найденными документами в JSON"""
+        text = prompt_text(request)
+        content = json.dumps({'documents': extract_mentions(text)}, ensure_ascii=False)
+        prompt_tokens = len(text) // 3
+
+        return {
+            'id': self._next_id('chatcmpl'),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'standin'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': len(content) // 3,
+                'total_tokens': prompt_tokens + len(content) // 3
+            }
+        }
+
+    def upload_file(self, content_type: str, body: bytes) -> Dict[str, Any]:
+        """Прием multipart/form-data загрузки файла"""
+        message = BytesParser(policy=HTTP).parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+        )
+        content, filename, purpose = b'', 'upload.jsonl', 'batch'
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == 'file':
+                content = part.get_payload(decode=True) or b''
+                filename = part.get_filename() or filename
+            elif name == 'purpose':
+                purpose = (part.get_payload(decode=True) or b'').decode('utf-8')
+
+        file_id = self._store_file(content)
+        return {
+            'id': file_id,
+            'object': 'file',
+            'bytes': len(content),
+            'created_at': int(time.time()),
+            'filename': filename,
+            'purpose': purpose,
+            'status': 'processed'
+        }
+
+    def _store_file(self, content: bytes) -> str:
+        file_id = self._next_id('file')
+        self.files[file_id] = content
+        return file_id
+
+    def create_batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Пакетное задание выполняется сразу, статус - completed"""
+        input_file_id = request.get('input_file_id', '')
+        lines = (self.files.get(input_file_id) or b'').decode('utf-8').splitlines()
+
+        output_lines = []
+        for line in lines:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            output_lines.append(json.dumps({
+                'id': self._next_id('batch_req'),
+                'custom_id': item.get('custom_id'),
+                'response': {
+                    'status_code': 200,
+                    'request_id': self._next_id('req'),
+                    'body': self.chat_completion(item.get('body', {}))
+                },
+                'error': None
+            }, ensure_ascii=False))
+
+        output_file_id = self._store_file('\n'.join(output_lines).encode('utf-8'))
+        now = int(time.time())
+        batch = {
+            'id': self._next_id('batch'),
+            'object': 'batch',
+            'endpoint': request.get('endpoint', '/v1/chat/completions'),
+            'input_file_id': input_file_id,
+            'completion_window': request.get('completion_window', '24h'),
+            'status': 'completed',
+            'output_file_id': output_file_id,
+            'error_file_id': None,
+            'created_at': now,
+            'completed_at': now,
+            'request_counts': {'total': len(output_lines), 'completed': len(output_lines), 'failed': 0}
+        }
+        self.batches[batch['id']] = batch
+        return batch
+
+def main(argv=None):
+    """Запуск заглушки из командной строки"""
+    parser = argparse.ArgumentParser(description='Локальная OpenAI-совместимая заглушка')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    parser.add_argument('--jitter', type=float, default=0.0, help='случайная добавка к задержке, с')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='доля ответов HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After для 429, с')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    faults = FaultProfile(args.latency, args.jitter, args.error_rate,
+                          args.rate_limit_rate, args.retry_after, args.seed)
+    server = OpenAIStandInServer(args.host, args.port, faults)
+    print(f"🧪 OpenAI заглушка: {server.url}/v1")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Заглушка API publication.pravo.gov.ru для бенчмарков поиска
+Отвечает записанными ответами (RecordingSession) и/или по синтетическому
+каталогу документов; доступна как HTTP-сервер и как сессия requests без сети
+
+Запуск из командной строки:
+    python -m npa_searcher.standins.pravo_server --port 8090 --recording pravo.json --latency 0.05
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qsl
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+import requests
+from npa_searcher.standins.base import StandInServer, StandInHandler, FaultProfile
+
+RECORDING_VERSION = 1
+
+# Словарь для синтетических названий
+_TYPES = [
+    ('Федеральный закон', '{n}-ФЗ'),
+    ('Постановление Правительства Российской Федерации', '{n}'),
+    ('Приказ Министерства просвещения Российской Федерации', '{n}'),
+    ('Указ Президента Российской Федерации', '{n}'),
+]
+_SUBJECTS = [
+    'образовании', 'персональных данных', 'лицензировании отдельных видов деятельности',
+    'государственной информационной системе', 'профессиональных стандартах',
+    'контрактной системе в сфере закупок', 'защите прав потребителей', 'обязательном страховании',
+]
+
+def _key(path: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """Ключ ответа: последний сегмент пути и параметры в каноническом виде"""
+    endpoint = '/' + urlparse(path).path.rstrip('/').rsplit('/', 1)[-1]
+    canonical = json.dumps({str(k): str(v) for k, v in (params or {}).items()}, sort_keys=True, ensure_ascii=False)
+    return endpoint, canonical
+
+def synthetic_documents(count: int, seed: int = 0, amendment_share: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Каталог документов в формате ответа /Documents
+
+    Args:
+        count: число документов
+        seed: зерно для воспроизводимости
+        amendment_share: доля документов "О внесении изменений"
+
+    Returns:
+        List документов (eoNumber, id, number, name, complexName, viewDate)
+    """
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        doc_type, number_format = _TYPES[index % len(_TYPES)]
+        number = number_format.format(n=rng.randint(1, 2000))
+        year = rng.randint(2005, 2024)
+        day, month = rng.randint(1, 28), rng.randint(1, 12)
+        subject = rng.choice(_SUBJECTS)
+        name = f"Об {subject}" if subject[0] in 'аоуэи' else f"О {subject}"
+        if rng.random() < amendment_share:
+            name = f"О внесении изменений в {doc_type.split()[0].lower()} «{name}»"
+        documents.append({
+            'eoNumber': f"{year:04d}{month:02d}{day:02d}{index:08d}",
+            'id': f"{index:08x}-{rng.getrandbits(32):08x}",
+            'number': number,
+            'name': name,
+            'complexName': f"{doc_type} от {day:02d}.{month:02d}.{year} № {number} \"{name}\"",
+            'viewDate': f"{day:02d}.{month:02d}.{year}",
+            'pagesCount': rng.randint(1, 80),
+        })
+    return documents
+
+class PravoAPI:
+    """
+    Ответы API без HTTP: сначала запись, затем каталог
+
+    Поддерживаются /Documents (Number + NumberSearchType, ComplexName, Name,
+    PageSize, Index), /Document?eoNumber и /file/pdf?eoNumber.
+    """
+
+    def __init__(self, recording: Optional[Dict[str, Any]] = None,
+                 catalog: Optional[Iterable[Dict[str, Any]]] = None):
+        """
+        Args:
+            recording: запись RecordingSession (dict или результат load_recording)
+            catalog: документы для ответов на незаписанные запросы
+        """
+        self.responses: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        for item in (recording or {}).get('responses', []):
+            self.responses[_key(item['path'], item.get('params'))] = (item['status'], item.get('body'))
+
+        self.catalog = list(catalog or [])
+        self.by_eo = {doc['eoNumber']: doc for doc in self.catalog}
+        self.by_number: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in self.catalog:
+            self.by_number.setdefault(doc['number'].lower(), []).append(doc)
+
+    def respond(self, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """(HTTP статус, тело ответа) на GET path?params"""
+        params = params or {}
+        recorded = self.responses.get(_key(path, params))
+        if recorded is not None:
+            return recorded
+
+        endpoint = _key(path, None)[0]
+        if endpoint == '/Documents':
+            return 200, self._documents(params)
+        if endpoint == '/Document':
+            doc = self.by_eo.get(str(params.get('eoNumber', '')))
+            return (200, doc) if doc else (404, None)
+        if endpoint == '/pdf':
+            eo_number = str(params.get('eoNumber', ''))
+            if eo_number in self.by_eo:
+                return 200, f"%PDF-1.4\n% stand-in {eo_number}\n%%EOF\n".encode('ascii')
+            return 404, None
+        return 404, {'error': f'Unknown path {path}'}
+
+    def _documents(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if 'Number' in params:
+            number = str(params['Number']).lower()
+            if str(params.get('NumberSearchType', 0)) == '1':
+                found = [doc for doc in self.catalog if doc['number'].lower().startswith(number)]
+            else:
+                found = list(self.by_number.get(number, []))
+        elif 'ComplexName' in params:
+            text = str(params['ComplexName']).lower()
+            found = [doc for doc in self.catalog if text in doc['complexName'].lower()]
+        elif 'Name' in params:
+            text = str(params['Name']).lower()
+            found = [doc for doc in self.catalog if text in doc['name'].lower()]
+        else:
+            found = list(self.catalog)
+
+        page_size = int(params.get('PageSize', 30))
+        page = max(1, int(params.get('Index', 1)))
+        items = found[(page - 1) * page_size:page * page_size]
+        return {
+            'items': items,
+            'itemsTotalCount': len(found),
+            'itemsPerPage': page_size,
+            'currentPage': page,
+            'pagesTotalCount': (len(found) + page_size - 1) // page_size,
+        }
+
+class ReplayResponse:
+    """Минимальный ответ в духе requests.Response"""
+
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self._body = body
+        self.headers: Dict[str, str] = {}
+
+    @property
+    def content(self) -> bytes:
+        if isinstance(self._body, bytes):
+            return self._body
+        return json.dumps(self._body, ensure_ascii=False).encode('utf-8')
+
+    def json(self) -> Any:
+        # Новые объекты на каждый вызов, как у requests: поиск дополняет элементы на месте
+        return json.loads(self.content)
+
+class ReplaySession:
+    """
+    Сессия для NPASearcher без сети: ответы PravoAPI прямо на уровне сессии
+    (searcher.session = ReplaySession(api)); задержки - из FaultProfile
+    """
+
+    def __init__(self, api: PravoAPI, faults: Optional[FaultProfile] = None):
+        self.api = api
+        self.faults = faults
+        self.headers: Dict[str, str] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> ReplayResponse:
+        with self._lock:
+            self.requests += 1
+        query = dict(parse_qsl(urlparse(url).query))
+        query.update(params or {})
+        if self.faults is not None:
+            delay, error_status = self.faults.draw()
+            if delay:
+                time.sleep(delay)
+            if error_status:
+                return ReplayResponse(error_status, {'error': 'injected'})
+        status, body = self.api.respond(url, query)
+        return ReplayResponse(status, body)
+
+class RecordingSession(requests.Session):
+    """
+    Сессия, записывающая ответы API для последующего воспроизведения
+
+    Example:
+        >>> searcher.session = RecordingSession(); searcher.session.headers.update(Config.DEFAULT_HEADERS)
+        >>> searcher.search_document(document)
+        >>> searcher.session.save('pravo_recording.json')
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.recorded: List[Dict[str, Any]] = []
+        self._record_lock = threading.Lock()
+
+    def request(self, method, url, params=None, **kwargs):
+        response = super().request(method, url, params=params, **kwargs)
+        if method.upper() == 'GET':
+            try:
+                body = response.json()
+            except ValueError:
+                body = None  # PDF и HTML не записываем
+            query = dict(parse_qsl(urlparse(url).query))
+            query.update(params or {})
+            with self._record_lock:
+                self.recorded.append({'path': urlparse(url).path, 'params': query,
+                                      'status': response.status_code, 'body': body})
+        return response
+
+    def save(self, path: str) -> None:
+        with self._record_lock:
+            data = {'version': RECORDING_VERSION, 'recorded_at': time.time(), 'responses': list(self.recorded)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """Чтение записи RecordingSession"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class PravoStandInHandler(StandInHandler):
+    """GET-маршруты API publication.pravo.gov.ru"""
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if method != 'GET':
+            return super().route(method, path, body)
+        if path.split('?', 1)[0] == '/_standin/stats':
+            return 200, self.standin.stats
+        status, payload = self.standin.api.respond(path, dict(parse_qsl(urlparse(path).query)))
+        if payload is None:
+            payload = {'error': {'message': 'Not found'}}
+        return status, payload
+
+class PravoStandInServer(StandInServer):
+    """
+    HTTP-заглушка API: адрес поиска - server.url + '/api'
+    (NPASearcher.api_url), PDF - server.url + '/file/pdf?eoNumber=...'
+    """
+
+    handler_class = PravoStandInHandler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, faults: FaultProfile = None,
+                 api: Optional[PravoAPI] = None):
+        super().__init__(host, port, faults)
+        self.api = api or PravoAPI(catalog=synthetic_documents(1000))
+
+    @property
+    def api_url(self) -> str:
+        return self.url + '/api'
+
+def main(argv=None):
+    """Запуск заглушки из командной строки"""
+    parser = argparse.ArgumentParser(description='Локальная заглушка API publication.pravo.gov.ru')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--recording', help='запись RecordingSession для воспроизведения')
+    parser.add_argument('--catalog-size', type=int, default=1000, help='синтетических документов')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    parser.add_argument('--jitter', type=float, default=0.0, help='случайная добавка к задержке, с')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов HTTP 500')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.recording) if args.recording else None
+    api = PravoAPI(recording, synthetic_documents(args.catalog_size, args.seed))
+    faults = FaultProfile(args.latency, args.jitter, args.error_rate, seed=args.seed)
+    server = PravoStandInServer(args.host, args.port, faults, api)
+    print(f"🧪 Заглушка pravo.gov.ru: {server.api_url}")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Сходство названий по символьным n-граммам с весами TF-IDF
+Необязательный режим скоринга названий (SCORING_CONFIG['title_mode'] = 'tfidf'):
+вместо подсчета слов запроса, встретившихся в названии кандидата, -
+косинусное сходство векторов n-грамм. Символьные n-граммы устойчивы
+к словоизменению ("об образовании" ~ "образование").
+
+n-граммы кодируются целыми числами и извлекаются из всей партии названий
+сразу средствами NumPy; словарь частот (document frequency) накапливается
+между партиями и может сохраняться в файл
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+from npa_searcher.config import Config
+
+# Основание кодов n-грамм: до 126 различных символов после нормализации
+# (0 - символ еще не встречался, 127 - общий код для остальных редких символов)
+_BASE = 128
+_RARE = _BASE - 1
+_SPACE = 1
+# Код n-граммы занимает не больше 35 бит (n <= 5), выше - номер названия
+_ROW_SHIFT = 35
+_CODE_MASK = (1 << _ROW_SHIFT) - 1
+
+class TitleMatrix:
+    """Разреженная матрица партии названий: (строка, код n-граммы, частота)"""
+
+    __slots__ = ('size', 'rows', 'codes', 'counts', 'version', 'weights', 'norms')
+
+    def __init__(self, size: int, rows: np.ndarray, codes: np.ndarray, counts: np.ndarray):
+        self.size = size
+        self.rows = rows
+        self.codes = codes
+        self.counts = counts
+        # Веса TF-IDF и нормы строк для версии словаря version
+        self.version = -1
+        self.weights = None
+        self.norms = None
+
+class TitleVectorizer:
+    """
+    Векторизатор названий с накапливаемым словарем n-грамм
+
+    Нормализация посимвольная: нижний регистр, ё -> е, все кроме букв и
+    цифр - пробел, повторные пробелы схлопываются. Каждый новый символ
+    нормализуется один раз, дальше - таблица по коду символа.
+
+    Example:
+        >>> vectorizer = TitleVectorizer()
+        >>> matrix = vectorizer.transform(['Образование в Российской Федерации', 'О связи'])
+        >>> vectorizer.similarities('Об образовании в Российской Федерации', matrix)
+        array([0.79..., 0.  ])
+    """
+
+    def __init__(self, ngram_range: Tuple[int, int] = (3, 4), max_documents: int = 1000000):
+        """
+        Args:
+            ngram_range: длины n-грамм (не больше 5)
+            max_documents: после стольких учтенных названий словарь перестает пополняться
+        """
+        low, high = ngram_range
+        if not 1 <= low <= high <= 5:
+            raise ValueError(f"Некорректный ngram_range: {ngram_range}")
+        self.ngram_range = (low, high)
+        self.max_documents = max_documents
+
+        self.alphabet: Dict[str, int] = {' ': _SPACE}
+        self._table = np.zeros(sys.maxunicode + 1, dtype=np.uint8)
+        self._table[ord(' ')] = _SPACE
+        self.vocabulary = np.zeros(0, dtype=np.int64)   # отсортированные коды n-грамм
+        self.df = np.zeros(0, dtype=np.int64)           # в скольких названиях встречается
+        self.documents = 0
+        self.version = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def _char_index(self, char: str) -> int:
+        """Код символа после нормализации (под блокировкой)"""
+        if not char.isalnum():
+            return _SPACE
+        normalized = char.lower()[0].replace('ё', 'е')
+        index = self.alphabet.get(normalized)
+        if index is None:
+            if len(self.alphabet) + 1 >= _RARE:
+                return _RARE
+            index = self.alphabet[normalized] = len(self.alphabet) + 1
+        return index
+
+    def _encode_chars(self, text: str) -> np.ndarray:
+        """Коды нормализованных символов текста"""
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        chars = self._table[codepoints]
+        unknown = chars == 0
+        if unknown.any():
+            with self._lock:
+                for codepoint in np.unique(codepoints[unknown]).tolist():
+                    self._table[codepoint] = self._char_index(chr(codepoint))
+            chars = self._table[codepoints]
+        return chars.astype(np.int64)
+
+    def transform(self, texts: Sequence[str], learn: bool = True) -> TitleMatrix:
+        """
+        n-граммы партии названий
+
+        Args:
+            texts: названия
+            learn: учесть новые названия в частотах словаря
+
+        Returns:
+            TitleMatrix
+        """
+        padded = [f" {text or ''} " for text in texts]
+        if not padded:
+            empty = np.zeros(0, dtype=np.int64)
+            return TitleMatrix(0, empty, empty, np.zeros(0, dtype=np.float64))
+
+        chars = self._encode_chars(''.join(padded))
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+        owner = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)
+
+        # Схлопывание пробелов внутри каждого названия
+        space = chars == _SPACE
+        keep = np.ones(len(chars), dtype=bool)
+        keep[1:] = ~(space[1:] & space[:-1] & (owner[1:] == owner[:-1]))
+        chars, owner = chars[keep], owner[keep]
+
+        # Коды n-грамм наращиваются на символ: code_n[i] = code_(n-1)[i] * _BASE + chars[i + n - 1]
+        keys = []
+        code = chars
+        for n in range(1, self.ngram_range[1] + 1):
+            if n > 1:
+                code = code[:-1] * _BASE + chars[n - 1:]
+            if n >= self.ngram_range[0] and len(code):
+                # n-грамма не должна переходить через границу названий
+                rows = owner[:len(code)]
+                valid = rows == owner[n - 1:]
+                keys.append((rows[valid] << _ROW_SHIFT) | code[valid])
+
+        # Частоты n-грамм в каждом названии: одна сортировка по (строка, код)
+        keys, counts = np.unique(np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64),
+                                 return_counts=True)
+        matrix = TitleMatrix(len(padded), keys >> _ROW_SHIFT, keys & _CODE_MASK, counts.astype(np.float64))
+
+        if learn:
+            self._learn(padded, matrix)
+        return matrix
+
+    def _learn(self, texts: List[str], matrix: TitleMatrix) -> None:
+        """Пополнение частот словаря названиями, которых еще не было"""
+        with self._lock:
+            if self.documents >= self.max_documents:
+                return
+            new_rows = []
+            for row, text in enumerate(texts):
+                key = hash(text)
+                if key not in self._seen and self.documents + len(new_rows) < self.max_documents:
+                    self._seen.add(key)
+                    new_rows.append(row)
+            if not new_rows:
+                return
+
+            mask = np.isin(matrix.rows, np.asarray(new_rows, dtype=np.int64))
+            batch_codes, batch_df = np.unique(matrix.codes[mask], return_counts=True)
+            merged = np.union1d(self.vocabulary, batch_codes)
+            df = np.zeros(len(merged), dtype=np.int64)
+            df[np.searchsorted(merged, self.vocabulary)] += self.df
+            df[np.searchsorted(merged, batch_codes)] += batch_df
+            self.vocabulary, self.df = merged, df
+            self.documents += len(new_rows)
+            self.version += 1
+
+    def idf(self, codes: np.ndarray) -> np.ndarray:
+        """Сглаженный IDF кодов: log((1 + N) / (1 + df)) + 1"""
+        with self._lock:
+            vocabulary, df, documents = self.vocabulary, self.df, self.documents
+        counts = np.zeros(len(codes), dtype=np.float64)
+        if len(vocabulary):
+            positions = np.minimum(np.searchsorted(vocabulary, codes), len(vocabulary) - 1)
+            known = vocabulary[positions] == codes
+            counts[known] = df[positions[known]]
+        return np.log((1.0 + documents) / (1.0 + counts)) + 1.0
+
+    def similarities(self, query: str, matrix: TitleMatrix) -> np.ndarray:
+        """
+        Косинусное сходство запроса со всеми названиями партии
+
+        Args:
+            query: название искомого документа
+            matrix: партия названий (transform)
+
+        Returns:
+            np.ndarray float64 от 0 до 1 длины matrix.size
+        """
+        result = np.zeros(matrix.size, dtype=np.float64)
+        query_matrix = self.transform([query], learn=False)
+        if not matrix.size or not len(query_matrix.codes):
+            return result
+
+        query_weights = query_matrix.counts * self.idf(query_matrix.codes)
+        query_norm = np.sqrt(np.sum(query_weights ** 2))
+
+        # Веса партии пересчитываются, только если словарь изменился
+        version = self.version
+        if matrix.version != version:
+            matrix.weights = matrix.counts * self.idf(matrix.codes)
+            matrix.norms = np.sqrt(np.bincount(matrix.rows, weights=matrix.weights ** 2, minlength=matrix.size))
+            matrix.version = version
+        weights, norms = matrix.weights, matrix.norms
+
+        # Коды запроса отсортированы (transform) - совпадения через searchsorted
+        positions = np.minimum(np.searchsorted(query_matrix.codes, matrix.codes), len(query_matrix.codes) - 1)
+        hit = query_matrix.codes[positions] == matrix.codes
+        dots = np.bincount(matrix.rows[hit], weights=weights[hit] * query_weights[positions[hit]],
+                           minlength=matrix.size)
+
+        nonzero = norms > 0
+        result[nonzero] = dots[nonzero] / (norms[nonzero] * query_norm)
+        return np.clip(result, 0.0, 1.0)
+
+    def save(self, path: str) -> None:
+        """Сохранение словаря (npz)"""
+        with self._lock:
+            alphabet = ''.join(sorted(self.alphabet, key=self.alphabet.get))
+            np.savez(path, vocabulary=self.vocabulary, df=self.df, documents=self.documents,
+                     alphabet=np.array(alphabet), ngram_range=np.array(self.ngram_range))
+
+    @classmethod
+    def load(cls, path: str, max_documents: int = 1000000) -> 'TitleVectorizer':
+        """Загрузка словаря, сохраненного save()"""
+        with np.load(path) as data:
+            vectorizer = cls(tuple(int(n) for n in data['ngram_range']), max_documents)
+            vectorizer.vocabulary = data['vocabulary']
+            vectorizer.df = data['df']
+            vectorizer.documents = int(data['documents'])
+            vectorizer.alphabet = {char: index for index, char in enumerate(str(data['alphabet']), start=1)}
+        return vectorizer
+
+_vectorizer: Optional[TitleVectorizer] = None
+_vectorizer_lock = threading.Lock()
+
+def get_title_vectorizer() -> TitleVectorizer:
+    """Общий векторизатор процесса по TITLE_SIMILARITY_CONFIG (со словарем из vocabulary_path)"""
+    global _vectorizer
+    with _vectorizer_lock:
+        if _vectorizer is None:
+            config = Config.TITLE_SIMILARITY_CONFIG
+            path = config['vocabulary_path']
+            if path and os.path.exists(path):
+                _vectorizer = TitleVectorizer.load(path, config['max_documents'])
+            else:
+                _vectorizer = TitleVectorizer(tuple(config['ngram_range']), config['max_documents'])
+        return _vectorizer
+
+def title_scores(similarity: np.ndarray, config: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """Баллы за название: weight * сходство, ниже min_similarity - 0"""
+    config = config or Config.TITLE_SIMILARITY_CONFIG
+    scores = np.rint(similarity * config['weight']).astype(np.int64)
+    scores[similarity < config['min_similarity']] = 0
+    return scores
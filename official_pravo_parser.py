@@ -4,6 +4,8 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin
 from typing import Dict, List, Optional, Any
+from npa_searcher.config import Config
+from npa_searcher.knowledge_base import get_knowledge_base
 
 class OfficialPravoGovParser:
     """
@@ -47,30 +49,16 @@ class OfficialPravoGovParser:
         
         print(f"🏛️ Поиск в ОФИЦИАЛЬНОМ pravo.gov.ru для: {doc_number}")
         
-        # Известные документы и их местоположение в СПС
-        known_documents = {
-            '273-ФЗ': {
-                'sps_id': '70291362',  # ID в СПС для закона об образовании
-                'full_name': 'Федеральный закон "Об образовании в Российской Федерации"',
-                'year': '2012'
-            },
-            '44-ФЗ': {
-                'sps_id': '70353464',
-                'full_name': 'Федеральный закон "О контрактной системе"',
-                'year': '2013'
-            },
-            '223-ФЗ': {
-                'sps_id': '12177967',
-                'full_name': 'Федеральный закон "О закупках товаров, работ, услуг"',
-                'year': '2011'
-            }
-        }
-        
-        # Проверяем известные документы
+        # Известные документы и их местоположение в СПС - из базы известных документов
+        # (по eoNumber или каноническому номеру: '273-ФЗ', '№ 273-фз', '273 ФЗ')
         clean_number = doc_number.replace('№', '').strip()
+        knowledge_base = get_knowledge_base()
+        known_doc = knowledge_base.by_eo_number(eo_number) if eo_number else None
+        if known_doc is None or not known_doc.get('sps_id'):
+            known_doc = knowledge_base.lookup(doc_number)
         
-        if clean_number in known_documents:
-            known_doc = known_documents[clean_number]
+        if known_doc is not None and known_doc.get('sps_id'):
+            full_name = known_doc.get('full_name') or known_doc.get('description', '')
             
             return {
                 'type': 'official_consolidated_version',
@@ -83,7 +71,7 @@ class OfficialPravoGovParser:
                         'steps': [
                             f"1. Откройте СПС: http://pravo.gov.ru/ips/",
                             f"2. В поле поиска введите: {clean_number}",
-                            f"3. Найдите: {known_doc['full_name']}",
+                            f"3. Найдите: {full_name}",
                             f"4. Выберите 'Действующая редакция'",
                             f"5. Скачайте PDF актуальной версии"
                         ]
@@ -102,7 +90,7 @@ class OfficialPravoGovParser:
                 },
                 'api_document': {
                     'eo_number': eo_number,
-                    'pdf_url': f"http://publication.pravo.gov.ru/file/pdf?eoNumber={eo_number}",
+                    'pdf_url': Config.PDF_URL_TEMPLATE.format(eo_number=eo_number),
                     'note': 'Оригинальная версия без изменений'
                 },
                 'recommendations': [
@@ -147,7 +135,7 @@ class OfficialPravoGovParser:
             },
             'api_fallback': {
                 'eo_number': eo_number,
-                'pdf_url': f"http://publication.pravo.gov.ru/file/pdf?eoNumber={eo_number}",
+                'pdf_url': Config.PDF_URL_TEMPLATE.format(eo_number=eo_number),
                 'note': 'Резервный вариант: оригинальная версия из API (без изменений)'
             },
             'important_note': [
@@ -39,6 +39,13 @@ setup(
             "flake8>=4.0.0",
             "mypy>=0.991",
         ],
+        "export": [
+            "pyarrow>=12.0.0",
+        ],
+        "fast": [
+            "msgspec>=0.18.0",
+            "orjson>=3.9.0",
+        ],
         "profstandards": [
             "PyMuPDF>=1.23.0",
             "xlrd>=2.0.0", 
@@ -49,6 +56,10 @@ setup(
         "console_scripts": [
             "npa-search=npa_searcher.cli:main",
             "profstandards-download=npa_searcher.profstandards.cli:main",
+            "npa-service=npa_searcher.service:main",
+            "npa-bench=npa_searcher.benchmark:main",
+            "npa-loadtest=npa_searcher.loadtest:main",
+            "npa-index=npa_searcher.name_index:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,55 @@
+"""
+Пакетное извлечение (Batch API) против локальной OpenAI-заглушки
+"""
+
+import os
+import json
+import pytest
+from npa_searcher.backends import create_backend
+from npa_searcher.gpt_helper import GPTHelper
+from npa_searcher.standins import OpenAIStandInServer
+
+TEXT = ('В соответствии с Федеральным законом № 273-ФЗ «Об образовании в Российской Федерации» '
+        'и постановлением Правительства № 1490 «О лицензировании образовательной деятельности» '
+        'организация руководствуется указанными актами.\n') * 60
+
+@pytest.fixture
+def server():
+    with OpenAIStandInServer() as standin:
+        yield standin
+
+@pytest.fixture
+def helper(server):
+    backend = create_backend('openai', api_key='test', base_url=server.url + '/v1')
+    return GPTHelper(backend=backend, verbose=False)
+
+def test_submit_wait_collect(helper, server, tmp_path):
+    batch_id = helper.submit_batch(TEXT, str(tmp_path))
+    with open(tmp_path / f"batch_{batch_id}.json", encoding='utf-8') as f:
+        state = json.load(f)
+    assert state['chunks'] > 1
+
+    batch = helper.wait_for_batch(batch_id, poll_interval=0.01, timeout=5)
+    assert batch.status == 'completed'
+
+    results = helper.collect_batch_results(batch, chunks=state['chunks'])
+    numbers = {doc['number'] for doc in results['all_documents']}
+    assert {'273-ФЗ', '1490'} <= numbers
+    assert results['batch_info']['processed_chunks'] == state['chunks']
+    assert results['batch_info']['failed_chunks'] == []
+
+def test_missing_chunks_are_failed(helper, tmp_path):
+    batch_id = helper.submit_batch(TEXT, str(tmp_path))
+    results = helper.collect_batch_results(batch_id, chunks=1000)
+    assert 'chunk-999' in results['batch_info']['failed_chunks']
+
+def test_resume_reuses_submitted_batch(helper, server, tmp_path):
+    first = helper.extract_documents_batch(TEXT, work_dir=str(tmp_path), wait=False)
+    batch_id = first['batch_info']['batch_id']
+
+    # Прерванный прогон запускается заново с тем же текстом
+    resumed = helper.extract_documents_batch(TEXT, work_dir=str(tmp_path))
+    assert resumed['batch_info']['batch_id'] == batch_id
+    assert resumed['npa_documents']
+    assert len(server.batches) == 1
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.jsonl')]) == 1
@@ -0,0 +1,36 @@
+"""
+Оконная разбивка текста на чанки
+"""
+
+import random
+from npa_searcher.chunking import iter_text_chunks, iter_window_chunks, iter_file_chunks
+
+def _text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = ['слово', ' ', '. ', '\n', '\n\n', 'x' * 40]
+    return ''.join(rng.choices(parts, [8, 6, 1, 1, 0.2, 0.5], k=size))
+
+def test_chunks_cover_text_with_overlap():
+    text = _text(20000)
+    chunks = list(iter_text_chunks(text, 2000))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert chunks[0] == text[:len(chunks[0])]
+    assert text.endswith(chunks[-1])
+
+def test_stream_and_file_match_text(tmp_path):
+    text = _text(30000, seed=1)
+    expected = list(iter_text_chunks(text, 3000))
+
+    rng = random.Random(2)
+    cuts = sorted(rng.sample(range(len(text)), 40))
+    pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+    assert list(iter_window_chunks(pieces, 3000)) == expected
+
+    path = tmp_path / 'text.txt'
+    path.write_text(text, encoding='utf-8')
+    assert list(iter_file_chunks(str(path), 3000)) == expected
+
+def test_short_and_empty_text():
+    assert list(iter_text_chunks('', 1000)) == ['']
+    assert list(iter_text_chunks('короткий текст', 1000)) == ['короткий текст']
@@ -0,0 +1,32 @@
+"""
+Восстановление журнала обработки после сбоя
+"""
+
+from npa_searcher.journal import ProcessingJournal
+
+def test_torn_last_line_does_not_swallow_next_record(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with ProcessingJournal(path) as journal:
+        journal.mark_completed('a')
+    # Сбой посреди записи
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind": "compl')
+
+    with ProcessingJournal(path) as journal:
+        journal.mark_completed('b')
+
+    with ProcessingJournal(path) as journal:
+        assert journal.is_completed('a')
+        assert journal.is_completed('b')
+
+def test_complete_record_without_newline_is_kept(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"kind": "completed", "input": "a"}')
+
+    with ProcessingJournal(path) as journal:
+        journal.mark_completed('b')
+
+    with ProcessingJournal(path) as journal:
+        assert journal.is_completed('a')
+        assert journal.is_completed('b')
@@ -0,0 +1,52 @@
+"""
+База известных документов и ее использование поисковиком
+"""
+
+import json
+from npa_searcher.knowledge_base import KnowledgeBase
+from npa_searcher.npa_searcher import NPASearcher
+from npa_searcher.instrumentation import stage_metrics
+from npa_searcher.standins.pravo_server import PravoAPI, ReplaySession, synthetic_documents
+
+def _searcher(knowledge_base, catalog):
+    searcher = NPASearcher(knowledge_base=knowledge_base)
+    searcher.request_delay = 0.0
+    searcher.session = ReplaySession(PravoAPI(catalog=catalog))
+    return searcher
+
+def test_lookup_by_number_variants_and_type_variants():
+    kb = KnowledgeBase()
+    for doc_type in (None, 'Федеральный закон', 'Федеральный закон РФ', 'ФЗ', 'Закон'):
+        assert kb.lookup('№ 273-фз', doc_type)['sps_id'] == '70291362'
+    assert kb.by_eo_number('0001201212300007')['number'] == '273-ФЗ'
+
+def test_eo_hints_strategy_runs_for_type_variants():
+    catalog = synthetic_documents(50, 1)
+    catalog.append(dict(catalog[0], eoNumber='0001201212300007', number='273-ФЗ', id='known-273'))
+    searcher = _searcher(KnowledgeBase(), catalog)
+
+    detailed = searcher.search_document_detailed(
+        {'type': 'Федеральный закон РФ', 'number': '№ 273-ФЗ', 'title': 'Об образовании'})
+    assert 'known' in detailed['strategies']
+    assert any(item['eoNumber'] == '0001201212300007' for item in detailed['results'])
+
+def test_learned_entry_resolves_only_for_same_type(tmp_path):
+    path = tmp_path / 'kb.json'
+    item = {'eoNumber': '0001202001010001', 'number': '5-ФЗ', 'name': 'О тестировании', 'viewDate': '01.01.2020'}
+    path.write_text(json.dumps({'documents': [
+        {'number': '5-ФЗ', 'type': 'Федеральный закон', 'document': item, 'source': 'learned'}
+    ]}, ensure_ascii=False), encoding='utf-8')
+    searcher = _searcher(KnowledgeBase(str(path)), synthetic_documents(20, 2))
+
+    stage_metrics.enable()
+    try:
+        direct = searcher.search_document_detailed({'type': 'Федеральный закон', 'number': '5 фз', 'title': ''})
+        assert direct['strategies'] == {'knowledge_base': 'complete'}
+        assert direct['results'][0]['eoNumber'] == item['eoNumber']
+        assert searcher.get_search_statistics()['api_calls'] == 0
+        assert 'search.knowledge_base' in stage_metrics.snapshot()['stages']
+    finally:
+        stage_metrics.disable()
+
+    other = searcher.search_document_detailed({'type': 'Указ', 'number': '5-ФЗ', 'title': ''})
+    assert 'knowledge_base' not in other['strategies']
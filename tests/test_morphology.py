@@ -0,0 +1,24 @@
+"""
+Морфологическая нормализация: короткие основы
+"""
+
+from npa_searcher.morphology import WordNormalizer
+from npa_searcher.name_index import NameIndex
+
+def test_short_stem_matches_all_forms_on_word_start():
+    normalizer = WordNormalizer('builtin')
+    assert normalizer.stem('данные') == normalizer.stem('данных')
+    assert normalizer.matches('персональные данные', 'О персональных данных')
+    # Короткая основа внутри другого слова не совпадает
+    assert not normalizer.matches('данные', 'Техническое задание')
+
+def test_query_terms_keep_words_for_short_stems():
+    normalizer = WordNormalizer('builtin')
+    assert normalizer.query_terms('персональные данные') == ['персональн', 'данные']
+
+def test_name_index_finds_inflected_short_stem():
+    index = NameIndex(normalizer=WordNormalizer('builtin'))
+    index.add([{'eoNumber': '1', 'name': 'О персональных данных'},
+               {'eoNumber': '2', 'name': 'Об утверждении технического задания'}])
+    results = index.search('данные', limit=5)
+    assert [item['eoNumber'] for _, item in results] == ['1']
@@ -0,0 +1,49 @@
+"""
+Параллельная загрузка профстандартов: 404 запоминается, временные сбои - нет
+"""
+
+import json
+from typing import Any, Tuple
+from npa_searcher.profstandards.downloader import ProfstandardDownloader
+from npa_searcher.standins.base import StandInHandler, StandInServer
+
+PDF = b'%PDF-1.4 ' + b'0' * 20000
+
+class SourceHandler(StandInHandler):
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        code = path.rsplit('/', 1)[-1].replace('.pdf', '')
+        return {'01.001': (200, PDF), '01.002': (404, {'error': 'not found'}),
+                '01.003': (503, {'error': 'unavailable'})}.get(code, (429, {'error': 'slow down'}))
+
+class SourceServer(StandInServer):
+    handler_class = SourceHandler
+
+def test_only_http_404_is_cached_as_missing(tmp_path):
+    with SourceServer() as server:
+        downloader = ProfstandardDownloader(output_dir=str(tmp_path))
+        downloader.sources['fgosvo'] = server.url + '/{code}.pdf'
+        downloader.delay = 0.0
+
+        results = downloader.download_parallel(['01.001', '01.002', '01.003', '01.004'], workers=2)
+        assert {code: result['status'] for code, result in results.items()} == {
+            '01.001': 'success', '01.002': 'not_found', '01.003': 'error', '01.004': 'error'}
+
+        state = json.loads((tmp_path / downloader.STATE_FILE).read_text(encoding='utf-8'))
+        assert state['not_found'] == ['01.002']
+
+        # Повторный запуск: 404 пропускается, временные сбои запрашиваются снова
+        again = downloader.download_parallel(['01.002', '01.003'], workers=2)
+        assert again['01.002'].get('cached')
+        assert again['01.003']['status'] == 'error'
+        assert server.stats['by_path']['/01.003.pdf'] == 2
+        assert server.stats['by_path']['/01.002.pdf'] == 1
+
+def test_network_failure_is_error(tmp_path):
+    downloader = ProfstandardDownloader(output_dir=str(tmp_path))
+    downloader.sources['fgosvo'] = 'http://127.0.0.1:9/{code}.pdf'
+    downloader.delay = 0.0
+    downloader.timeout = 1
+
+    results = downloader.download_parallel(['01.005'])
+    assert results['01.005']['status'] == 'error'
+    assert downloader.download_pdf('01.005') is None